@@ -0,0 +1,158 @@
+import logging
+import os
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from .models import Resume, ResumeAnalysis
+from .response_cache import bump_version
+from .rollups import record_analyses
+from .ranking import index_analyses
+from . import skill_index
+from .pipeline import analyze_resume_file, analysis_fields, remember_on_resume
+
+logger = logging.getLogger(__name__)
+
+# One file to analyze; `resume` is the stored Resume row when there is one
+BatchEntry = namedtuple("BatchEntry", ["file_name", "path", "content_hash", "resume"])
+
+
+def iter_batch_pdfs(uploads):
+    """
+    Yield PDF files from a multi-file upload, expanding .zip archives.
+
+    Raises ValueError on a non-PDF file, a corrupt archive, or a batch that
+    exceeds BATCH_MAX_FILES / BATCH_MAX_FILE_BYTES.
+    """
+    max_files = getattr(settings, "BATCH_MAX_FILES", 500)
+    max_bytes = getattr(settings, "BATCH_MAX_FILE_BYTES", 10 * 1024 * 1024)
+    count = 0
+
+    for upload in uploads:
+        name = upload.name.lower()
+        if name.endswith(".pdf"):
+            members = [upload]
+        elif name.endswith(".zip"):
+            members = _zip_members(upload, max_bytes)
+        else:
+            raise ValueError(f"Unsupported file in batch: {upload.name}. Only PDF and ZIP allowed.")
+
+        for member in members:
+            count += 1
+            if count > max_files:
+                raise ValueError(f"Batch is limited to {max_files} files.")
+            yield member
+
+
+def _zip_members(upload, max_bytes):
+    try:
+        archive = zipfile.ZipFile(upload)
+    except zipfile.BadZipFile:
+        raise ValueError(f"{upload.name} is not a valid ZIP archive.")
+
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                continue
+            # Sizes come from the archive directory, so check before inflating
+            if info.file_size > max_bytes:
+                raise ValueError(f"{info.filename} exceeds the per-file size limit.")
+            yield ContentFile(archive.read(info), name=os.path.basename(info.filename))
+
+
+def dedupe_entries(entries):
+    """Keep the first entry for each content hash, preserving order"""
+    unique = {}
+    for entry in entries:
+        unique.setdefault(entry.content_hash, entry)
+    return list(unique.values())
+
+
+def run_batch(entries, batch=None, max_workers=None):
+    """
+    Analyze entries with at most `max_workers` LLM calls in flight.
+
+    Identical files are analyzed once and produce a single ResumeAnalysis;
+    rows are written with one bulk_create at the end. Returns a summary
+    including throughput in resumes per minute.
+    """
+    max_workers = max_workers or getattr(settings, "BATCH_LLM_CONCURRENCY", 4)
+    unique = dedupe_entries(entries)
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-batch") as pool:
+        results = list(pool.map(_analyze_entry, unique))
+
+    analyses = []
+    resumes = []
+    failed = 0
+    for entry, (text, result) in zip(unique, results):
+        if entry.resume is not None and remember_on_resume(entry.resume, text, result):
+            resumes.append(entry.resume)
+
+        if "error" in result:
+            failed += 1
+            analyses.append(ResumeAnalysis(
+                file_name=entry.file_name,
+                resume=entry.resume,
+                batch=batch,
+                status="failed",
+                error_message=result["error"],
+            ))
+        else:
+            analyses.append(ResumeAnalysis(
+                file_name=entry.file_name,
+                resume=entry.resume,
+                batch=batch,
+                status="completed",
+                trend="neutral",
+                previous_score=0,
+                **analysis_fields(result)
+            ))
+
+    ResumeAnalysis.objects.bulk_create(analyses, batch_size=500)
+    record_analyses(analyses)  # bulk_create skips the post_save rollup signal
+    bump_version()  # ... and the cached dashboard responses
+    Resume.objects.bulk_update(resumes, ["extracted_text", "analysis_result"], batch_size=500)
+    index_analyses(analyses)  # likewise for the ranking index
+    if all(analysis.pk is not None for analysis in analyses):
+        skill_index.index_analyses(analyses)
+    elif batch is not None:
+        # Backends that don't return bulk_create ids (MySQL)
+        skill_index.index_analyses(ResumeAnalysis.objects.filter(batch=batch).only("id", "skills_match"))
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "total_files": len(entries),
+        "unique_files": len(unique),
+        "duplicates": len(entries) - len(unique),
+        "failed_files": failed,
+        "seconds": round(elapsed, 2),
+        "resumes_per_minute": round(len(unique) / elapsed * 60, 2) if elapsed else None,
+    }
+
+    if batch is not None:
+        batch.total_files = summary["total_files"]
+        batch.unique_files = summary["unique_files"]
+        batch.failed_files = failed
+        batch.resumes_per_minute = summary["resumes_per_minute"]
+        batch.status = "failed" if unique and failed == len(unique) else "completed"
+        batch.finished_at = timezone.now()
+        batch.save()
+
+    return summary
+
+
+def _analyze_entry(entry):
+    # Runs on pool threads: no DB access here, results are written by run_batch
+    text = entry.resume.extracted_text if entry.resume is not None else None
+    try:
+        return analyze_resume_file(entry.path, entry.content_hash, text=text, leases=False)
+    except Exception as e:
+        logger.exception("Batch analysis of %s failed", entry.path)
+        return None, {"error": "Something went wrong during analysis."}
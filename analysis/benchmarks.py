@@ -0,0 +1,448 @@
+import asyncio
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from random import Random
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models.signals import post_save
+from django.test import Client, override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from .cache import analysis_cache
+from .metrics import STAGE_SECONDS
+from .models import AnalysisSkill, Resume, ResumeAnalysis
+from .response_cache import bump_version
+from .prompting import PAGE_BREAK, compact_resume_text, count_tokens, tokenizer_name
+from .resume_analysis import PROMPT_TEXT_LIMIT, PROMPT_TOKEN_BUDGET, build_analysis_request, extract_text_from_pdf
+from .stub_llm import StubLLMServer
+
+# Synthetic rows are tagged so they can be told apart from (and removed without touching) real data
+BENCH_PREFIX = "bench_"
+
+
+@contextmanager
+def scratch_database(keepdb=False, verbosity=0):
+    """
+    Point the default connection at a throwaway test database (created and
+    migrated the way `manage.py test` does it) while the block runs, so
+    benchmarks never seed or delete rows in the configured database.
+    keepdb=True reuses the test database between runs.
+    """
+    old_config = setup_databases(
+        verbosity, interactive=False, keepdb=keepdb,
+        aliases={DEFAULT_DB_ALIAS}, serialized_aliases=set(),
+    )
+    try:
+        yield connection.settings_dict["NAME"]
+    finally:
+        teardown_databases(old_config, verbosity, keepdb=keepdb)
+
+
+@contextmanager
+def created_rows(*models):
+    """{model: [pk, ...]} of the rows of `models` created while the block runs"""
+    rows = {model: [] for model in models}
+
+    def remember(sender, instance, created=False, raw=False, **kwargs):
+        if created and not raw:
+            rows[sender].append(instance.pk)
+
+    for model in models:
+        post_save.connect(remember, sender=model, weak=False, dispatch_uid=f"benchmark-{model.__name__}")
+    try:
+        yield rows
+    finally:
+        for model in models:
+            post_save.disconnect(sender=model, dispatch_uid=f"benchmark-{model.__name__}")
+
+
+def seed_analyses(rows, batch_size=5000, days=365, seed=None, start=0):
+    """
+    bulk_create `rows` synthetic ResumeAnalysis rows spread over `days` days.
+
+    Bypasses signals, so the dashboard rollup does not see them (cached
+    dashboard responses are invalidated explicitly); run against
+    a scratch database. The same `seed` produces the same rows; `start`
+    numbers them after rows seeded earlier.
+    """
+    random = Random(seed)
+    now = timezone.now()
+    statuses = ["completed"] * 8 + ["processing", "failed"]
+    try:
+        for first in range(start, start + rows, batch_size):
+            numbers = range(first, min(first + batch_size, start + rows))
+            dates = [now - timedelta(seconds=random.randint(0, days * 86400)) for _ in numbers]
+            batch = ResumeAnalysis.objects.bulk_create([
+                ResumeAnalysis(
+                    file_name=f"{BENCH_PREFIX}Resume_{i:07d}.pdf",
+                    ats_score=random.randint(25, 95),
+                    clarity_score=random.randint(25, 95),
+                    status=random.choice(statuses),
+                    skills_match={"technical": ["Python", "Django"], "soft": [], "tools": ["Git"]},
+                    strengths=["Clear layout"],
+                    weaknesses=["No metrics"],
+                )
+                for i in numbers
+            ], batch_size=batch_size)
+            # auto_now_add stamped them all "now"; spread them out afterwards
+            for analysis, date in zip(batch, dates):
+                analysis.upload_date = date
+            ResumeAnalysis.objects.bulk_update(batch, ["upload_date"], batch_size=1000)
+    finally:
+        bump_version()
+
+
+def seeded_rows():
+    return ResumeAnalysis.objects.filter(file_name__startswith=BENCH_PREFIX)
+
+
+def clear_seeded():
+    """
+    Delete the synthetic rows with one DELETE: seeded rows have no skill
+    postings and never reached the rollups, so the cascade and signal work
+    of QuerySet.delete() (minutes at 1M rows) is skipped.
+    """
+    AnalysisSkill.objects.filter(analysis__file_name__startswith=BENCH_PREFIX).delete()
+    queryset = seeded_rows()
+    deleted = queryset._raw_delete(queryset.db)
+    bump_version()
+    return deleted
+
+
+def read_path_queries():
+    """The ResumeAnalysis read paths served by the dashboard and history views"""
+    base = ResumeAnalysis.objects.all()
+    return {
+        "latest": lambda: base.order_by("-upload_date").first(),
+        "recent_5": lambda: list(base.order_by("-upload_date")[:5]),
+        "status_page": lambda: list(base.filter(status="completed").order_by("-upload_date")[:20]),
+        "search_prefix": lambda: list(
+            base.filter(file_name__istartswith=f"{BENCH_PREFIX}Resume_00123").order_by("-upload_date")[:20]
+        ),
+        "search_contains": lambda: list(
+            base.filter(file_name__icontains="Resume_00123").order_by("-upload_date")[:20]
+        ),
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def time_calls(fn, repeat):
+    """Per-call latencies in milliseconds, after one warm-up call"""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize_samples(samples):
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+        "samples": len(samples),
+    }
+
+
+def benchmark_read_paths(repeat=50, explain=False):
+    results = {}
+    for name, query in read_path_queries().items():
+        results[name] = summarize_samples(time_calls(query, repeat))
+    if explain:
+        plans = {
+            "status_page": ResumeAnalysis.objects.filter(status="completed").order_by("-upload_date")[:20],
+            "search_prefix": ResumeAnalysis.objects.filter(file_name__istartswith=BENCH_PREFIX).order_by("-upload_date")[:20],
+            "latest": ResumeAnalysis.objects.order_by("-upload_date")[:1],
+        }
+        for name, qs in plans.items():
+            results[name]["plan"] = qs.explain()
+    results["_meta"] = {"rows": ResumeAnalysis.objects.count(), "vendor": connection.vendor}
+    return results
+
+
+async def _load(url, files, total, concurrency):
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+
+    async with httpx.AsyncClient(timeout=None, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, files=files)
+                    key = str(response.status_code)
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[key] = statuses.get(key, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "url": url,
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 2),
+        "statuses": statuses,
+        **summarize_samples(latencies),
+    }
+
+
+def run_load(url, files, total=200, concurrency=50):
+    """
+    POST multipart `files` ({field: (name, bytes)}) to `url` `total` times with
+    at most `concurrency` requests in flight; throughput and latency percentiles.
+    """
+    return asyncio.run(_load(url, files, total, concurrency))
+
+
+# --- Benchmark suite over the bundled resumes/ corpus (manage.py run_benchmarks) ---
+
+def corpus_paths(directory, limit=None):
+    paths = sorted(path for path in Path(directory).glob("*.pdf") if path.is_file())
+    return paths[:limit] if limit else paths
+
+
+def _rate(count, seconds):
+    return round(count / seconds, 2) if seconds else None
+
+
+def benchmark_extraction(paths):
+    """Inline PyPDF2 extraction of every corpus file; returns (results, {path: text})"""
+    texts, samples, pages = {}, [], 0
+    started = time.perf_counter()
+    for path in paths:
+        call_started = time.perf_counter()
+        text = extract_text_from_pdf(str(path))
+        samples.append((time.perf_counter() - call_started) * 1000)
+        if text:
+            texts[path] = text
+            pages += text.count(PAGE_BREAK) + 1
+    elapsed = time.perf_counter() - started
+
+    megabytes = sum(path.stat().st_size for path in paths) / 1e6
+    return {
+        "files": len(paths),
+        "readable": len(texts),
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "files_per_second": _rate(len(paths), elapsed),
+        "pages_per_second": _rate(pages, elapsed),
+        "mb_per_second": _rate(megabytes, elapsed),
+        **summarize_samples(samples),
+    }, texts
+
+
+def benchmark_prompt_build(texts, repeat=3):
+    """build_analysis_request (compaction + prompt formatting) over the extracted texts"""
+    texts = list(texts)
+    samples = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            build_analysis_request(text)
+            samples.append((time.perf_counter() - started) * 1000)
+    tokens_before = sum(count_tokens(text[:PROMPT_TEXT_LIMIT]) for text in texts)
+    tokens_after = sum(count_tokens(compact_resume_text(text, PROMPT_TOKEN_BUDGET)) for text in texts)
+    return {
+        "texts": len(texts),
+        "tokenizer": tokenizer_name(),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        **summarize_samples(samples),
+    }
+
+
+def _stage_totals():
+    return {key[0]: totals for key, totals in STAGE_SECONDS.totals().items()}
+
+
+def _stage_breakdown(before, after):
+    """Mean ms per call of each pipeline stage timed between two _stage_totals() snapshots"""
+    breakdown = {}
+    for stage, (count, total) in sorted(after.items()):
+        count -= before.get(stage, (0, 0.0))[0]
+        total -= before.get(stage, (0, 0.0))[1]
+        if count:
+            breakdown[stage] = {"calls": count, "mean_ms": round(total / count * 1000, 3)}
+    return breakdown
+
+
+def benchmark_upload(paths, latency=0.5, jitter=0.0, repeat=1):
+    """
+    POST each corpus file to /api/upload-resume/ in-process, with the LLM
+    replaced by a local StubLLMServer answering after `latency` seconds.
+
+    Every upload is a cold one (analysis cache cleared, fresh MEDIA_ROOT);
+    the rows it creates, and only those, are deleted afterwards.
+    """
+    media_root = tempfile.mkdtemp()
+    samples, statuses = [], {}
+
+    with StubLLMServer(latency=latency, jitter=jitter) as stub, created_rows(Resume, ResumeAnalysis) as created:
+        with override_settings(
+            ANALYSIS_ASYNC=False,
+            ALLOWED_HOSTS=["testserver"],
+            MEDIA_ROOT=media_root,
+            LLM_PROVIDERS=["openrouter"],
+            LLM_PROVIDER_URLS={"openrouter": stub.url},
+            LLM_HEDGE=False,
+            LLM_MAX_RETRIES=0,
+            LLM_RATE_LIMIT=0,
+            LLM_MAX_CONCURRENCY=0,
+        ):
+            client = Client()
+            stages_before = _stage_totals()
+            try:
+                for _ in range(repeat):
+                    for path in paths:
+                        analysis_cache.clear()
+                        Resume.objects.filter(pk__in=created[Resume]).delete()  # or the bytes are deduplicated
+                        upload = SimpleUploadedFile(path.name, path.read_bytes(), content_type="application/pdf")
+                        started = time.perf_counter()
+                        response = client.post("/api/upload-resume/", {"file": upload})
+                        samples.append((time.perf_counter() - started) * 1000)
+                        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            finally:
+                stages = _stage_breakdown(stages_before, _stage_totals())
+                ResumeAnalysis.objects.filter(pk__in=created[ResumeAnalysis]).delete()
+                Resume.objects.filter(pk__in=created[Resume]).delete()
+                analysis_cache.clear()
+                shutil.rmtree(media_root, ignore_errors=True)
+
+    return {
+        "uploads": len(samples),
+        "stub_latency_ms": round(latency * 1000, 1),
+        "stub_jitter_ms": round(jitter * 1000, 1),
+        "statuses": statuses,
+        "stages": stages,
+        **summarize_samples(samples),
+    }
+
+
+READ_ENDPOINTS = (
+    "/api/latest-analysis/",
+    "/api/current-analysis/",
+    "/api/recent-analyses/",
+    "/api/dashboard-stats/",
+    "/api/analyses/?status=completed",
+)
+
+
+def benchmark_read_endpoints(repeat=50):
+    client = Client()
+    results = {}
+    with override_settings(ALLOWED_HOSTS=["testserver"]):
+        for url in READ_ENDPOINTS:
+            results[url] = summarize_samples(time_calls(lambda url=url: client.get(url), repeat))
+    return results
+
+
+def benchmark_db_reads(sizes=(10_000, 100_000, 1_000_000), repeat=50, seed=0, keep=False):
+    """
+    Read-path query and endpoint latency with `sizes` synthetic rows,
+    growing one table from the smallest size to the largest.
+    """
+    results = {}
+    try:
+        for size in sorted(sizes):
+            existing = seeded_rows().count()
+            if size > existing:
+                seed_analyses(size - existing, seed=seed + existing, start=existing)
+            results[str(size)] = {
+                "queries": benchmark_read_paths(repeat=repeat),
+                "endpoints": benchmark_read_endpoints(repeat=repeat),
+            }
+    finally:
+        if not keep:
+            clear_seeded()
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(corpus, sections=("extraction", "prompt", "upload", "db"), limit=None, repeat=3,
+              stub_latency=0.5, stub_jitter=0.0, sizes=(10_000, 100_000, 1_000_000), read_repeat=50, seed=0):
+    """Run the selected benchmark sections; the result is JSON-serializable"""
+    paths = corpus_paths(corpus, limit)
+    results = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": connection.vendor,
+            "corpus_files": len(paths),
+            "sections": list(sections),
+            "seed": seed,
+        },
+    }
+
+    if "extraction" in sections or "prompt" in sections:
+        extraction, texts = benchmark_extraction(paths)
+        if "extraction" in sections:
+            results["extraction"] = extraction
+        if "prompt" in sections:
+            results["prompt_build"] = benchmark_prompt_build(texts.values(), repeat=repeat)
+    if "upload" in sections:
+        results["upload"] = benchmark_upload(paths, latency=stub_latency, jitter=stub_jitter)
+    if "db" in sections:
+        results["db_reads"] = benchmark_db_reads(sizes, repeat=read_repeat, seed=seed)
+    return results
+
+
+# Lower is better for latencies, higher is better for throughput
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+THROUGHPUT_KEYS = ("files_per_second", "pages_per_second", "mb_per_second")
+
+
+def compare_results(baseline, current, threshold_pct=10.0, path=""):
+    """
+    [(metric path, baseline, current, change %)] for every latency that grew,
+    or throughput that fell, by more than threshold_pct between two runs.
+    """
+    regressions = []
+    for key, new in current.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        name = f"{path}.{key}" if path else key
+        if isinstance(new, dict) and isinstance(old, dict) and key != "meta":
+            regressions.extend(compare_results(old, new, threshold_pct, name))
+        elif isinstance(new, (int, float)) and isinstance(old, (int, float)) and old > 0:
+            change = (new - old) / old * 100
+            if (key in LATENCY_KEYS and change > threshold_pct) or (key in THROUGHPUT_KEYS and -change > threshold_pct):
+                regressions.append((name, old, new, round(change, 1)))
+    return regressions
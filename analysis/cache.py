@@ -0,0 +1,162 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import providers, resume_analysis
+from .prompting import COMPACTION_VERSION
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional TTL and hit/miss counters"""
+
+    def __init__(self, max_entries=512, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_uploaded_file(uploaded_file):
+    """SHA-256 of a Django UploadedFile, read chunk by chunk"""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def hash_file(path, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def prompt_version():
+    """
+    Changes whenever the providers (LLM_PROVIDERS, their endpoints or models),
+    a prompt template or the prompt compaction changes
+    """
+    fingerprint = "\n".join([
+        providers.providers_fingerprint(),
+        f"compaction={COMPACTION_VERSION} budget={resume_analysis.PROMPT_TOKEN_BUDGET}",
+    ])
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache of LLM analysis results.
+
+    Results are reachable both by the hash of the uploaded bytes and by the
+    hash of the normalized extracted text, so a re-saved copy of the same
+    resume still hits. Every key carries the prompt version, and the whole
+    cache is dropped as soon as that version changes.
+    """
+
+    def __init__(self, max_entries=512, ttl=None):
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._version = prompt_version()
+        self._version_lock = threading.Lock()
+
+    def _current_version(self):
+        version = prompt_version()
+        if version != self._version:
+            with self._version_lock:
+                if version != self._version:
+                    self._cache.clear()
+                    self._version = version
+        return version
+
+    def _content_key(self, content_hash):
+        return f"bytes:{self._current_version()}:{content_hash}"
+
+    def _text_key(self, text):
+        text_hash = hash_bytes(normalize_text(text).encode("utf-8"))
+        return f"text:{self._current_version()}:{text_hash}"
+
+    def get_by_content(self, content_hash):
+        return self._cache.get(self._content_key(content_hash))
+
+    def get_by_text(self, text):
+        return self._cache.get(self._text_key(text))
+
+    def store(self, result, content_hash=None, text=None):
+        if content_hash:
+            self._cache.set(self._content_key(content_hash), result)
+        if text:
+            self._cache.set(self._text_key(text), result)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return {**self._cache.stats(), "prompt_version": self._current_version()}
+
+
+analysis_cache = AnalysisCache(
+    max_entries=getattr(settings, "ANALYSIS_CACHE_MAX_ENTRIES", 512),
+    ttl=getattr(settings, "ANALYSIS_CACHE_TTL", 60 * 60 * 24),
+)
@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from docx import Document
+
+from .cache import LRUCache, hash_uploaded_file
+from .metrics import timed
+from .pdf_pool import extract_pdf_text
+from .prompting import PAGE_BREAK
+
+PDF, DOCX, TXT = "pdf", "docx", "txt"
+FORMATS = (PDF, DOCX, TXT)
+
+# The same job description is matched against many resumes: keep its text by content hash
+jd_text_cache = LRUCache(max_entries=getattr(settings, "JD_CACHE_MAX_ENTRIES", 256))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Threads that extract the resume and the JD of one request side by side"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="document-loader")
+    return _executor
+
+
+def sniff_format(uploaded_file):
+    """PDF, DOCX or TXT from the file's leading bytes (not its name); None for anything else"""
+    uploaded_file.seek(0)
+    head = uploaded_file.read(512)
+    uploaded_file.seek(0)
+
+    if head.startswith(b"%PDF"):
+        return PDF
+    if head.startswith(b"PK\x03\x04"):  # DOCX is a zip container
+        return DOCX
+    if b"\x00" in head:
+        return None
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(head) - 3:  # not just a multi-byte character cut off at 512 bytes
+            return None
+    return TXT
+
+
+def _source(uploaded_file):
+    """Disk path of a TemporaryUploadedFile (no copy), otherwise the in-memory bytes"""
+    if hasattr(uploaded_file, "temporary_file_path"):
+        return uploaded_file.temporary_file_path()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+
+@timed("document_load")
+def load_document(uploaded_file, max_chars=None):
+    """
+    Text of an uploaded PDF, DOCX or TXT file.
+
+    None for an unsupported format; "" when a supported file has no readable text.
+    """
+    kind = sniff_format(uploaded_file)
+    if kind == PDF:
+        return (extract_pdf_text(_source(uploaded_file), max_chars=max_chars) or "").replace(PAGE_BREAK, "\n")
+    if kind == DOCX:
+        doc = Document(uploaded_file)
+        return "\n".join(p.text for p in doc.paragraphs)
+    if kind == TXT:
+        text = b"".join(uploaded_file.chunks()).decode("utf-8", errors="replace")
+        return text[:max_chars] if max_chars else text
+    return None
+
+
+def load_job_description(uploaded_file, content_hash=None):
+    """load_document for JDs, served from jd_text_cache when the bytes were seen before"""
+    content_hash = content_hash or hash_uploaded_file(uploaded_file)
+    text = jd_text_cache.get(content_hash)
+    if text is None:
+        text = load_document(uploaded_file)
+        if text:
+            jd_text_cache.set(content_hash, text)
+    return text
+
+
+def load_resume_and_jd(resume_file, jd_file):
+    """(resume text, JD text), extracted concurrently"""
+    jd_future = get_executor().submit(load_job_description, jd_file)
+    resume_text = load_document(resume_file)
+    return resume_text, jd_future.result()
@@ -0,0 +1,138 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .models import JobDescription, Resume, Skill
+from .pdf_pool import extract_pdf_text
+from .resume_analysis import match_resume_with_jd
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does
+each etc for from has have having how if in including into is it its may more most must of on
+or our ours per plus should such than that the their them then there these they this those to
+under up us using via was we well were what when where which while who will with within would
+you your ability able candidate candidates company experience job looking position preferred
+required requirements responsibilities role skills strong team work working years
+""".split())
+
+TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#]*(?:[.\-/][A-Za-z0-9+#]+)*")
+
+logger = logging.getLogger(__name__)
+
+
+def extract_keywords(text, limit=25):
+    """Most frequent non-stopword terms of a JD, most frequent first"""
+    counts = Counter(
+        token for token in (t.lower() for t in TOKEN_RE.findall(text))
+        if len(token) > 2 and token not in STOPWORDS
+    )
+    return [token for token, _ in counts.most_common(limit)]
+
+
+def extract_required_skills(text, skill_names=None):
+    """Known Skill names that the JD mentions, matched as whole words"""
+    if skill_names is None:
+        skill_names = Skill.objects.values_list("name", flat=True).distinct()
+    lowered = text.lower()
+    found = []
+    for name in skill_names:
+        pattern = r"(?<![\w+#])" + re.escape(name.lower()) + r"(?![\w+#])"
+        if name not in found and re.search(pattern, lowered):
+            found.append(name)
+    return found
+
+
+def save_job_description(text, content_hash, title=""):
+    """The JobDescription for these bytes, creating it (with keywords/skills) if new"""
+    jd = JobDescription.objects.filter(content_hash=content_hash).first() if content_hash else None
+    if jd is None:
+        jd = JobDescription.objects.create(
+            title=title,
+            text=text,
+            content_hash=content_hash,
+            keywords=extract_keywords(text),
+            required_skills=extract_required_skills(text),
+        )
+    return jd
+
+
+def jd_prompt_text(jd):
+    """
+    What the match prompt sends for a JD: the precomputed requirements plus
+    at most JD_PROMPT_CHARS of the original text, instead of the full upload.
+    """
+    limit = getattr(settings, "JD_PROMPT_CHARS", 4000)
+    parts = []
+    if jd.required_skills:
+        parts.append("Required skills: " + ", ".join(jd.required_skills))
+    if jd.keywords:
+        parts.append("Key terms: " + ", ".join(jd.keywords))
+    parts.append(jd.text[:limit])
+    return "\n\n".join(parts)
+
+
+def _match_one(resume, jd_text):
+    # Runs on pool threads: no DB access here, match_resumes writes the extracted text
+    text = resume.extracted_text
+    try:
+        if not text:
+            text = extract_pdf_text(resume.file.path)
+        if not text or not text.strip():
+            return text, {"error": "No readable text found in resume."}
+        return text, match_resume_with_jd(text, jd_text)
+    except Exception as e:
+        logger.exception("Matching resume %s failed", resume.id)
+        return text, {"error": f"Matching failed: {str(e)}"}
+
+
+def match_resumes(jd, resumes, max_workers=None):
+    """
+    Score `resumes` against `jd` with at most `max_workers` LLM calls in flight.
+
+    Returns (ranked, summary): successful matches by descending match_score,
+    followed by the failures.
+    """
+    max_workers = max_workers or getattr(settings, "BATCH_LLM_CONCURRENCY", 4)
+    jd_text = jd_prompt_text(jd)
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jd-match") as pool:
+        results = list(pool.map(lambda resume: _match_one(resume, jd_text), resumes))
+
+    matched, failed, extracted = [], [], []
+    for resume, (text, result) in zip(resumes, results):
+        if text and not resume.extracted_text:
+            resume.extracted_text = text
+            extracted.append(resume)
+
+        row = {"resume_id": resume.id, "file_name": os.path.basename(resume.file.name)}
+        if "error" in result:
+            failed.append({**row, "error": result["error"]})
+        else:
+            matched.append({
+                **row,
+                "match_score": result.get("match_score"),
+                "suggestions": result.get("suggestions", []),
+            })
+
+    Resume.objects.bulk_update(extracted, ["extracted_text"], batch_size=500)
+
+    matched.sort(key=lambda row: row["match_score"] if isinstance(row["match_score"], (int, float)) else -1,
+                 reverse=True)
+    for rank, row in enumerate(matched, start=1):
+        row["rank"] = rank
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "job_description_id": jd.id,
+        "total": len(resumes),
+        "matched": len(matched),
+        "failed": len(failed),
+        "seconds": round(elapsed, 2),
+    }
+    return matched + failed, summary
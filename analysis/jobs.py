@@ -0,0 +1,145 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .batch import run_batch
+from .job_descriptions import match_resumes
+from .metrics import span
+from .models import JobMatch, Resume, ResumeAnalysis
+from .pipeline import analyze_resume_file, analysis_fields, remember_on_resume
+
+logger = logging.getLogger(__name__)
+
+STALE_ERROR = "The job was interrupted before it finished. Please try again."
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide worker pool for background analysis jobs"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "ANALYSIS_WORKERS", 4),
+                    thread_name_prefix="analysis-job",
+                )
+    return _executor
+
+
+def run_analysis_job(analysis_id, content_hash=None, use_cache=True):
+    """Analyze the resume behind a `processing` ResumeAnalysis and record the outcome"""
+    analysis = ResumeAnalysis.objects.select_related("resume").get(pk=analysis_id)
+    resume = analysis.resume
+    try:
+        text, result = analyze_resume_file(
+            resume.file.path, content_hash or resume.content_hash or None,
+            text=resume.extracted_text, use_cache=use_cache
+        )
+    except Exception as e:
+        logger.exception("Analysis job %s failed", analysis_id)
+        text, result = None, {"error": "Something went wrong during analysis."}
+
+    changed = remember_on_resume(resume, text, result)
+    if changed:
+        resume.save(update_fields=changed)
+
+    if "error" in result:
+        analysis.status = "failed"
+        analysis.error_message = result["error"]
+        with span("db_write"):
+            analysis.save(update_fields=["status", "error_message"])
+        analysis.retry_after = result.get("retry_after")  # not stored; lets the view answer 503
+        return analysis
+
+    for field, value in analysis_fields(result).items():
+        setattr(analysis, field, value)
+    analysis.status = "completed"
+    analysis.error_message = None
+    with span("db_write"):
+        analysis.save()
+    return analysis
+
+
+def _run_in_worker(fn, *args):
+    # Worker threads own their DB connections; don't leak them between jobs
+    close_old_connections()
+    try:
+        return fn(*args)
+    finally:
+        close_old_connections()
+
+
+def _submit_on_commit(fn, *args):
+    # A worker that starts before the request's transaction commits can't see the row yet
+    transaction.on_commit(lambda: get_executor().submit(_run_in_worker, fn, *args))
+
+
+def submit_analysis_job(analysis_id, content_hash=None, use_cache=True):
+    """Run the job in the background once the transaction commits, or inline when ANALYSIS_ASYNC is off"""
+    if not getattr(settings, "ANALYSIS_ASYNC", True):
+        return run_analysis_job(analysis_id, content_hash, use_cache)
+    _submit_on_commit(run_analysis_job, analysis_id, content_hash, use_cache)
+
+
+def submit_batch_job(batch, entries):
+    """Run a ResumeBatch in the background once the transaction commits, or inline when ANALYSIS_ASYNC is off"""
+    if not getattr(settings, "ANALYSIS_ASYNC", True):
+        return run_batch(entries, batch=batch)
+    _submit_on_commit(run_batch, entries, batch)
+
+
+def run_match_job(match_id, extra=None):
+    """Score a `processing` JobMatch's resumes against its JD; `extra` is merged into the result"""
+    match = JobMatch.objects.select_related("job_description").get(pk=match_id)
+    try:
+        resumes = list(Resume.objects.filter(pk__in=match.resume_ids))
+        ranked, summary = match_resumes(match.job_description, resumes)
+        match.result = {**summary, **(extra or {}), "results": ranked}
+        match.status = "completed"
+    except Exception:
+        logger.exception("Match job %s failed", match_id)
+        match.status = "failed"
+        match.error_message = "Something went wrong during matching."
+    match.finished_at = timezone.now()
+    with span("db_write"):
+        match.save()
+    return match
+
+
+def submit_match_job(match_id, extra=None):
+    """Run a JobMatch in the background once the transaction commits"""
+    _submit_on_commit(run_match_job, match_id, extra)
+
+
+def fail_if_stale(job):
+    """
+    Mark a ResumeAnalysis, ResumeBatch or JobMatch that has been `processing`
+    for more than ANALYSIS_STALE_AFTER seconds as failed: its worker died with
+    the process (a restart or deploy) and nothing else will ever finish it.
+    """
+    stale_after = getattr(settings, "ANALYSIS_STALE_AFTER", 900)
+    if job.status != "processing" or not stale_after:
+        return job
+    started = job.upload_date if isinstance(job, ResumeAnalysis) else job.created_at
+    if started > timezone.now() - timedelta(seconds=stale_after):
+        return job
+
+    logger.warning("%s %s has been processing since %s; marking it failed", type(job).__name__, job.pk, started)
+    job.status = "failed"
+    fields = ["status"]
+    if hasattr(job, "error_message"):
+        job.error_message = STALE_ERROR
+        fields.append("error_message")
+    if hasattr(job, "finished_at"):
+        job.finished_at = timezone.now()
+        fields.append("finished_at")
+    job.save(update_fields=fields)
+    return job
@@ -0,0 +1,264 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .metrics import LLM_RESPONSES, timed
+from .ratelimit import RateLimitExceeded, get_limiter
+from .recording import ReplayMiss, get_store, kept_headers, llm_mode, request_key
+from .stub_llm import Faults, canned_response
+
+try:
+    import httpx
+except ImportError:  # only the async views need it
+    httpx = None
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+# httpx clients are bound to the event loop that created them
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_session():
+    """Process-wide keep-alive session shared by every LLM provider"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=_setting("LLM_POOL_HOSTS", 4),
+                    pool_maxsize=_setting("LLM_POOL_SIZE", 16),
+                    pool_block=_setting("LLM_POOL_BLOCK", True),
+                    max_retries=0,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Connection": "keep-alive"})
+                _session = session
+    return _session
+
+
+def provider_url(name, default):
+    """A provider's endpoint; LLM_PROVIDER_URLS overrides it, e.g. with a local stub server"""
+    return _setting("LLM_PROVIDER_URLS", {}).get(name) or default
+
+
+def get_timeout():
+    """(connect, read) timeout applied to every outbound LLM request"""
+    return (_setting("LLM_CONNECT_TIMEOUT", 5), _setting("LLM_READ_TIMEOUT", 30))
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, honouring Retry-After when the provider sends one"""
+    if retry_after is not None:
+        return min(retry_after, _setting("LLM_RETRY_MAX_DELAY", 8))
+    ceiling = min(_setting("LLM_RETRY_MAX_DELAY", 8), _setting("LLM_RETRY_BASE_DELAY", 0.5) * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _replay(payload):
+    """
+    (delay, (status, headers, body)) answering `payload` from the recordings,
+    with LLM_REPLAY_* latency and errors injected. Unrecorded requests get
+    the stub's canned analysis with LLM_REPLAY_FALLBACK, else ReplayMiss.
+    """
+    faults = Faults(
+        latency=_setting("LLM_REPLAY_LATENCY", 0.0),
+        jitter=_setting("LLM_REPLAY_JITTER", 0.0),
+        error_rate=_setting("LLM_REPLAY_ERROR_RATE", 0.0),
+        error_status=_setting("LLM_REPLAY_ERROR_STATUS", 503),
+    )
+    failure = faults.error()
+    if failure is not None:
+        return faults.delay(), failure
+    key = request_key(payload)
+    record = get_store().get(key)
+    if record is not None:
+        return faults.delay(), (record["status"], record["headers"], record["body"])
+    if _setting("LLM_REPLAY_FALLBACK", False):
+        return faults.delay(), canned_response(payload)
+    raise ReplayMiss(f"No recorded LLM response for request {key[:12]}")
+
+
+def _replayed_response(url, status, headers, body):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response._content_consumed = True  # iter_lines() serves the body from memory
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+def _send(url, payload, headers, timeout, stream):
+    """One POST, live, recorded or replayed depending on LLM_MODE"""
+    mode = llm_mode()
+    if mode == "replay":
+        delay, (status, response_headers, body) = _replay(payload)
+        if delay:
+            time.sleep(delay)
+        return _replayed_response(url, status, response_headers, body)
+
+    response = get_session().post(url, json=payload, headers=headers, timeout=timeout, stream=stream)
+    if mode == "record" and response.status_code == 200:
+        # Reading .content ends a stream early; the body is then replayed from memory
+        get_store().put(request_key(payload), 200, kept_headers(response.headers), response.content, url)
+    return response
+
+
+async def _send_async(client, url, payload, headers):
+    mode = llm_mode()
+    if mode == "replay":
+        delay, (status, response_headers, body) = _replay(payload)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(status, headers=response_headers, content=body, request=httpx.Request("POST", url))
+
+    response = await client.post(url, json=payload, headers=headers)
+    if mode == "record" and response.status_code == 200:
+        await asyncio.to_thread(
+            get_store().put, request_key(payload), 200, kept_headers(response.headers), response.content, url
+        )
+    return response
+
+
+def check_rate_limited(response):
+    """Raise RateLimitExceeded for a 429 that outlasted the retries"""
+    if response.status_code == 429:
+        raise RateLimitExceeded(_retry_after(response) or _setting("LLM_RETRY_BASE_DELAY", 0.5))
+
+
+def _release_when_done(response, release):
+    """
+    Call `release` once a streamed response's body has been read to the
+    end or the response is closed (or, failing both, garbage collected).
+    """
+    close, iter_content = response.close, response.iter_content
+
+    def releasing_close():
+        try:
+            close()
+        finally:
+            release()
+
+    def releasing_iter_content(*args, **kwargs):
+        try:
+            yield from iter_content(*args, **kwargs)
+        finally:
+            release()
+
+    response.close = releasing_close
+    response.iter_content = releasing_iter_content  # iter_lines() reads through this too
+    weakref.finalize(response, release)
+    return response
+
+
+@timed("llm_wait")
+def post_json(url, payload, headers=None, timeout=None, stream=False):
+    """
+    POST a JSON body through the pooled session.
+
+    Every attempt waits for the host's rate limiter (see ratelimit.py),
+    which raises RateLimitExceeded after LLM_RATE_MAX_WAIT seconds; a 429
+    pauses the limiter for every caller. Connection errors and
+    RETRY_STATUSES are retried up to LLM_MAX_RETRIES times. Read timeouts
+    are not retried: a slow completion would otherwise multiply the
+    worst-case latency. The last response is returned as-is;
+    with stream=True its body has not been read yet, and it keeps its
+    limiter slot until the body is exhausted or the response is closed.
+    """
+    retries = _setting("LLM_MAX_RETRIES", 2)
+    limiter = get_limiter(url)
+    for attempt in range(retries + 1):
+        try:
+            with ExitStack() as slot:
+                slot.enter_context(limiter.acquire())
+                response = _send(url, payload, headers, timeout or get_timeout(), stream)
+                if stream:
+                    # The upstream is still sending: hand the slot over to the response
+                    _release_when_done(response, slot.pop_all().close)
+        except requests.ConnectionError:
+            if attempt == retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        LLM_RESPONSES.inc(host=urlsplit(url).netloc, status=response.status_code)
+        if response.status_code == 429:
+            limiter.pause(backoff_delay(attempt, _retry_after(response)))
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+        response.close()
+        time.sleep(backoff_delay(attempt, _retry_after(response)))
+
+
+
+def get_async_client():
+    """Keep-alive httpx.AsyncClient for the running event loop"""
+    if httpx is None:
+        raise ImproperlyConfigured("The async LLM views require httpx (pip install httpx).")
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        connect, read = get_timeout()
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(
+                max_connections=_setting("LLM_ASYNC_MAX_CONNECTIONS", 200),
+                max_keepalive_connections=_setting("LLM_POOL_SIZE", 16),
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+@timed("llm_wait")
+async def async_post_json(url, payload, headers=None):
+    """post_json for coroutines: same retry policy, awaits instead of blocking a thread"""
+    retries = _setting("LLM_MAX_RETRIES", 2)
+    client = get_async_client()
+    limiter = get_limiter(url)
+    for attempt in range(retries + 1):
+        try:
+            async with limiter.acquire_async():
+                response = await _send_async(client, url, payload, headers)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        LLM_RESPONSES.inc(host=urlsplit(url).netloc, status=response.status_code)
+        if response.status_code == 429:
+            limiter.pause(backoff_delay(attempt, _retry_after(response)))
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+        await asyncio.sleep(backoff_delay(attempt, _retry_after(response)))
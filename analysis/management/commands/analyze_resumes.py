@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.batch import BatchEntry, run_batch
+from analysis.cache import hash_file
+from analysis.models import ResumeBatch
+
+
+class Command(BaseCommand):
+    help = "Analyze every PDF in a directory with bounded LLM concurrency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Concurrent LLM calls (default: BATCH_LLM_CONCURRENCY)")
+        parser.add_argument("--recursive", action="store_true", help="Descend into subdirectories")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many files")
+
+    def handle(self, *args, **options):
+        directory = Path(options["directory"])
+        if not directory.is_dir():
+            raise CommandError(f"{directory} is not a directory")
+
+        pattern = "**/*.pdf" if options["recursive"] else "*.pdf"
+        paths = sorted(p for p in directory.glob(pattern) if p.is_file())[:options["limit"]]
+        if not paths:
+            raise CommandError(f"No PDF files found in {directory}")
+
+        entries = [BatchEntry(p.name, str(p), hash_file(p), None) for p in paths]
+        self.stdout.write(f"Analyzing {len(entries)} files...")
+
+        batch = ResumeBatch.objects.create()
+        summary = run_batch(entries, batch=batch, max_workers=options["workers"])
+
+        self.stdout.write(
+            f"{summary['unique_files']} unique of {summary['total_files']} files "
+            f"({summary['duplicates']} duplicates skipped), {summary['failed_files']} failed"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {summary['seconds']}s: {summary['resumes_per_minute']} resumes/min"
+        ))
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from analysis.cache import hash_file
+from analysis.models import Resume
+from analysis.pdf_pool import extract_pdf_text
+
+
+class Command(BaseCommand):
+    help = "Register PDFs under resumes/ as Resume rows and store their extracted text and hash"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="PDFs extracted concurrently")
+        parser.add_argument("--force", action="store_true", help="Re-extract text that is already stored")
+
+    def handle(self, *args, **options):
+        media_root = Path(settings.MEDIA_ROOT or ".")
+        upload_dir = Resume._meta.get_field("file").upload_to
+
+        # ✅ Files on disk that no Resume row points at yet
+        known = set(Resume.objects.values_list("file", flat=True))
+        orphans = [
+            Resume(file=path.relative_to(media_root).as_posix())
+            for path in sorted((media_root / upload_dir).glob("*.pdf"))
+            if path.relative_to(media_root).as_posix() not in known
+        ]
+        Resume.objects.bulk_create(orphans, batch_size=500)
+        self.stdout.write(f"Registered {len(orphans)} untracked files")
+
+        resumes = Resume.objects.all() if options["force"] else Resume.objects.filter(extracted_text="")
+        resumes = [r for r in resumes if Path(r.file.path).is_file()]
+
+        def backfill(resume):
+            resume.content_hash = hash_file(resume.file.path)
+            resume.extracted_text = extract_pdf_text(resume.file.path) or ""
+            return resume
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            resumes = list(pool.map(backfill, resumes))
+
+        # content_hash is unique: a second copy of the same bytes keeps an empty hash
+        owners = dict(Resume.objects.exclude(content_hash="").values_list("content_hash", "pk"))
+        for resume in resumes:
+            if owners.setdefault(resume.content_hash, resume.pk) != resume.pk:
+                resume.content_hash = ""
+
+        Resume.objects.bulk_update(resumes, ["content_hash", "extracted_text"], batch_size=500)
+        empty = sum(1 for r in resumes if not r.extracted_text)
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored text for {len(resumes) - empty} resumes ({empty} without readable text)"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from analysis.skill_index import backfill
+
+
+class Command(BaseCommand):
+    help = "Write skill postings (SkillTerm/AnalysisSkill) for every analysis with skills_match"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Analyses per transaction")
+
+    def handle(self, *args, **options):
+        total = backfill(chunk_size=options["chunk_size"], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} skill postings"))
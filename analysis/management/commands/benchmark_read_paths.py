@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from analysis.benchmarks import benchmark_read_paths, scratch_database, seed_analyses, seeded_rows
+
+
+class Command(BaseCommand):
+    help = "Time the ResumeAnalysis read paths on a synthetic table, in a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic rows to seed")
+        parser.add_argument("--repeat", type=int, default=50, help="Timed runs per query")
+        parser.add_argument("--explain", action="store_true", help="Include query plans")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database and its rows for the next run")
+
+    def handle(self, *args, **options):
+        with scratch_database(keepdb=options["keepdb"]) as name:
+            existing = seeded_rows().count()  # left by an earlier --keepdb run
+            if options["rows"] > existing:
+                self.stderr.write(f"Seeding {options['rows'] - existing} rows into {name}...")
+                seed_analyses(options["rows"] - existing, start=existing)
+            results = benchmark_read_paths(repeat=options["repeat"], explain=options["explain"])
+        self.stdout.write(json.dumps(results, indent=2))
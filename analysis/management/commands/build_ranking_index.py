@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analysis.ranking import build_index, reset_index, save_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the local resume ranking index from extracted resume text and save it to RANKING_INDEX_PATH"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        index = build_index()
+        save_index(index)
+        reset_index()  # the next request in this process reloads the saved copy
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index)} resumes ({len(index.postings)} terms) in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.benchmarks import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent throughput of running deployments, e.g. "
+        "--target wsgi=http://127.0.0.1:8000/api/match-resume-jd/ "
+        "--target asgi=http://127.0.0.1:8001/api/async/match-resume-jd/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", action="append", required=True, metavar="NAME=URL")
+        parser.add_argument("--resume", required=True, help="Resume file sent as 'resume' (and as 'file')")
+        parser.add_argument("--jd", help="Job description file sent as 'jd'")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            targets = dict(target.split("=", 1) for target in options["target"])
+        except ValueError:
+            raise CommandError("Targets must look like NAME=URL")
+
+        resume = Path(options["resume"])
+        files = {"resume": (resume.name, resume.read_bytes()), "file": (resume.name, resume.read_bytes())}
+        if options["jd"]:
+            jd = Path(options["jd"])
+            files["jd"] = (jd.name, jd.read_bytes())
+
+        results = {}
+        for name, url in targets.items():
+            self.stderr.write(f"{name}: {options['requests']} requests, {options['concurrency']} concurrent...")
+            results[name] = run_load(url, files, options["requests"], options["concurrency"])
+
+        self.stdout.write(json.dumps(results, indent=2))
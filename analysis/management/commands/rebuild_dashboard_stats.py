@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analysis.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily dashboard rollup from every ResumeAnalysis row"
+
+    def handle(self, *args, **options):
+        days = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt dashboard stats for {days} days"))
@@ -0,0 +1,81 @@
+import json
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.benchmarks import compare_results, run_suite, scratch_database
+
+SECTIONS = ("extraction", "prompt", "upload", "db")
+DB_SECTIONS = ("upload", "db")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark extraction, prompt building, end-to-end uploads (against a local stub LLM) and "
+        "DB reads on synthetic tables; writes JSON and optionally compares it with a baseline run. "
+        "Uploads and seeding run in a throwaway test database, never the configured one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", default=str(Path(settings.BASE_DIR) / "resumes"), help="Directory of PDFs")
+        parser.add_argument("--only", default=",".join(SECTIONS), help=f"Comma-separated sections: {', '.join(SECTIONS)}")
+        parser.add_argument("--limit", type=int, help="Use only the first N corpus files")
+        parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus for prompt building")
+        parser.add_argument("--stub-latency", type=float, default=500, help="Stub LLM latency in ms")
+        parser.add_argument("--stub-jitter", type=float, default=0, help="Extra random stub latency, up to N ms")
+        parser.add_argument("--rows", default="10000,100000,1000000", help="Synthetic table sizes for DB reads")
+        parser.add_argument("--read-repeat", type=int, default=50, help="Timed runs per read query/endpoint")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic rows")
+        parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+        parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+        parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+        parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero on regressions")
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the test database between runs")
+
+    def handle(self, *args, **options):
+        sections = [section.strip() for section in options["only"].split(",") if section.strip()]
+        unknown = set(sections) - set(SECTIONS)
+        if unknown:
+            raise CommandError(f"Unknown sections: {', '.join(sorted(unknown))}")
+        try:
+            sizes = [int(size) for size in options["rows"].split(",") if size.strip()]
+        except ValueError:
+            raise CommandError("--rows must be comma-separated integers")
+
+        baseline = None
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+
+        self.stderr.write(f"Running {', '.join(sections)} benchmarks...")
+        needs_db = any(section in DB_SECTIONS for section in sections)
+        with scratch_database(keepdb=options["keepdb"]) if needs_db else nullcontext():
+            results = run_suite(
+                options["corpus"],
+                sections=sections,
+                limit=options["limit"],
+                repeat=options["repeat"],
+                stub_latency=options["stub_latency"] / 1000,
+                stub_jitter=options["stub_jitter"] / 1000,
+                sizes=sizes,
+                read_repeat=options["read_repeat"],
+                seed=options["seed"],
+            )
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n")
+            self.stderr.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if baseline is None:
+            return
+        regressions = compare_results(baseline, results, options["threshold"])
+        for name, old, new, change in regressions:
+            self.stderr.write(self.style.WARNING(f"{name}: {old} -> {new} ({change:+}%)"))
+        if not regressions:
+            self.stderr.write(self.style.SUCCESS(f"No regressions over {options['threshold']}%"))
+        elif options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regressions over {options['threshold']}%")
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from analysis.recording import get_store
+from analysis.stub_llm import StubLLMServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve an OpenAI-compatible stub LLM for offline load tests: recorded responses "
+        "(LLM_MODE=record) are replayed by request hash, everything else gets a canned analysis. "
+        "Point the app at it with OPENROUTER_URL=http://HOST:PORT/v1/chat/completions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8090)
+        parser.add_argument("--latency", type=float, default=0, help="Delay per response in ms")
+        parser.add_argument("--jitter", type=float, default=0, help="Extra random delay, up to N ms")
+        parser.add_argument("--error-rate", type=float, default=0, help="Share of requests that fail (0-1)")
+        parser.add_argument("--error-status", type=int, default=503, help="Status of injected failures")
+        parser.add_argument("--recordings", default=settings.LLM_RECORDINGS_DIR, help="Recorded responses")
+        parser.add_argument("--no-fallback", action="store_true", help="404 for requests that were not recorded")
+
+    def handle(self, *args, **options):
+        store = get_store(options["recordings"])
+        stub = StubLLMServer(
+            latency=options["latency"] / 1000,
+            jitter=options["jitter"] / 1000,
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            host=options["host"],
+            port=options["port"],
+            store=store,
+            fallback=not options["no_fallback"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Stub LLM on {stub.url} ({len(store)} recorded responses in {options['recordings']})"
+        ))
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stub.server.server_close()
+            self.stdout.write(f"Served {stub.requests} requests, {stub.replayed} from recordings")
@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.prompting import token_report, tokenizer_name
+from analysis.resume_analysis import PROMPT_TEXT_LIMIT, PROMPT_TOKEN_BUDGET, extract_text_from_pdf
+
+
+class Command(BaseCommand):
+    help = "Report prompt tokens saved by resume text compaction across a directory of PDFs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", nargs="?", default=str(Path(settings.BASE_DIR) / "resumes"))
+        parser.add_argument("--budget", type=int, default=PROMPT_TOKEN_BUDGET, help="Token budget")
+        parser.add_argument("--json", action="store_true", help="Print the per-file report as JSON")
+
+    def handle(self, *args, **options):
+        directory = Path(options["directory"])
+        paths = sorted(p for p in directory.glob("*.pdf") if p.is_file())
+        if not paths:
+            raise CommandError(f"No PDF files found in {directory}")
+
+        rows = []
+        for path in paths:
+            text = extract_text_from_pdf(str(path), max_chars=PROMPT_TEXT_LIMIT)
+            if text:
+                rows.append({"file": path.name, **token_report(text, options["budget"], PROMPT_TEXT_LIMIT)})
+
+        before = sum(row["tokens_before"] for row in rows)
+        after = sum(row["tokens_after"] for row in rows)
+        summary = {
+            "files": len(rows),
+            "unreadable": len(paths) - len(rows),
+            "tokenizer": tokenizer_name(),
+            "budget": options["budget"],
+            "tokens_before": before,
+            "tokens_after": after,
+            "saved_pct": round((before - after) / before * 100, 1) if before else 0.0,
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"summary": summary, "files": rows}, indent=2))
+            return
+
+        for row in rows:
+            self.stdout.write(
+                f"{row['file']:<40} {row['tokens_before']:>6} -> {row['tokens_after']:>6} "
+                f"({row['saved_pct']}% saved)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['files']} resumes: {before} -> {after} tokens ({summary['saved_pct']}% saved, "
+            f"{summary['tokenizer']})"
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0007_resumeanalysis_resume_error_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('completed', 'Completed'), ('processing', 'Processing'), ('failed', 'Failed')], default='processing', max_length=20)),
+                ('total_files', models.IntegerField(default=0)),
+                ('unique_files', models.IntegerField(default=0)),
+                ('failed_files', models.IntegerField(default=0)),
+                ('resumes_per_minute', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='analyses', to='analysis.resumebatch'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0009_resume_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAnalysisStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total', models.IntegerField(default=0)),
+                ('ats_sum', models.BigIntegerField(default=0)),
+                ('ats_count', models.IntegerField(default=0)),
+                ('clarity_sum', models.BigIntegerField(default=0)),
+                ('clarity_count', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('processing', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
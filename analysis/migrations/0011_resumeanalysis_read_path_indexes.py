@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0010_dailyanalysisstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resumeanalysis',
+            index=models.Index(fields=['-upload_date'], name='analysis_upload_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumeanalysis',
+            index=models.Index(fields=['status', '-upload_date'], name='analysis_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumeanalysis',
+            index=models.Index(fields=['file_name'], name='analysis_file_name_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0012_jobdescription'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AnalysisSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('technical', 'Technical'), ('soft', 'Soft'), ('tools', 'Tools'), ('other', 'Other')], default='other', max_length=20)),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_postings', to='analysis.resumeanalysis')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='analysis.skillterm')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('term', 'analysis'), name='analysis_skill_term_analysis_uniq')],
+            },
+        ),
+    ]
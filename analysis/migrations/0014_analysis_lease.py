@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0013_skill_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=128, unique=True)),
+                ('owner', models.CharField(max_length=32)),
+                ('expires_at', models.DateTimeField()),
+                ('result', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+def clear_duplicate_hashes(apps, schema_editor):
+    # Keep the hash on the oldest copy of each file; later copies keep their rows and files
+    Resume = apps.get_model('analysis', 'Resume')
+    seen = set()
+    duplicates = []
+    for pk, content_hash in Resume.objects.exclude(content_hash='').order_by('pk').values_list('pk', 'content_hash'):
+        if content_hash in seen:
+            duplicates.append(pk)
+        seen.add(content_hash)
+    Resume.objects.filter(pk__in=duplicates).update(content_hash='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0016_job_match'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_hashes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='resume',
+            constraint=models.UniqueConstraint(condition=models.Q(('content_hash', ''), _negated=True), fields=('content_hash',), name='resume_content_hash_unique'),
+        ),
+    ]
@@ -6,9 +6,17 @@ from django.db import models
 class Resume(models.Model):
     file = models.FileField(upload_to='resumes/')
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     extracted_text = models.TextField(blank=True)
     analysis_result = models.JSONField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            # one stored copy per file content; rows that were never hashed keep ''
+            models.UniqueConstraint(fields=['content_hash'], condition=~models.Q(content_hash=''),
+                                    name='resume_content_hash_unique'),
+        ]
+
     def __str__(self):
         return self.file.name
 
@@ -74,5 +82,144 @@ class ResumeAnalysis(models.Model):
     trend = models.CharField(max_length=20, default='neutral')
     previous_score = models.IntegerField(default=0)
 
+    resume = models.ForeignKey(Resume, null=True, blank=True, on_delete=models.SET_NULL, related_name='analyses')
+    error_message = models.TextField(null=True, blank=True)
+    batch = models.ForeignKey('ResumeBatch', null=True, blank=True, on_delete=models.SET_NULL, related_name='analyses')
+
+    class Meta:
+        indexes = [
+            # latest/current/recent analyses and the default list ordering
+            models.Index(fields=['-upload_date'], name='analysis_upload_date_idx'),
+            # ?status=... filtered lists, already in display order
+            models.Index(fields=['status', '-upload_date'], name='analysis_status_date_idx'),
+            # prefix matches (?file_name__istartswith=) on file names; LIKE 'x%' can use a B-tree index
+            models.Index(fields=['file_name'], name='analysis_file_name_idx'),
+        ]
+
+    # Fields the rollup and skill-index signals diff against (see analysis/signals.py)
+    TRACKED_FIELDS = ('upload_date', 'ats_score', 'clarity_score', 'status', 'skills_match')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_saved_values()
+        return instance
+
+    def remember_saved_values(self):
+        """
+        Note the tracked fields as they are in the DB, so the next save needn't
+        SELECT them. Only references are kept (nothing is copied), so rows that
+        are loaded and never saved pay next to nothing.
+        """
+        self._saved_values = {name: self.__dict__[name] for name in self.TRACKED_FIELDS if name in self.__dict__}
+
     def __str__(self):
         return self.file_name
+
+
+class ResumeBatch(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=ResumeAnalysis.STATUS_CHOICES, default='processing')
+
+    total_files = models.IntegerField(default=0)
+    unique_files = models.IntegerField(default=0)
+    failed_files = models.IntegerField(default=0)
+    resumes_per_minute = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Batch {self.pk} ({self.unique_files}/{self.total_files} unique)"
+
+
+class JobDescription(models.Model):
+    """An uploaded JD, kept so it can be matched against many resumes without re-parsing"""
+    title = models.CharField(max_length=255, blank=True)
+    text = models.TextField()
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    keywords = models.JSONField(default=list, blank=True)
+    required_skills = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title or f"Job description {self.pk}"
+
+
+class JobMatch(models.Model):
+    """A job description scored against many resumes in the background (see JobDescriptionViewSet.match)"""
+    job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name='matches')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=ResumeAnalysis.STATUS_CHOICES, default='processing')
+    resume_ids = models.JSONField(default=list)
+    result = models.JSONField(null=True, blank=True)
+    error_message = models.TextField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Match {self.pk} of {self.job_description_id}"
+
+
+class SkillTerm(models.Model):
+    """A canonical skill name ("kubernetes" for "K8s", "k8s", "Kubernetes ")"""
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class AnalysisSkill(models.Model):
+    """Posting: one canonical skill found in one analysis' skills_match (see analysis/skill_index.py)"""
+    CATEGORY_CHOICES = [('technical', 'Technical'), ('soft', 'Soft'), ('tools', 'Tools'), ('other', 'Other')]
+
+    term = models.ForeignKey(SkillTerm, on_delete=models.CASCADE, related_name='postings')
+    analysis = models.ForeignKey(ResumeAnalysis, on_delete=models.CASCADE, related_name='skill_postings')
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='other')
+
+    class Meta:
+        constraints = [
+            # also the (term -> analyses) lookup index; the FK indexes analysis -> terms
+            models.UniqueConstraint(fields=['term', 'analysis'], name='analysis_skill_term_analysis_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.term_id} in {self.analysis_id}"
+
+
+class DailyAnalysisStats(models.Model):
+    """Per-day rollup of ResumeAnalysis rows, maintained by analysis/rollups.py"""
+    date = models.DateField(unique=True)
+    total = models.IntegerField(default=0)
+
+    ats_sum = models.BigIntegerField(default=0)
+    ats_count = models.IntegerField(default=0)
+    clarity_sum = models.BigIntegerField(default=0)
+    clarity_count = models.IntegerField(default=0)
+
+    completed = models.IntegerField(default=0)
+    processing = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date}: {self.total}"
+
+
+class DataVersion(models.Model):
+    """Counter bumped on every write to a table, so cached responses know they are stale (see analysis/response_cache.py)"""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class AnalysisLease(models.Model):
+    """
+    Cross-process single-flight: the worker holding the lease on `key` runs
+    the analysis, the others poll until it publishes `result` (see analysis/singleflight.py)
+    """
+    key = models.CharField(max_length=128, unique=True)
+    owner = models.CharField(max_length=32)
+    expires_at = models.DateTimeField()
+    result = models.JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class AnalysisCursorPagination(CursorPagination):
+    """
+    Keyset pagination for /api/analyses/, newest first.
+
+    Pages seek on upload_date (indexed) instead of OFFSET, so page N costs the
+    same as page 1. id breaks ties between rows uploaded in the same instant.
+    """
+    ordering = ('-upload_date', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
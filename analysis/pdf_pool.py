@@ -0,0 +1,156 @@
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from PyPDF2 import PdfReader
+
+from .metrics import timed
+from .prompting import PAGE_BREAK
+from .resume_analysis import PDF_MAX_PAGES, PROMPT_TEXT_LIMIT, extract_text_from_pdf, iter_pdf_pages
+
+try:
+    import resource
+except ImportError:  # Windows: no RLIMIT_AS, workers run uncapped
+    resource = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+logger = logging.getLogger(__name__)
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _init_worker(memory_limit):
+    if resource is not None and memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _as_source(source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _extract(source, max_chars, max_pages):
+    return extract_text_from_pdf(_as_source(source), max_chars=max_chars, max_pages=max_pages)
+
+
+def _page_count(source):
+    return len(PdfReader(_as_source(source)).pages)
+
+
+def _extract_range(source, start, count):
+    return PAGE_BREAK.join(iter_pdf_pages(_as_source(source), max_pages=count, start=start))
+
+
+def get_pool():
+    """Process pool that keeps PyPDF2's CPU work off the request threads"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                memory_mb = _setting("PDF_WORKER_MEMORY_MB", 512)
+                _pool = ProcessPoolExecutor(
+                    max_workers=_setting("PDF_POOL_WORKERS", 2),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(memory_mb * 1024 * 1024,),
+                    max_tasks_per_child=_setting("PDF_POOL_MAX_TASKS", 100),
+                )
+    return _pool
+
+
+def _reset_pool(pool=None):
+    """
+    Kill every worker of `pool` (the current one by default); a document
+    that blew its timeout may still be spinning. A pool that was already
+    replaced is left alone, so one hung document recycles the pool once.
+    """
+    global _pool
+    with _pool_lock:
+        if pool is None:
+            pool = _pool
+        if pool is None or pool is not _pool:
+            return
+        _pool = None
+    for process in list(getattr(pool, "_processes", {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _collect(calls, retries=1):
+    """
+    Run `calls` ([(fn, *args)]) in the pool under one shared deadline;
+    their results, or None if any of them fails.
+
+    Killing a hung worker breaks the whole ProcessPoolExecutor, so calls
+    that were merely in flight next to it are resubmitted (`retries`
+    times) to the fresh pool instead of failing with it.
+    """
+    pool = get_pool()
+    try:
+        try:
+            futures = [pool.submit(fn, *args) for fn, *args in calls]
+        except RuntimeError:  # shut down by another caller since get_pool()
+            raise BrokenProcessPool("pool was shut down")
+        done, pending = wait(futures, timeout=_setting("PDF_EXTRACTION_TIMEOUT", 20))
+        if pending:
+            logger.warning("PDF extraction timed out")
+            _reset_pool(pool)
+            return None
+        return [future.result() for future in futures]
+    except (BrokenProcessPool, CancelledError) as e:
+        _reset_pool(pool)
+        if retries:
+            logger.info("PDF pool was recycled under this extraction (%s); resubmitting", type(e).__name__)
+            return _collect(calls, retries - 1)
+        logger.warning("PDF extraction worker died (memory limit?)")
+    except Exception as e:
+        logger.warning("PDF extraction failed: %s", e)
+    return None
+
+
+def _run(fn, *args):
+    results = _collect([(fn, *args)])
+    return results[0] if results else None
+
+
+@timed("pdf_extraction")
+def extract_pdf_text(source, max_chars=PROMPT_TEXT_LIMIT, max_pages=None):
+    """
+    Extract PDF text (path or bytes) in the process pool.
+
+    Returns None on unreadable, timed-out or over-memory documents, like
+    extract_text_from_pdf. With PDF_POOL_WORKERS = 0 extraction runs inline.
+    Documents longer than PDF_FANOUT_PAGES are split into page ranges that
+    are extracted in parallel.
+    """
+    if not _setting("PDF_POOL_WORKERS", 2):
+        return extract_text_from_pdf(_as_source(source), max_chars=max_chars, max_pages=max_pages)
+
+    fanout_pages = _setting("PDF_FANOUT_PAGES", 0)
+    if not fanout_pages:
+        return _run(_extract, source, max_chars, max_pages)
+
+    page_count = _run(_page_count, source)
+    if page_count is None:
+        return None
+    page_count = min(page_count, max_pages or PDF_MAX_PAGES)
+    if page_count <= fanout_pages:
+        return _run(_extract, source, max_chars, max_pages)
+
+    # Every range worker re-parses the document; the split pays off on long PDFs only
+    parts = _collect([
+        (_extract_range, source, start, min(fanout_pages, page_count - start))
+        for start in range(0, page_count, fanout_pages)
+    ])
+    if parts is None:
+        return None
+
+    text = PAGE_BREAK.join(part for part in parts if part)
+    return (text[:max_chars] if max_chars else text).strip()
@@ -0,0 +1,133 @@
+import logging
+
+from django.db import IntegrityError, transaction
+
+from .cache import analysis_cache, hash_bytes, normalize_text, prompt_version
+from .metrics import span
+from .models import Resume
+from .pdf_pool import extract_pdf_text
+from .providers import analyze_resume, analyze_resume_async
+from .singleflight import single_flight, single_flight_async
+
+logger = logging.getLogger(__name__)
+
+
+def flight_key(text, content_hash=None):
+    """Single-flight key: the uploaded bytes' hash, else the normalized text's, per prompt version"""
+    if content_hash:
+        return f"bytes:{prompt_version()}:{content_hash}"
+    return f"text:{prompt_version()}:{hash_bytes(normalize_text(text).encode('utf-8'))}"
+
+
+def _analyze_and_store(text, content_hash, result):
+    logger.debug("Analysis result: %s", result)
+    if "error" not in result:
+        analysis_cache.store(result, content_hash=content_hash, text=text)
+    return result
+
+
+def analyze_text(text, content_hash=None, use_cache=True, leases=True):
+    """
+    Analyze already-extracted resume text, going through analysis_cache.
+    Concurrent requests for the same resume share one LLM call (see
+    analysis/singleflight.py); use_cache=False always makes its own, and
+    leases=False coalesces within this process only, without DB access.
+    """
+    if not use_cache:
+        return _analyze_and_store(text, content_hash, analyze_resume(text))
+
+    result = analysis_cache.get_by_text(text)
+    if result is None:
+        # Stored inside the flight, so a request arriving as it lands finds the cache
+        result = single_flight(
+            flight_key(text, content_hash),
+            lambda: _analyze_and_store(text, content_hash, analyze_resume(text)),
+            leases=leases,
+        )
+    return _analyze_and_store(text, content_hash, result)
+
+
+async def analyze_text_async(text, content_hash=None, use_cache=True):
+    """analyze_text for async views"""
+    async def analyze():
+        return _analyze_and_store(text, content_hash, await analyze_resume_async(text))
+
+    if not use_cache:
+        return await analyze()
+
+    result = analysis_cache.get_by_text(text)
+    if result is None:
+        result = await single_flight_async(flight_key(text, content_hash), analyze)
+    return _analyze_and_store(text, content_hash, result)
+
+
+def analyze_resume_file(path, content_hash=None, text=None, use_cache=True, leases=True):
+    """
+    Extract text from a stored PDF (unless `text` is given) and analyze it.
+
+    Returns (text, result). `text` is None when the bytes were already in
+    analysis_cache and nothing had to be extracted.
+    """
+    if content_hash and use_cache:
+        result = analysis_cache.get_by_content(content_hash)
+        if result is not None:
+            return text, result
+
+    if not text:
+        text = extract_pdf_text(path)
+    if not text or not text.strip():
+        return None, {"error": "No readable text found in resume."}
+
+    return text, analyze_text(text, content_hash, use_cache, leases)
+
+
+def store_resume(uploaded_file, content_hash):
+    """The Resume holding these bytes, saving the upload only if it is new"""
+    resume = Resume.objects.filter(content_hash=content_hash).first()
+    if resume is not None:
+        return resume
+    resume = Resume(file=uploaded_file, content_hash=content_hash)
+    try:
+        with span("file_save"), transaction.atomic():
+            resume.save()
+    except IntegrityError:
+        # A concurrent upload of the same bytes got there first: use its row and drop our copy
+        resume.file.delete(save=False)
+        resume = Resume.objects.get(content_hash=content_hash)
+    return resume
+
+
+def get_resume_text(resume):
+    """Extracted text of a stored Resume; the PDF is parsed only the first time"""
+    if not resume.extracted_text:
+        text = extract_pdf_text(resume.file.path)
+        if text:
+            resume.extracted_text = text
+            resume.save(update_fields=["extracted_text"])
+    return resume.extracted_text
+
+
+def remember_on_resume(resume, text, result):
+    """Copy extracted text and a successful result onto the Resume; returns changed fields"""
+    changed = []
+    if text and not resume.extracted_text:
+        resume.extracted_text = text
+        changed.append("extracted_text")
+    if "error" not in result:
+        resume.analysis_result = result
+        changed.append("analysis_result")
+    return changed
+
+
+def analysis_fields(result):
+    """Map an LLM result onto ResumeAnalysis fields"""
+    return {
+        "ats_score": result.get("ats_score"),
+        "clarity_score": result.get("clarity_score"),
+        "experience": result.get("experience"),
+        "education": result.get("education"),
+        "skills_match": result.get("skills"),
+        "strengths": result.get("strengths"),
+        "weaknesses": result.get("weaknesses"),
+        "job_matches": result.get("job_matches"),
+    }
@@ -0,0 +1,162 @@
+import logging
+import re
+
+try:
+    import tiktoken
+except ImportError:  # token counts fall back to estimate_tokens()
+    tiktoken = None
+
+# Separator between pages in extracted PDF text (see resume_analysis.extract_text_from_pdf)
+PAGE_BREAK = "\f"
+
+# Bump when compact_resume_text() changes what it sends, so cached analyses are dropped
+COMPACTION_VERSION = 2
+
+SECTION_HEADINGS = frozenset("""
+summary profile objective about experience employment work history projects project education
+skills technical skills certifications certificates achievements awards publications languages
+interests hobbies activities leadership volunteering internships internship courses coursework
+references contact strengths tools
+""".split())
+
+PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+# A page number at the end of a running header/footer: "Jane Doe - Page 2 of 3"
+PAGE_FOOTER_RE = re.compile(r"\bpage\s*\d+(\s*(of|/)\s*\d+)?\s*$", re.IGNORECASE)
+CAPS_HEADING_RE = re.compile(r"[A-Z][A-Z&/ ]{3,39}")
+HORIZONTAL_SPACE_RE = re.compile(r"[^\S\n\f]+")
+_encoding = None
+
+logger = logging.getLogger(__name__)
+
+
+def _get_encoding():
+    """cl100k_base, or None when tiktoken is missing or cannot load it (it downloads on first use)"""
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.info("tiktoken unavailable, estimating tokens: %s", e)
+    return _encoding or None
+
+
+def estimate_tokens(text):
+    """
+    BPE-like estimate: a token per short word, symbol, line break or run of
+    spaces, and more for long words
+    """
+    return sum(1 + len(piece) // 8 for piece in re.findall(r"\w+|[^\w\s]|\n|[^\S\n]{2,}", text))
+
+
+def count_tokens(text):
+    """Tokens in `text`, with tiktoken's cl100k_base when available"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+def tokenizer_name():
+    return "tiktoken cl100k_base" if _get_encoding() is not None else "estimate"
+
+
+def _line_key(line):
+    # "Jane Doe - Page 2" and "Jane Doe - Page 3" are the same footer; other numbers still count
+    return PAGE_FOOTER_RE.sub("page #", line.lower())
+
+
+def _is_heading(line):
+    words = line.strip(" :|-")
+    return words.lower() in SECTION_HEADINGS or bool(CAPS_HEADING_RE.fullmatch(words))
+
+
+def split_pages(text):
+    """Pages of extracted text as lists of whitespace-normalized, non-empty lines"""
+    pages = []
+    for page in text.replace("\r", "\n").split(PAGE_BREAK):
+        lines = (HORIZONTAL_SPACE_RE.sub(" ", line).strip() for line in page.split("\n"))
+        pages.append([line for line in lines if line])
+    return [page for page in pages if page]
+
+
+def clean_lines(text):
+    """
+    Lines of the resume in order, without page numbers, repeated page
+    headers/footers (kept once, where they first appear) or duplicate lines.
+    """
+    seen = set()
+    lines = []
+    for page in split_pages(text):
+        for line in page:
+            if PAGE_NUMBER_RE.match(line):
+                continue
+            key = _line_key(line)
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(line)
+    return lines
+
+
+def split_sections(lines):
+    """[[heading line, body lines...], ...]; text before the first heading is its own section"""
+    sections = [[]]
+    for line in lines:
+        if _is_heading(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return [section for section in sections if section]
+
+
+def fit_to_budget(sections, max_tokens):
+    """
+    Trim sections to about max_tokens in total, keeping every section in its
+    original order. The budget is shared max-min fairly: sections smaller
+    than an equal share stay whole and the long ones split the rest, keeping
+    their leading lines, so a long experience section cannot crowd out skills.
+    """
+    costs = [[count_tokens(line) + 1 for line in section] for section in sections]
+    totals = [sum(cost) for cost in costs]
+    if sum(totals) <= max_tokens:
+        return sections
+
+    allowances = [0] * len(sections)
+    remaining = max_tokens
+    by_size = sorted(range(len(sections)), key=lambda i: totals[i])
+    for position, i in enumerate(by_size):
+        allowances[i] = min(totals[i], remaining / (len(sections) - position))
+        remaining -= allowances[i]
+
+    trimmed = []
+    for section, cost, allowance in zip(sections, costs, allowances):
+        kept, used = [], 0
+        for line, line_cost in zip(section, cost):
+            if kept and used + line_cost > allowance:
+                break
+            kept.append(line)
+            used += line_cost
+        trimmed.append(kept)
+    return trimmed
+
+
+def compact_resume_text(text, max_tokens=3500):
+    """Resume text as sent to the LLM: cleaned, deduplicated and trimmed to max_tokens"""
+    sections = fit_to_budget(split_sections(clean_lines(text or "")), max_tokens)
+    return "\n".join(line for section in sections for line in section)
+
+
+def token_report(text, max_tokens=3500, char_limit=15000):
+    """Tokens of the old character-capped prompt text vs. the compacted text"""
+    before = count_tokens(text[:char_limit])
+    after = count_tokens(compact_resume_text(text, max_tokens))
+    return {
+        "chars": len(text),
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved": before - after,
+        "saved_pct": round((before - after) / before * 100, 1) if before else 0.0,
+    }
@@ -0,0 +1,430 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import resume_analysis, utils
+from .llm_client import OPENROUTER_URL, async_post_json, post_json
+
+SKILL_GROUPS = ("technical", "soft", "tools")
+LIST_FIELDS = ("strengths", "weaknesses", "missing_keywords")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _score(value):
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    return str(value)
+
+
+def _list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if item]
+    return [str(value)]
+
+
+def normalize_result(result, provider):
+    """
+    Map a provider's JSON onto the common analysis schema: integer scores
+    in 0-100, text experience/education, skills split into technical/soft/
+    tools lists, and the provider's name. Error dicts pass through.
+    """
+    if "error" in result:
+        return {**result, "provider": provider}
+
+    skills = result.get("skills")
+    if not isinstance(skills, dict):
+        skills = {"technical": skills}  # Mixtral returns one flat list
+    normalized = {
+        "ats_score": _score(result.get("ats_score")),
+        "clarity_score": _score(result.get("clarity_score")),
+        "experience": _text(result.get("experience")),
+        "education": _text(result.get("education")),
+        "skills": {group: _list(skills.get(group)) for group in SKILL_GROUPS},
+        **{field: _list(result.get(field)) for field in LIST_FIELDS},
+    }
+    if "job_matches" in result:
+        normalized["job_matches"] = result["job_matches"]
+    normalized["provider"] = provider
+    return normalized
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds; then lets one trial call through
+    (half-open), closing again on success and re-opening on failure.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def release_trial(self):
+        """End a half-open trial that neither succeeded nor failed (e.g. it was rate limited)"""
+        with self._lock:
+            self._trial = False
+
+
+class LatencyTracker:
+    """Recent successful call durations (seconds) with an EWMA for routing"""
+
+    def __init__(self, window=100, alpha=0.2):
+        self.samples = deque(maxlen=window)
+        self.alpha = alpha
+        self.ewma = None
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+            self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def percentile(self, pct, min_samples=5):
+        with self._lock:
+            samples = sorted(self.samples)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))]
+
+    def stats(self):
+        with self._lock:
+            samples = list(self.samples)
+        return {
+            "samples": len(samples),
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "p50_ms": round(statistics.median(samples) * 1000, 1) if samples else None,
+            "p95_ms": round(self.percentile(95, 1) * 1000, 1) if samples else None,
+        }
+
+
+class Provider:
+    """One LLM backend: builds its request, parses its response into the common schema"""
+
+    name = None
+    default_url = None
+
+    def __init__(self, url=None):
+        self.url = url or self.default_url
+        self.breaker = CircuitBreaker(
+            failure_threshold=_setting("LLM_BREAKER_FAILURES", 5),
+            reset_timeout=_setting("LLM_BREAKER_RESET", 30.0),
+        )
+        self.latency = LatencyTracker(window=_setting("LLM_LATENCY_WINDOW", 100))
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def model_fingerprint(cls):
+        """The model and prompt template this provider's answers depend on"""
+        raise NotImplementedError
+
+    def build_request(self, text):
+        raise NotImplementedError
+
+    def parse_response(self, response):
+        raise NotImplementedError
+
+    def analyze(self, text):
+        headers, body = self.build_request(text)
+        started = time.monotonic()
+        try:
+            result = self.parse_response(post_json(self.url, body, headers=headers))
+        except Exception as e:
+            result = resume_analysis.analysis_error(e)
+        return self._record(normalize_result(result, self.name), time.monotonic() - started)
+
+    async def analyze_async(self, text):
+        headers, body = self.build_request(text)
+        started = time.monotonic()
+        try:
+            result = self.parse_response(await async_post_json(self.url, body, headers=headers))
+        except Exception as e:
+            result = resume_analysis.analysis_error(e)
+        return self._record(normalize_result(result, self.name), time.monotonic() - started)
+
+    def _record(self, result, elapsed):
+        self.calls += 1
+        if "retry_after" in result:
+            self.errors += 1  # rate limited: back-pressure, not a reason to open the circuit
+            self.breaker.release_trial()  # ...but a half-open breaker may try again
+        elif "error" in result:
+            self.errors += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            self.latency.add(elapsed)
+        return result
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "url": self.url,
+            "state": self.breaker.state,
+            "calls": self.calls,
+            "errors": self.errors,
+            **self.latency.stats(),
+        }
+
+
+class OpenRouterProvider(Provider):
+    name = "openrouter"
+    default_url = OPENROUTER_URL
+
+    @classmethod
+    def model_fingerprint(cls):
+        return f"{resume_analysis.OPENROUTER_MODEL}\n{resume_analysis.RESUME_ANALYSIS_PROMPT}"
+
+    def build_request(self, text):
+        return resume_analysis.build_analysis_request(text)
+
+    def parse_response(self, response):
+        return resume_analysis.parse_analysis_response(response)
+
+
+class HuggingFaceProvider(Provider):
+    name = "huggingface"
+    default_url = utils.huggingface_url()
+
+    @classmethod
+    def model_fingerprint(cls):
+        return f"{utils.HF_MODEL}\n{utils.HF_PROMPT}"
+
+    def build_request(self, text):
+        return utils.build_huggingface_request(text)
+
+    def parse_response(self, response):
+        return utils.parse_huggingface_response(response)
+
+
+PROVIDERS = {provider.name: provider for provider in (OpenRouterProvider, HuggingFaceProvider)}
+
+
+class ProviderRouter:
+    """
+    Send each analysis to the healthy provider with the lowest recent latency.
+
+    Providers whose circuit is open are skipped and failures fall through to
+    the next provider. With `hedge` on, a second provider is started when the
+    first has not answered within its own p95 latency (`hedge_delay` until
+    enough samples exist), and whichever succeeds first wins. The loser is
+    not interrupted once it has started: its request still counts against
+    the rate limiter (and, for sync calls, holds a hedge-pool thread) until
+    the provider answers.
+    """
+
+    def __init__(self, providers, hedge=False, hedge_delay=10.0):
+        self.providers = list(providers)
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._background = set()  # losing async hedges, kept alive until they finish
+
+    def ranked(self):
+        """Providers that are not open-circuited, fastest first; untried ones count as fastest"""
+        usable = [provider for provider in self.providers if provider.breaker.state != "open"]
+        return sorted(usable, key=lambda p: (p.breaker.state == "half-open", p.latency.ewma or 0.0))
+
+    def delay_for(self, provider):
+        return provider.latency.percentile(95) or self.hedge_delay
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=_setting("LLM_POOL_SIZE", 16), thread_name_prefix="llm-hedge"
+                    )
+        return self._executor
+
+    @staticmethod
+    def _unavailable(provider):
+        return {"error": f"Provider {provider.name} is unavailable (circuit open).", "provider": provider.name}
+
+    def _call(self, provider, text):
+        return provider.analyze(text) if provider.breaker.allow() else self._unavailable(provider)
+
+    async def _call_async(self, provider, text):
+        return await provider.analyze_async(text) if provider.breaker.allow() else self._unavailable(provider)
+
+    def analyze(self, text):
+        ordered = self.ranked()
+        if not ordered:
+            return {"error": "All LLM providers are unavailable."}
+
+        remaining = ordered
+        result = None
+        if self.hedge and len(ordered) > 1:
+            pool = self._get_executor()
+            first = pool.submit(self._call, ordered[0], text)
+            try:
+                result = first.result(timeout=self.delay_for(ordered[0]))
+                remaining = ordered[1:]
+            except FutureTimeout:
+                second = pool.submit(self._call, ordered[1], text)
+                for future in as_completed([first, second]):
+                    result = future.result()
+                    if "error" not in result:
+                        # A loser still queued for a pool thread is dropped; one already
+                        # in flight runs to completion and keeps its rate-limiter charge
+                        for other in (first, second):
+                            other.cancel()
+                        return result
+                remaining = ordered[2:]
+            if "error" not in result:
+                return result
+
+        for provider in remaining:
+            result = self._call(provider, text)
+            if "error" not in result:
+                return result
+        return result
+
+    async def analyze_async(self, text):
+        ordered = self.ranked()
+        if not ordered:
+            return {"error": "All LLM providers are unavailable."}
+
+        remaining = ordered
+        result = None
+        if self.hedge and len(ordered) > 1:
+            first = asyncio.ensure_future(self._call_async(ordered[0], text))
+            done, _ = await asyncio.wait({first}, timeout=self.delay_for(ordered[0]))
+            if done:
+                result = first.result()
+                remaining = ordered[1:]
+            else:
+                second = asyncio.ensure_future(self._call_async(ordered[1], text))
+                for task in (first, second):
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                for next_done in asyncio.as_completed([first, second]):
+                    result = await next_done
+                    if "error" not in result:
+                        return result
+                remaining = ordered[2:]
+            if "error" not in result:
+                return result
+
+        for provider in remaining:
+            result = await self._call_async(provider, text)
+            if "error" not in result:
+                return result
+        return result
+
+    def stats(self):
+        return {
+            "hedge": self.hedge,
+            "providers": [provider.stats() for provider in self.providers],
+        }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def providers_fingerprint():
+    """LLM_PROVIDERS in order, each with its endpoint, model and prompt (part of the analysis cache key)"""
+    urls = _setting("LLM_PROVIDER_URLS", {})
+    return "\n".join(
+        f"{name} {urls.get(name) or PROVIDERS[name].default_url}\n{PROVIDERS[name].model_fingerprint()}"
+        for name in _setting("LLM_PROVIDERS", ["openrouter"])
+    )
+
+
+def build_router():
+    """ProviderRouter for settings.LLM_PROVIDERS (names, in order of preference)"""
+    urls = _setting("LLM_PROVIDER_URLS", {})
+    names = _setting("LLM_PROVIDERS", ["openrouter"])
+    return ProviderRouter(
+        [PROVIDERS[name](url=urls.get(name)) for name in names],
+        hedge=_setting("LLM_HEDGE", False),
+        hedge_delay=_setting("LLM_HEDGE_DELAY", 10.0),
+    )
+
+
+def get_router():
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = build_router()
+    return _router
+
+
+def reset_router():
+    global _router
+    with _router_lock:
+        _router = None
+
+
+@receiver(setting_changed)
+def _rebuild_router(setting, **kwargs):
+    if setting.startswith(("LLM_PROVIDER", "LLM_HEDGE", "LLM_BREAKER", "LLM_LATENCY")):
+        reset_router()
+
+
+def analyze_resume(text):
+    """Analyze resume text with the configured providers"""
+    return get_router().analyze(text)
+
+
+async def analyze_resume_async(text):
+    return await get_router().analyze_async(text)
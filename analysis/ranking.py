@@ -0,0 +1,385 @@
+import logging
+import math
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .job_descriptions import STOPWORDS, TOKEN_RE
+from .models import Resume, ResumeAnalysis
+
+try:
+    import numpy as np
+except ImportError:  # scoring falls back to plain Python loops
+    np = None
+
+K1 = 1.5
+B = 0.75
+INDEX_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text):
+    return [
+        token for token in (t.lower() for t in TOKEN_RE.findall(text or ""))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def analysis_skills(skills_match):
+    """Lower-cased skill names from a ResumeAnalysis.skills_match value"""
+    if isinstance(skills_match, dict):
+        groups = skills_match.values()
+    elif isinstance(skills_match, list):
+        groups = [skills_match]
+    else:
+        return set()
+    return {str(skill).strip().lower() for group in groups if isinstance(group, list) for skill in group if skill}
+
+
+class ResumeIndex:
+    """
+    BM25 over extracted resume text plus skill overlap with skills_match.
+
+    Resumes are rows; postings map each term to {row: term frequency}, so
+    adding or replacing one resume only touches its own terms. Scoring
+    reads only the postings of the query terms and accumulates them into
+    one score array (vectorized with NumPy when it is installed).
+    """
+
+    def __init__(self):
+        self.version = INDEX_VERSION
+        self.row_of = {}      # resume id -> row
+        self.ids = []         # row -> resume id (None once removed)
+        self.lengths = []     # row -> token count
+        self.terms = []       # row -> Counter of the resume's terms
+        self.skills = []      # row -> set of skills
+        self.postings = {}    # term -> {row: tf}
+        self.skill_postings = {}  # skill -> set of rows
+        self.total_length = 0
+        self.live = 0
+        self.updated_at = None  # set when saved; analyses after it are replayed on load
+
+    def __len__(self):
+        return self.live
+
+    def __contains__(self, resume_id):
+        return resume_id in self.row_of
+
+    def add(self, resume_id, text, skills=()):
+        """Index (or re-index) one resume"""
+        self.remove(resume_id)
+        if len(self.ids) - self.live > max(1000, self.live):
+            self.compact()
+        self._add_terms(resume_id, Counter(tokenize(text)), set(skills))
+
+    def _add_terms(self, resume_id, terms, skills):
+        row = len(self.ids)
+
+        self.row_of[resume_id] = row
+        self.ids.append(resume_id)
+        self.lengths.append(sum(terms.values()))
+        self.terms.append(terms)
+        self.skills.append(skills)
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[row] = tf
+        for skill in skills:
+            self.skill_postings.setdefault(skill, set()).add(row)
+        self.total_length += self.lengths[row]
+        self.live += 1
+
+    def remove(self, resume_id):
+        row = self.row_of.pop(resume_id, None)
+        if row is None:
+            return
+        for term in self.terms[row]:
+            posting = self.postings[term]
+            del posting[row]
+            if not posting:
+                del self.postings[term]
+        for skill in self.skills[row]:
+            rows = self.skill_postings[skill]
+            rows.discard(row)
+            if not rows:
+                del self.skill_postings[skill]
+        self.total_length -= self.lengths[row]
+        self.ids[row], self.lengths[row], self.terms[row], self.skills[row] = None, 0, Counter(), set()
+        self.live -= 1
+
+    def compact(self):
+        """Drop the empty rows left behind by remove()"""
+        rows = [row for row, resume_id in enumerate(self.ids) if resume_id is not None]
+        old = (self.ids, self.terms, self.skills)
+        self.__init__()
+        for row in rows:
+            self._add_terms(old[0][row], old[1][row], old[2][row])
+
+    def rank(self, query, skills=(), top_k=20, candidates=None, skill_weight=None):
+        """
+        [(resume_id, score, bm25, skill_overlap)] best first.
+
+        `score` blends BM25 (normalized to the best hit) with the share of
+        `skills` found in the resume's skills_match. `candidates` restricts
+        the result to those resume ids.
+        """
+        if skill_weight is None:
+            skill_weight = getattr(settings, "RANKING_SKILL_WEIGHT", 0.3)
+        if not self.live:
+            return []
+
+        size = len(self.ids)
+        avgdl = self.total_length / self.live or 1
+        norm = np.asarray(self.lengths, dtype=np.float64) / avgdl if np is not None else avgdl
+        bm25 = self._zeros(size)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting:
+                idf = math.log(1 + (self.live - len(posting) + 0.5) / (len(posting) + 0.5))
+                self._add_bm25(bm25, posting, idf, norm)
+
+        skills = {skill.lower() for skill in skills}
+        overlap = self._zeros(size)
+        for skill in skills:
+            self._add_rows(overlap, self.skill_postings.get(skill, ()))
+
+        if np is not None:
+            best = bm25.max()
+            scores = (1 - skill_weight) * (bm25 / best if best else bm25)
+            if skills:
+                overlap /= len(skills)
+                scores += skill_weight * overlap
+            rows = np.flatnonzero(scores)
+            rows = rows[np.argsort(-scores[rows], kind="stable")]
+            bm25, overlap, scores = bm25.tolist(), overlap.tolist(), scores.tolist()
+        else:
+            best = max(bm25)
+            scores = [
+                (1 - skill_weight) * (b / best if best else b) + (skill_weight * o / len(skills) if skills else 0)
+                for b, o in zip(bm25, overlap)
+            ]
+            overlap = [o / len(skills) if skills else 0 for o in overlap]
+            rows = sorted((row for row in range(size) if scores[row]), key=lambda row: -scores[row])
+
+        if candidates is not None:
+            candidates = set(candidates)
+        ranked = []
+        for row in rows:
+            resume_id = self.ids[row]
+            if resume_id is None or (candidates is not None and resume_id not in candidates):
+                continue
+            ranked.append((resume_id, round(scores[row], 4), round(bm25[row], 4), round(overlap[row], 4)))
+            if top_k and len(ranked) == top_k:
+                break
+        return ranked
+
+    @staticmethod
+    def _zeros(size):
+        return np.zeros(size) if np is not None else [0.0] * size
+
+    def _add_bm25(self, scores, posting, idf, norm):
+        # `norm` is avgdl, or with NumPy the document lengths already divided by it
+        if np is not None:
+            rows = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+            tf = np.fromiter(posting.values(), dtype=np.float64, count=len(posting))
+            scores[rows] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * norm[rows]))
+            return
+        avgdl = norm
+        for row, tf in posting.items():
+            scores[row] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * self.lengths[row] / avgdl))
+
+    @staticmethod
+    def _add_rows(scores, rows):
+        if np is not None:
+            if rows:
+                scores[np.fromiter(rows, dtype=np.int64, count=len(rows))] += 1
+            return
+        for row in rows:
+            scores[row] += 1
+
+
+def latest_skills(resume_ids=None):
+    """{resume id: skills} from each resume's newest completed analysis"""
+    analyses = ResumeAnalysis.objects.filter(status="completed", resume__isnull=False)
+    if resume_ids is not None:
+        analyses = analyses.filter(resume_id__in=resume_ids)
+    skills = {}
+    for resume_id, skills_match in analyses.order_by("resume_id", "-upload_date").values_list("resume_id", "skills_match"):
+        skills.setdefault(resume_id, analysis_skills(skills_match))
+    return skills
+
+
+def add_resumes(index, resume_ids=None):
+    """(Re-)index stored resumes that have extracted text; all of them by default"""
+    skills = latest_skills(resume_ids)
+    resumes = Resume.objects.exclude(extracted_text="")
+    if resume_ids is not None:
+        resumes = resumes.filter(pk__in=resume_ids)
+    added = 0
+    for resume_id, text in resumes.values_list("id", "extracted_text").iterator(chunk_size=2000):
+        index.add(resume_id, text, skills.get(resume_id, ()))
+        added += 1
+    return added
+
+
+def build_index():
+    index = ResumeIndex()
+    add_resumes(index)
+    return index
+
+
+def catch_up(index):
+    """Re-index resumes analyzed since the index was saved (by this or another process)"""
+    if index.updated_at is None:
+        return 0
+    # Jobs finish after their upload_date; replaying an extra hour is cheap
+    since = index.updated_at - timedelta(hours=1)
+    resume_ids = set(
+        ResumeAnalysis.objects.filter(status="completed", resume__isnull=False, upload_date__gte=since)
+        .values_list("resume_id", flat=True)
+    )
+    return add_resumes(index, resume_ids) if resume_ids else 0
+
+
+# --- Process-wide index, persisted to RANKING_INDEX_PATH ---
+
+_index = None
+_index_lock = threading.RLock()
+_saved_at = 0.0
+_save_timer = None
+_save_lock = threading.Lock()
+_write_lock = threading.Lock()  # taken before _index_lock, never while holding it
+
+
+def _index_path():
+    return getattr(settings, "RANKING_INDEX_PATH", "")
+
+
+def load_index(path):
+    with open(path, "rb") as f:
+        index = pickle.load(f)
+    if getattr(index, "version", None) != INDEX_VERSION:
+        raise ValueError("stale ranking index format")
+    return index
+
+
+def save_index(index=None, path=None):
+    """
+    Write the index atomically (temp file + os.replace). Only the pickling
+    holds the index lock; the file is written after it is released.
+    """
+    global _saved_at
+    path = path or _index_path()
+    if not path:
+        return
+    with _write_lock:
+        with _index_lock:
+            index = index if index is not None else _index
+            if index is None:
+                return
+            index.updated_at = timezone.now()
+            data = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+            _saved_at = time.monotonic()
+
+        fd, tmp = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                                   dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def get_index():
+    """The in-memory index: loaded from disk, or built from the DB the first time"""
+    global _index, _saved_at
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                path = _index_path()
+                index = None
+                if path and os.path.exists(path):
+                    try:
+                        index = load_index(path)
+                        catch_up(index)
+                    except Exception as e:
+                        logger.warning("Rebuilding ranking index: %s", e)
+                built = index is None
+                if built:
+                    index = build_index()
+                _index = index
+                _saved_at = time.monotonic()
+                if built:
+                    _index_changed()
+    return _index
+
+
+def reset_index():
+    global _index, _save_timer
+    with _save_lock:
+        if _save_timer is not None:
+            _save_timer.cancel()
+            _save_timer = None
+    with _index_lock:
+        _index = None
+
+
+def index_analyses(analyses):
+    """Add completed analyses' resumes to the loaded index (a no-op until it is first used)"""
+    if _index is None:
+        return
+    with _index_lock:
+        for analysis in analyses:
+            if analysis.status != "completed" or analysis.resume_id is None:
+                continue
+            resume = analysis.resume
+            if resume.extracted_text:
+                _index.add(resume.id, resume.extracted_text, analysis_skills(analysis.skills_match))
+                _index_changed()
+
+
+def _index_changed():
+    """
+    Schedule a save on a timer thread, at most one per RANKING_SAVE_INTERVAL
+    seconds; changes made while one is pending are written with it. A save
+    lost to a crash is harmless: catch_up() adds the missing resumes on load.
+    """
+    global _save_timer
+    if not _index_path():
+        return
+    with _save_lock:
+        if _save_timer is not None:
+            return
+        interval = getattr(settings, "RANKING_SAVE_INTERVAL", 30)
+        _save_timer = threading.Timer(max(0.0, interval - (time.monotonic() - _saved_at)), _save_pending)
+        _save_timer.daemon = True
+        _save_timer.start()
+
+
+def _save_pending():
+    global _save_timer
+    with _save_lock:
+        _save_timer = None  # changes from here on schedule the next save
+    try:
+        save_index()
+    except Exception:
+        logger.exception("Could not save the ranking index")
+
+
+def rank_resumes(query, skills=(), top_k=20, candidates=None):
+    index = get_index()
+    with _index_lock:
+        if candidates is not None:
+            # Resumes whose text was extracted after the index was built
+            missing = [resume_id for resume_id in candidates if resume_id not in index]
+            if missing and add_resumes(index, missing):
+                _index_changed()
+        return index.rank(query, skills, top_k=top_k, candidates=candidates)
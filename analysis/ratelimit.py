@@ -0,0 +1,283 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .metrics import span
+
+try:
+    import fcntl
+except ImportError:  # no cross-process limits on Windows
+    fcntl = None
+
+
+class RateLimitExceeded(Exception):
+    """No request slot became free within LLM_RATE_MAX_WAIT seconds"""
+
+    def __init__(self, retry_after):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"LLM rate limit reached, retry in {self.retry_after}s")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class TokenBucket:
+    """
+    `rate` requests per second with bursts of up to `burst`.
+
+    Callers reserve a token and sleep until it is due, so waiting requests
+    are released in arrival order at exactly `rate` instead of polling.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait):
+        """Seconds to sleep before sending, or raise RateLimitExceeded if that exceeds max_wait"""
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                raise RateLimitExceeded(wait)
+            self.tokens -= 1
+            return wait
+
+    def pause(self, seconds):
+        """Hold every caller back for `seconds`, e.g. after the provider answered 429"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class FileTokenBucket:
+    """TokenBucket whose state lives in a flock()ed file, shared by every worker process"""
+
+    def __init__(self, rate, burst, path):
+        if fcntl is None:
+            raise ImproperlyConfigured("LLM_RATE_LIMIT_DIR needs fcntl (POSIX) file locks.")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.path = path
+
+    @contextmanager
+    def _state(self):
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read())
+                except ValueError:
+                    state = {"tokens": float(self.burst), "updated": time.time()}
+                now = time.time()
+                state["tokens"] = min(self.burst, state["tokens"] + max(0.0, now - state["updated"]) * self.rate)
+                state["updated"] = now
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def reserve(self, max_wait):
+        with self._state() as state:
+            wait = max(0.0, (1 - state["tokens"]) / self.rate)
+            if wait > max_wait:
+                raise RateLimitExceeded(wait)
+            state["tokens"] -= 1
+            return wait
+
+    def pause(self, seconds):
+        with self._state() as state:
+            state["tokens"] = min(state["tokens"], 0.0) - seconds * self.rate
+
+
+class Slots:
+    """At most `size` requests in flight in this process"""
+
+    def __init__(self, size):
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    # acquire()/try_acquire() return a token for release(), or None
+    def acquire(self, timeout):
+        return True if self._semaphore.acquire(timeout=max(0.0, timeout)) else None
+
+    def try_acquire(self):
+        return True if self._semaphore.acquire(blocking=False) else None
+
+    def release(self, token):
+        self._semaphore.release()
+
+
+class FileSlots:
+    """
+    At most `size` requests in flight across processes: one lock file per
+    slot, held with flock() for the duration of the request. The kernel
+    drops the lock if a worker dies, so slots never leak.
+    """
+
+    def __init__(self, size, prefix):
+        if fcntl is None:
+            raise ImproperlyConfigured("LLM_RATE_LIMIT_DIR needs fcntl (POSIX) file locks.")
+        self.paths = [f"{prefix}.slot{i}" for i in range(size)]
+
+    def try_acquire(self):
+        for path in self.paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            fd = self.try_acquire()
+            if fd is not None or time.monotonic() >= deadline:
+                return fd
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, 0.1)
+
+    def release(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class Limiter:
+    """Token bucket + concurrency cap in front of one LLM host"""
+
+    def __init__(self, bucket, slots, max_wait):
+        self.bucket = bucket
+        self.slots = slots
+        self.max_wait = max_wait
+
+    @contextmanager
+    def acquire(self):
+        with span("llm_queue"):
+            token = self._wait()
+        try:
+            yield
+        finally:
+            if self.slots is not None:
+                self.slots.release(token)
+
+    def _wait(self):
+        started = time.monotonic()
+        if self.bucket is not None:
+            wait = self.bucket.reserve(self.max_wait)
+            if wait:
+                time.sleep(wait)
+        if self.slots is None:
+            return None
+        token = self.slots.acquire(self.max_wait - (time.monotonic() - started))
+        if token is None:
+            raise RateLimitExceeded(self.max_wait)
+        return token
+
+    @asynccontextmanager
+    async def acquire_async(self):
+        with span("llm_queue"):
+            token = await self._wait_async()
+        try:
+            yield
+        finally:
+            if self.slots is not None:
+                self.slots.release(token)
+
+    async def _wait_async(self):
+        started = time.monotonic()
+        if self.bucket is not None:
+            wait = self.bucket.reserve(self.max_wait)
+            if wait:
+                await asyncio.sleep(wait)
+        token = None
+        if self.slots is not None:
+            delay = 0.005
+            while True:
+                token = self.slots.try_acquire()
+                if token is not None:
+                    break
+                remaining = self.max_wait - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise RateLimitExceeded(self.max_wait)
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.1)
+        return token
+
+    def pause(self, seconds):
+        if self.bucket is not None:
+            self.bucket.pause(seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def build_limiter(host):
+    """
+    Limiter for one host from LLM_RATE_LIMIT (requests/second, 0 = off),
+    LLM_RATE_BURST, LLM_MAX_CONCURRENCY (0 = off) and LLM_RATE_MAX_WAIT.
+    With LLM_RATE_LIMIT_DIR set the limits are shared through lock files
+    there by every process on the machine.
+    """
+    rate = _setting("LLM_RATE_LIMIT", 0)
+    burst = _setting("LLM_RATE_BURST", 1)
+    size = _setting("LLM_MAX_CONCURRENCY", 0)
+    directory = _setting("LLM_RATE_LIMIT_DIR", "")
+
+    prefix = os.path.join(directory, "llm-" + "".join(c if c.isalnum() else "_" for c in host)) if directory else None
+    if rate:
+        bucket = FileTokenBucket(rate, burst, prefix + ".bucket") if prefix else TokenBucket(rate, burst)
+    else:
+        bucket = None
+    if size:
+        slots = FileSlots(size, prefix) if prefix else Slots(size)
+    else:
+        slots = None
+    return Limiter(bucket, slots, _setting("LLM_RATE_MAX_WAIT", 30))
+
+
+def get_limiter(url):
+    """The process-wide Limiter for the host of `url`"""
+    host = urlsplit(url).netloc
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                limiter = _limiters[host] = build_limiter(host)
+    return limiter
+
+
+def reset_limiters():
+    with _limiters_lock:
+        _limiters.clear()
+
+
+@receiver(setting_changed)
+def _rebuild_limiters(setting, **kwargs):
+    if setting.startswith("LLM_RATE_") or setting == "LLM_MAX_CONCURRENCY":
+        reset_limiters()
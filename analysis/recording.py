@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+
+MODES = ("live", "record", "replay")
+
+
+class ReplayMiss(LookupError):
+    """LLM_MODE=replay and no response was recorded for this request"""
+
+
+def llm_mode():
+    mode = getattr(settings, "LLM_MODE", "live")
+    if mode not in MODES:
+        raise ValueError(f"LLM_MODE must be one of {', '.join(MODES)}, not {mode!r}")
+    return mode
+
+
+def request_key(payload):
+    """
+    Hash of a request body, independent of key order and of the host it is
+    sent to, so recordings made against OpenRouter replay against a stub.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RecordingStore:
+    """
+    Recorded provider responses, one JSON file per request hash under
+    `directory` (fanned out by the first two hex digits), with the most
+    recently used ones kept in memory.
+    """
+
+    def __init__(self, directory, max_entries=1024):
+        from .cache import LRUCache  # cache imports resume_analysis, which imports the LLM client
+
+        self.directory = directory
+        self._memory = LRUCache(max_entries)
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        record = self._memory.get(key)
+        if record is None:
+            try:
+                with open(self.path(key), encoding="utf-8") as f:
+                    record = json.load(f)
+            except FileNotFoundError:
+                return None
+            record["body"] = base64.b64decode(record["body"])
+            self._memory.set(key, record)
+        return record
+
+    def put(self, key, status, headers, body, url=""):
+        record = {"url": url, "status": status, "headers": headers, "body": body}
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({**record, "body": base64.b64encode(body).decode("ascii")}, f)
+        os.replace(tmp, path)
+        self._memory.set(key, record)
+
+    def __len__(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(
+            1 for shard in os.scandir(self.directory) if shard.is_dir()
+            for entry in os.scandir(shard.path) if entry.name.endswith(".json")
+        )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory=None):
+    """The RecordingStore for `directory` (settings.LLM_RECORDINGS_DIR by default)"""
+    directory = directory or settings.LLM_RECORDINGS_DIR
+    store = _stores.get(directory)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(directory, RecordingStore(directory))
+    return store
+
+
+# Only these response headers are worth keeping: the rest describe the original connection
+KEPT_HEADERS = ("content-type", "retry-after")
+
+
+def kept_headers(headers):
+    return {name: value for name, value in headers.items() if name.lower() in KEPT_HEADERS}
@@ -0,0 +1,95 @@
+import functools
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from .cache import LRUCache
+from .models import DataVersion
+
+# Bumped on every ResumeAnalysis write (see analysis/signals.py)
+ANALYSES = "analyses"
+
+_versions = {}  # name -> (version, monotonic time it was read)
+_responses = LRUCache(max_entries=64)
+
+
+def _forget(name):
+    _versions.pop(name, None)
+
+
+def bump_version(name=ANALYSES):
+    """Mark every response derived from `name` stale, in this process and (through the DB) in the others"""
+    if not DataVersion.objects.filter(name=name).update(version=F("version") + 1):
+        try:
+            with transaction.atomic():
+                # Start from the clock, so a flushed or restored database never
+                # hands out a version some process still has responses cached for
+                DataVersion.objects.create(name=name, version=int(time.time() * 1000))
+        except IntegrityError:
+            DataVersion.objects.filter(name=name).update(version=F("version") + 1)
+    _forget(name)
+    transaction.on_commit(lambda: _forget(name))  # a read before the commit saw the old version
+
+
+def current_version(name=ANALYSES):
+    """
+    The version of `name`: one primary-key lookup, or none at all for
+    RESPONSE_CACHE_VERSION_TTL seconds after the last one (writes in other
+    processes then show up that much later).
+    """
+    ttl = getattr(settings, "RESPONSE_CACHE_VERSION_TTL", 0)
+    now = time.monotonic()
+    cached = _versions.get(name)
+    if ttl and cached is not None and now - cached[1] < ttl:
+        return cached[0]
+    version = DataVersion.objects.filter(name=name).values_list("version", flat=True).first() or 0
+    _versions[name] = (version, now)
+    return version
+
+
+def _matches(request, etag):
+    # GZipMiddleware weakens ETags, so compare them weakly
+    wanted = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    return "*" in wanted or etag in (tag.removeprefix("W/") for tag in wanted)
+
+
+def cached_response(endpoint, vary=None):
+    """
+    Cache a GET view's response in-process until the ResumeAnalysis version
+    changes, and answer If-None-Match with 304 Not Modified. `vary(request)`
+    adds whatever else the response depends on (e.g. today's date) to the key.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, "RESPONSE_CACHE", True):
+                return view(request, *args, **kwargs)
+
+            version = current_version(ANALYSES)
+            extra = vary(request) if vary else ""
+            etag = f'"{endpoint}-{version}{"-" + extra if extra else ""}"'
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if _matches(request, etag):
+                return Response(status=304, headers=headers)
+
+            key = (endpoint, extra, version)
+            cached = _responses.get(key)
+            if cached is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code >= 500:
+                    return response
+                cached = (response.status_code, response.data)
+                _responses.set(key, cached)
+            status, data = cached
+            return Response(data, status=status, headers=headers)
+        return wrapper
+    return decorator
+
+
+def clear():
+    _versions.clear()
+    _responses.clear()
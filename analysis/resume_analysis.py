@@ -1,33 +1,61 @@
 from PyPDF2 import PdfReader
-import requests
 import json
+import logging
 import re
+from itertools import islice
 from dotenv import load_dotenv
 import os
 
+from .metrics import timed
+from .llm_client import OPENROUTER_URL, async_post_json, check_rate_limited, post_json, provider_url
+from .prompting import PAGE_BREAK, compact_resume_text
+from .ratelimit import RateLimitExceeded
+from .streaming import iter_sse_data
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # OpenRouter Configuration
 OPENROUTER_API_KEY = os.getenv("OR_API_KEY")
-OPENROUTER_MODEL = "meta-llama/llama-3-70b-instruct"
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3-70b-instruct")
+
+# Characters of resume text extracted for the LLM (an upper bound before compaction)
+PROMPT_TEXT_LIMIT = 15000
+
+# Tokens of compacted resume text sent to the LLM (see prompting.compact_resume_text)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 3500))
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF with error handling"""
+# Pages read from a single PDF; the rest of a pathological upload is ignored
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 20))
+
+def iter_pdf_pages(file_path, max_pages=None, start=0):
+    """Yield the text of each non-empty page, reading at most max_pages pages from start"""
+    reader = PdfReader(file_path)
+    for page in islice(reader.pages, start, start + (max_pages or PDF_MAX_PAGES)):
+        extracted = page.extract_text()
+        if extracted:
+            yield extracted
+
+
+def extract_text_from_pdf(file_path, max_chars=PROMPT_TEXT_LIMIT, max_pages=None):
+    """Extract text from PDF with error handling, stopping once max_chars are collected"""
     try:
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
-        return text.strip()
+        pages = []
+        collected = 0
+        for text in iter_pdf_pages(file_path, max_pages):
+            pages.append(text)
+            collected += len(text) + 1
+            if max_chars and collected >= max_chars:
+                break
+        text = PAGE_BREAK.join(pages)
+        return (text[:max_chars] if max_chars else text).strip()
     except Exception as e:
-        print(f"💥 PDF Extraction Error: {str(e)}")
+        logger.warning("PDF extraction failed: %s", e)
         return None
 
-def analyze_resume_with_llm(text):
-    """Analyze resume using OpenRouter's "meta-llama/llama-3-70b-instruct"with strict scoring"""
-    prompt = f"""
+# analysis_cache is invalidated whenever this template or OPENROUTER_MODEL changes
+RESUME_ANALYSIS_PROMPT = """
 [INST]
 You are a strict resume evaluator used by ResumeWorded and top HR firms.
 
@@ -72,56 +100,185 @@ Evaluate using:
 - Technical + soft skills
 
 📄 Resume:
-{text[:15000]}
+{resume_text}
 [/INST]
 """
 
+
+def openrouter_url():
+    return provider_url("openrouter", OPENROUTER_URL)
+
+
+@timed("prompt_build")
+def build_analysis_request(text):
+    """(headers, body) of the OpenRouter analysis request"""
+    prompt = RESUME_ANALYSIS_PROMPT.format(resume_text=compact_resume_text(text, PROMPT_TOKEN_BUDGET))
+
     headers = {
         "Authorization": f"Bearer {OPENROUTER_API_KEY}",
         "HTTP-Referer": "https://your-resume-analyzer.com",
         "Content-Type": "application/json"
     }
 
+    body = {
+        "model": OPENROUTER_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "response_format": "json",
+        "temperature": 0,   # 🔒 Deterministic output
+        "top_p": 1          # 🔒 No sampling randomness
+    }
+    return headers, body
+
+
+@timed("json_parse")
+def parse_analysis_response(response):
+    """Turn a requests/httpx response into the analysis dict (or {"error": ...})"""
+    logger.debug("OpenRouter status %s", response.status_code)
+    check_rate_limited(response)
+
+    if response.status_code != 200:
+        error_msg = response.json().get("error", {}).get("message", "Unknown error")
+        logger.warning("OpenRouter API error: %s", error_msg)
+        return {"error": f"API Error: {error_msg}"}
+
+    result = response.json()
+    output_text = result["choices"][0]["message"]["content"]
+    logger.debug("Raw LLM output: %s", output_text)
+    return parse_analysis_output(output_text)
+
+
+def parse_analysis_output(output_text):
+    """The analysis dict embedded in the LLM's output text; raises on malformed JSON"""
+    # Extract JSON using regex
+    json_match = re.search(r'\{.*\}', output_text, re.DOTALL)
+    if not json_match:
+        logger.warning("No JSON found in LLM output")
+        return {"error": "Invalid LLM output format"}
+
+    return json.loads(json_match.group())
+
+
+def analysis_error(exc):
+    if isinstance(exc, RateLimitExceeded):
+        logger.warning("Rate limited: %s", exc)
+        return {"error": "The analysis service is busy, please retry shortly.", "retry_after": exc.retry_after}
+    if isinstance(exc, json.JSONDecodeError):
+        logger.warning("Could not parse LLM JSON: %s", exc)
+        return {"error": "Invalid API response format"}
+    logger.error("Analysis failed: %s", exc, exc_info=exc)
+    return {"error": f"Analysis failed: {str(exc)}"}
+
+
+def analyze_resume_with_llm(text):
+    """Analyze resume using OpenRouter's "meta-llama/llama-3-70b-instruct"with strict scoring"""
+    headers, body = build_analysis_request(text)
     try:
-        print("🔁 Sending request to OpenRouter...")
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json={
-                "model": OPENROUTER_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "response_format": "json",
-                "temperature": 0,   # 🔒 Deterministic output
-                "top_p": 1          # 🔒 No sampling randomness
-            },
-            timeout=30
-        )
-
-        print(f"🔍 Status Code: {response.status_code}")
+        logger.debug("Sending request to OpenRouter")
+        response = post_json(openrouter_url(), body, headers=headers)
+        return parse_analysis_response(response)
+    except Exception as e:
+        return analysis_error(e)
 
+
+def stream_resume_analysis_with_llm(text):
+    """
+    Yield the completion text of the analysis request as OpenRouter streams it.
+
+    Raises on HTTP errors; the caller parses the accumulated output.
+    """
+    headers, body = build_analysis_request(text)
+    body["stream"] = True
+
+    logger.debug("Streaming request to OpenRouter")
+    response = post_json(openrouter_url(), body, headers=headers, stream=True)
+    with response:
+        check_rate_limited(response)
         if response.status_code != 200:
             error_msg = response.json().get("error", {}).get("message", "Unknown error")
-            print(f"❌ API Error: {error_msg}")
-            return {"error": f"API Error: {error_msg}"}
+            raise RuntimeError(f"API Error: {error_msg}")
 
-        result = response.json()
-        output_text = result["choices"][0]["message"]["content"]
-        print(f"✅ Raw Output: {output_text}")
+        for data in iter_sse_data(response.iter_lines(decode_unicode=True)):
+            chunk = json.loads(data)
+            if "error" in chunk:
+                raise RuntimeError(f"API Error: {chunk['error'].get('message', 'Unknown error')}")
+            delta = chunk["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
 
-        # Extract JSON using regex
-        json_match = re.search(r'\{.*\}', output_text, re.DOTALL)
-        if not json_match:
-            print("❌ No JSON found in output")
-            return {"error": "Invalid LLM output format"}
 
-        return json.loads(json_match.group())
+JD_MATCH_PROMPT = """
+You are an AI assistant that matches resumes with job descriptions.
+
+Here is the RESUME:
+\"\"\"{resume_text}\"\"\"
+
+Here is the JOB DESCRIPTION:
+\"\"\"{jd_text}\"\"\"
+
+Instructions:
+- Compare the resume and job description.
+- Give a match score from 0 to 100.
+- Suggest 3 improvements to make the resume better match the job description.
+
+Return ONLY a JSON object with this format (and nothing else):
+{{
+  "match_score": 85,
+  "suggestions": [
+    "Add experience with cloud technologies",
+    "Include project management skills",
+    "Highlight familiarity with Docker and Kubernetes"
+  ]
+}}
+""".strip()
+
+
+@timed("prompt_build")
+def build_match_request(resume_text, jd_text):
+    headers = {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    body = {
+        "model": OPENROUTER_MODEL,
+        "temperature": 0,  # 🔐 Deterministic output
+        "messages": [
+            {"role": "user", "content": JD_MATCH_PROMPT.format(
+                resume_text=compact_resume_text(resume_text, PROMPT_TOKEN_BUDGET), jd_text=jd_text
+            )}
+        ]
+    }
+    return headers, body
+
+
+@timed("json_parse")
+def parse_match_response(response):
+    check_rate_limited(response)
+    response.raise_for_status()
+    result = response.json()
+
+    # --- Extract and Parse LLM Response ---
+    content = result["choices"][0]["message"]["content"]
+
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return {
+            "error": "LLM returned non-JSON output",
+            "raw_response": content
+        }
+
+
+def match_resume_with_jd(resume_text, jd_text):
+    """Score a resume against a job description; HTTP errors propagate to the caller"""
+    headers, body = build_match_request(resume_text, jd_text)
+    return parse_match_response(post_json(openrouter_url(), body, headers=headers))
+
+
+async def match_resume_with_jd_async(resume_text, jd_text):
+    headers, body = build_match_request(resume_text, jd_text)
+    return parse_match_response(await async_post_json(openrouter_url(), body, headers=headers))
 
-    except json.JSONDecodeError as jde:
-        print(f"❌ JSON Parsing Error: {str(jde)}")
-        return {"error": "Invalid API response format"}
-    except Exception as e:
-        print(f"💥 Unexpected Error: {str(e)}")
-        return {"error": f"Analysis failed: {str(e)}"}
 
 # Example usage
 # text = extract_text_from_pdf("resume.pdf")
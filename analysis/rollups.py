@@ -0,0 +1,127 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyAnalysisStats, ResumeAnalysis
+from .response_cache import bump_version
+
+ROLLUP_FIELDS = ("total", "ats_sum", "ats_count", "clarity_sum", "clarity_count",
+                 "completed", "processing", "failed")
+STATUS_FIELDS = ("completed", "processing", "failed")
+
+
+def _score(value):
+    # Scores come from the LLM; a malformed one is left out rather than breaking the save
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def contribution(ats_score, clarity_score, status):
+    """What one analysis adds to its day's DailyAnalysisStats row"""
+    ats_score, clarity_score = _score(ats_score), _score(clarity_score)
+    counts = Counter(total=1)
+    if ats_score is not None:
+        counts.update(ats_sum=ats_score, ats_count=1)
+    if clarity_score is not None:
+        counts.update(clarity_sum=clarity_score, clarity_count=1)
+    if status in STATUS_FIELDS:
+        counts[status] += 1
+    return counts
+
+
+def analysis_day(upload_date):
+    return timezone.localdate(upload_date) if timezone.is_aware(upload_date) else upload_date.date()
+
+
+def apply_delta(day, delta):
+    """Add (or subtract) counters on a day's row with F() updates, creating it if needed"""
+    delta = {field: value for field, value in delta.items() if value}
+    if not delta:
+        return
+
+    updates = {field: F(field) + value for field, value in delta.items()}
+    if DailyAnalysisStats.objects.filter(date=day).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DailyAnalysisStats.objects.create(date=day, **delta)
+    except IntegrityError:
+        # Another writer created the row first
+        DailyAnalysisStats.objects.filter(date=day).update(**updates)
+
+
+def record_analyses(analyses, sign=1):
+    """Roll up analyses that bypassed the model signals (e.g. bulk_create)"""
+    per_day = defaultdict(Counter)
+    for analysis in analyses:
+        day = analysis_day(analysis.upload_date or timezone.now())
+        per_day[day].update(contribution(analysis.ats_score, analysis.clarity_score, analysis.status))
+
+    for day, counts in per_day.items():
+        apply_delta(day, {field: sign * value for field, value in counts.items()})
+
+
+def rebuild():
+    """Recompute every day from ResumeAnalysis; for backfills and drift repair"""
+    rows = (
+        ResumeAnalysis.objects
+        .annotate(day=TruncDate("upload_date"))
+        .values("day")
+        .annotate(
+            total=Count("id"),
+            ats_sum=Sum("ats_score"),
+            ats_count=Count("ats_score"),
+            clarity_sum=Sum("clarity_score"),
+            clarity_count=Count("clarity_score"),
+            **{status: Count("id", filter=Q(status=status)) for status in STATUS_FIELDS}
+        )
+    )
+    stats = [
+        DailyAnalysisStats(date=row.pop("day"), **{field: row[field] or 0 for field in ROLLUP_FIELDS})
+        for row in rows
+    ]
+    with transaction.atomic():
+        DailyAnalysisStats.objects.all().delete()
+        DailyAnalysisStats.objects.bulk_create(stats, batch_size=500)
+        bump_version()
+    return len(stats)
+
+
+def summarize(since=None, until=None):
+    """Sum DailyAnalysisStats rows in [since, until): reads one row per day"""
+    rows = DailyAnalysisStats.objects.all()
+    if since is not None:
+        rows = rows.filter(date__gte=since)
+    if until is not None:
+        rows = rows.filter(date__lt=until)
+    totals = rows.aggregate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+    totals = {field: value or 0 for field, value in totals.items()}
+    totals["avg_ats"] = totals["ats_sum"] / totals["ats_count"] if totals["ats_count"] else 0
+    totals["avg_clarity"] = totals["clarity_sum"] / totals["clarity_count"] if totals["clarity_count"] else 0
+    return totals
+
+
+def period_change(current, previous):
+    """Percent change as the dashboard shows it, e.g. '12%' or '-5%'"""
+    if not previous:
+        return "0%" if not current else "100%"
+    return f"{(current - previous) / previous * 100:.0f}%"
+
+
+def dashboard_periods(days=30):
+    """(all-time, current period, previous period) summaries"""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    return (
+        summarize(),
+        summarize(since=start),
+        summarize(since=start - timedelta(days=days), until=start),
+    )
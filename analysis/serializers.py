@@ -16,19 +16,30 @@ class SkillGapSerializer(serializers.ModelSerializer):
         model = Skill
         fields = ['name', 'importance', 'demandScore', 'currentLevel', 'requiredLevel', 'courses']
 
+    def get_user_skill(self, obj):
+        # One UserSkill query per serializer run instead of two per skill
+        user_skills = self.context.get('user_skills')
+        if user_skills is None:
+            user_skills = user_skill_map(self.context['request'].user)
+            self.context['user_skills'] = user_skills
+        return user_skills.get(obj.pk)
+
     def get_currentLevel(self, obj):
-        user = self.context['request'].user
-        skill_record = UserSkill.objects.filter(user=user, skill=obj).first()
+        skill_record = self.get_user_skill(obj)
         return skill_record.current_level if skill_record else 0
 
     def get_requiredLevel(self, obj):
-        user = self.context['request'].user
-        skill_record = UserSkill.objects.filter(user=user, skill=obj).first()
+        skill_record = self.get_user_skill(obj)
         return skill_record.required_level if skill_record else 70  # default required
 
 
+def user_skill_map(user):
+    """{skill_id: UserSkill} for a user; the lowest pk wins, like .first()"""
+    return {record.skill_id: record for record in UserSkill.objects.filter(user=user).order_by('-pk')}
+
+
 from rest_framework import serializers
-from .models import ResumeAnalysis
+from .models import JobDescription, JobMatch, Resume, ResumeAnalysis, ResumeBatch
 
 class ResumeAnalysisSerializer(serializers.ModelSerializer):
     class Meta:
@@ -36,6 +47,40 @@ class ResumeAnalysisSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = [
             'file_name', 'ats_score', 'clarity_score', 'skills_match', 'job_matches',
-            'experience', 'education', 'strengths', 'weaknesses'
+            'experience', 'education', 'strengths', 'weaknesses', 'resume', 'error_message', 'batch'
         ]
 
+
+class ResumeAnalysisListSerializer(serializers.ModelSerializer):
+    """List rows without the large text/JSON columns; full detail is on retrieve"""
+    class Meta:
+        model = ResumeAnalysis
+        fields = [
+            'id', 'file_name', 'upload_date', 'ats_score', 'clarity_score', 'job_matches',
+            'status', 'trend', 'previous_score', 'batch'
+        ]
+        read_only_fields = fields
+
+
+class ResumeBatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumeBatch
+        fields = '__all__'
+
+
+class JobMatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobMatch
+        fields = '__all__'
+
+
+class JobDescriptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobDescription
+        fields = ['id', 'title', 'text', 'content_hash', 'keywords', 'required_skills', 'created_at']
+
+
+class ResumeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Resume
+        fields = ['id', 'file', 'uploaded_at', 'content_hash', 'analysis_result']
@@ -0,0 +1,82 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import ResumeAnalysis
+from .ranking import index_analyses
+from .response_cache import bump_version
+from . import skill_index
+from .rollups import analysis_day, apply_delta, contribution
+
+
+@receiver(pre_save, sender=ResumeAnalysis)
+def remember_rollup_contribution(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Updates (processing -> completed) replace the row's old contribution
+    instance._rollup_before = None
+    instance._skills_before = None
+    if raw or instance.pk is None:
+        return
+    before = getattr(instance, "_saved_values", {})
+    if len(before) < len(ResumeAnalysis.TRACKED_FIELDS):
+        # Not loaded from the DB (or loaded with deferred fields): ask it
+        before = ResumeAnalysis.objects.filter(pk=instance.pk).values(*ResumeAnalysis.TRACKED_FIELDS).first()
+    elif update_fields is not None and "skills_match" not in update_fields:
+        before = {**before, "skills_match": instance.skills_match}  # not written by this save
+    elif instance.skills_match is before["skills_match"] and isinstance(instance.skills_match, (dict, list)):
+        # The loaded object itself, possibly edited in place: only the DB still has the old value
+        stored = ResumeAnalysis.objects.filter(pk=instance.pk).values_list("skills_match", flat=True).first()
+        before = {**before, "skills_match": stored}
+    if before:
+        instance._skills_before = before["skills_match"]
+        instance._rollup_before = (
+            analysis_day(before["upload_date"]),
+            contribution(before["ats_score"], before["clarity_score"], before["status"]),
+        )
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+def update_daily_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    day = analysis_day(instance.upload_date)
+    after = contribution(instance.ats_score, instance.clarity_score, instance.status)
+    before = getattr(instance, "_rollup_before", None)
+
+    if before and before[0] != day:
+        apply_delta(before[0], {field: -value for field, value in before[1].items()})
+        before = None
+    delta = dict(after)
+    if before:
+        for field, value in before[1].items():
+            delta[field] = delta.get(field, 0) - value
+    apply_delta(day, delta)
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+def remember_saved_values(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.remember_saved_values()
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+def update_skill_postings(sender, instance, raw=False, **kwargs):
+    if not raw and instance.skills_match != getattr(instance, "_skills_before", None):
+        skill_index.index_analyses([instance])
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+def update_ranking_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_analyses([instance])
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+@receiver(post_delete, sender=ResumeAnalysis)
+def bump_analyses_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version()
+
+
+@receiver(post_delete, sender=ResumeAnalysis)
+def remove_from_daily_stats(sender, instance, **kwargs):
+    counts = contribution(instance.ats_score, instance.clarity_score, instance.status)
+    apply_delta(analysis_day(instance.upload_date), {field: -value for field, value in counts.items()})
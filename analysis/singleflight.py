@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .metrics import COALESCED
+from .models import AnalysisLease
+
+logger = logging.getLogger(__name__)
+
+# Followers poll a lease held by another process this often, backing off to the max
+LEASE_POLL = 0.1
+LEASE_POLL_MAX = 1.0
+
+
+class _Abandoned(Exception):
+    """The leader was cancelled or interrupted before it had a result"""
+
+
+class SingleFlight:
+    """
+    Concurrent calls for the same key share one execution: the first caller
+    runs it and the rest block (threads) or await (coroutines) its Future.
+    Results are not kept once the call finishes; that is analysis_cache's job.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """(future, True if this caller has to run the call)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                result = future.result()
+            except _Abandoned:
+                continue  # take over
+            COALESCED.inc(scope="thread")
+            return result
+
+        try:
+            result = fn()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._finish(key, future, error=_Abandoned())
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, fn):
+        """do() for a coroutine function `fn`; threads and coroutines share the same calls"""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # shield: a cancelled follower must not cancel the leader's Future
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except _Abandoned:
+                continue
+            COALESCED.inc(scope="thread")
+            return result
+
+        try:
+            result = await fn()
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._finish(key, future, error=_Abandoned())
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def __len__(self):
+        return len(self._calls)
+
+
+flights = SingleFlight()
+
+
+# Cross-process: an AnalysisLease row per key. The owner runs the analysis and
+# publishes the result on the row for ANALYSIS_LEASE_RESULT_TTL seconds; other
+# processes poll it. A lease whose owner died simply expires and is taken over.
+
+def _lease_ttl():
+    return getattr(settings, "ANALYSIS_LEASE_TTL", 180)
+
+
+def acquire_lease(key):
+    """
+    (owner token, None) when this process now holds the lease on `key`,
+    (None, result) when another process published a result for it, and
+    (None, None) while another process is still working on it.
+    """
+    now = timezone.now()
+    owner = uuid.uuid4().hex
+    expires_at = now + timedelta(seconds=_lease_ttl())
+    try:
+        with transaction.atomic():
+            AnalysisLease.objects.create(key=key, owner=owner, expires_at=expires_at)
+        AnalysisLease.objects.filter(expires_at__lt=now).exclude(key=key).delete()
+        return owner, None
+    except IntegrityError:
+        pass
+
+    lease = AnalysisLease.objects.filter(key=key).values("owner", "expires_at", "result").first()
+    if lease is None:
+        return None, None  # released just now; the next poll finds it free
+    if lease["expires_at"] > now:
+        return None, lease["result"]
+
+    # Expired: take it over, unless another process got there first
+    taken = AnalysisLease.objects.filter(key=key, owner=lease["owner"]).update(
+        owner=owner, expires_at=expires_at, result=None
+    )
+    return (owner, None) if taken else (None, None)
+
+
+def publish_lease(key, owner, result):
+    """Hand a successful result to waiting processes; failures just release the lease"""
+    leases = AnalysisLease.objects.filter(key=key, owner=owner)
+    if "error" in result:
+        leases.delete()
+        return
+    result_ttl = getattr(settings, "ANALYSIS_LEASE_RESULT_TTL", 60)
+    leases.update(result=result, expires_at=timezone.now() + timedelta(seconds=result_ttl))
+
+
+def release_lease(key, owner):
+    AnalysisLease.objects.filter(key=key, owner=owner).delete()
+
+
+def run_leased(key, fn):
+    """fn(), unless another process is already running it for `key`: then its result"""
+    deadline = time.monotonic() + _lease_ttl()
+    delay = LEASE_POLL
+    while time.monotonic() < deadline:
+        owner, result = acquire_lease(key)
+        if owner is not None:
+            try:
+                result = fn()
+            except BaseException:
+                release_lease(key, owner)
+                raise
+            publish_lease(key, owner, result)
+            return result
+        if result is not None:
+            COALESCED.inc(scope="process")
+            return result
+        time.sleep(delay)
+        delay = min(delay * 2, LEASE_POLL_MAX)
+
+    logger.warning("Gave up waiting for the lease on %s; analyzing anyway", key)
+    return fn()
+
+
+async def run_leased_async(key, fn):
+    """run_leased() for a coroutine function `fn`"""
+    deadline = time.monotonic() + _lease_ttl()
+    delay = LEASE_POLL
+    while time.monotonic() < deadline:
+        owner, result = await sync_to_async(acquire_lease)(key)
+        if owner is not None:
+            try:
+                result = await fn()
+            except BaseException:
+                await sync_to_async(release_lease)(key, owner)
+                raise
+            await sync_to_async(publish_lease)(key, owner, result)
+            return result
+        if result is not None:
+            COALESCED.inc(scope="process")
+            return result
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, LEASE_POLL_MAX)
+
+    logger.warning("Gave up waiting for the lease on %s; analyzing anyway", key)
+    return await fn()
+
+
+def single_flight(key, fn, leases=True):
+    """
+    fn() run once per `key` at a time: concurrent callers in this process
+    wait for the running call and, with ANALYSIS_LEASE_TTL set, callers in
+    other processes wait for its published result. leases=False keeps it
+    in-process, for callers that must not touch the DB.
+    """
+    if not getattr(settings, "ANALYSIS_SINGLE_FLIGHT", True):
+        return fn()
+    if leases and _lease_ttl() > 0:
+        return flights.do(key, lambda: run_leased(key, fn))
+    return flights.do(key, fn)
+
+
+async def single_flight_async(key, fn):
+    """single_flight() for a coroutine function `fn`"""
+    if not getattr(settings, "ANALYSIS_SINGLE_FLIGHT", True):
+        return await fn()
+    if _lease_ttl() > 0:
+        return await flights.do_async(key, lambda: run_leased_async(key, fn))
+    return await flights.do_async(key, fn)
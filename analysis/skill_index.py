@@ -0,0 +1,163 @@
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import AnalysisSkill, ResumeAnalysis, SkillTerm
+
+# Spelling variants -> canonical name; extend with settings.SKILL_ALIASES
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "ms sql": "sql server",
+    "mssql": "sql server",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "azure cloud": "azure",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "tf": "tensorflow",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "drf": "django rest framework",
+    "ci/cd": "ci-cd",
+    "cicd": "ci-cd",
+    "rest api": "rest",
+    "restful": "rest",
+    "restful apis": "rest",
+    "rest apis": "rest",
+}
+
+CATEGORIES = ("technical", "soft", "tools")
+
+
+def _aliases():
+    extra = getattr(settings, "SKILL_ALIASES", None) or {}
+    return {**SKILL_ALIASES, **{k.lower(): v.lower() for k, v in extra.items()}}
+
+
+def canonical_skill(name):
+    """Lower-cased, whitespace-collapsed, alias-resolved skill name ('' if empty)"""
+    name = re.sub(r"\s+", " ", str(name or "")).strip().strip(".,;:").lower()
+    return _aliases().get(name, name)[:100]
+
+
+def skill_postings(skills_match):
+    """{canonical skill: category} from a ResumeAnalysis.skills_match value"""
+    if isinstance(skills_match, list):
+        skills_match = {"other": skills_match}
+    if not isinstance(skills_match, dict):
+        return {}
+
+    postings = {}
+    for category, skills in skills_match.items():
+        if not isinstance(skills, list):
+            continue
+        category = category if category in CATEGORIES else "other"
+        for skill in skills:
+            name = canonical_skill(skill)
+            if name:
+                postings.setdefault(name, category)
+    return postings
+
+
+def get_terms(names):
+    """{name: SkillTerm id}, creating missing terms"""
+    names = set(names)
+    if not names:
+        return {}
+    terms = dict(SkillTerm.objects.filter(name__in=names).values_list("name", "id"))
+    missing = names - terms.keys()
+    if missing:
+        SkillTerm.objects.bulk_create([SkillTerm(name=name) for name in missing], ignore_conflicts=True)
+        terms.update(SkillTerm.objects.filter(name__in=missing).values_list("name", "id"))
+    return terms
+
+
+def index_analyses(analyses):
+    """Replace the skill postings of saved analyses with what their skills_match holds now"""
+    analyses = [analysis for analysis in analyses if analysis.pk is not None]
+    if not analyses:
+        return 0
+
+    wanted = {analysis.pk: skill_postings(analysis.skills_match) for analysis in analyses}
+    terms = get_terms(name for postings in wanted.values() for name in postings)
+
+    with transaction.atomic():
+        AnalysisSkill.objects.filter(analysis_id__in=wanted).delete()
+        rows = [
+            AnalysisSkill(analysis_id=analysis_id, term_id=terms[name], category=category)
+            for analysis_id, postings in wanted.items()
+            for name, category in postings.items()
+        ]
+        AnalysisSkill.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def parse_skill_list(value):
+    """Canonical names from a comma-separated query parameter"""
+    return list(dict.fromkeys(name for name in (canonical_skill(v) for v in (value or "").split(",")) if name))
+
+
+def filter_by_skills(queryset, all_of=(), any_of=()):
+    """
+    Analyses having every skill in `all_of` and at least one in `any_of`.
+
+    Each condition is an EXISTS probe on the (term, analysis) unique index,
+    so no skills_match JSON is read. Unknown skills in `all_of` match nothing.
+    """
+    names = set(all_of) | set(any_of)
+    terms = dict(SkillTerm.objects.filter(name__in=names).values_list("name", "id"))
+
+    if any(name not in terms for name in all_of):
+        return queryset.none()
+    for name in all_of:
+        queryset = queryset.filter(Exists(
+            AnalysisSkill.objects.filter(analysis=OuterRef("pk"), term_id=terms[name])
+        ))
+
+    if any_of:
+        any_ids = [terms[name] for name in any_of if name in terms]
+        if not any_ids:
+            return queryset.none()
+        queryset = queryset.filter(Exists(
+            AnalysisSkill.objects.filter(analysis=OuterRef("pk"), term_id__in=any_ids)
+        ))
+    return queryset
+
+
+def backfill(chunk_size=2000, stdout=None):
+    """Index every analysis that has skills_match; returns the number of postings written"""
+    queryset = ResumeAnalysis.objects.exclude(skills_match__isnull=True).only("id", "skills_match").order_by("id")
+    total = 0
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return total
+        total += index_analyses(chunk)
+        last_id = chunk[-1].id
+        if stdout is not None:
+            stdout.write(f"... up to analysis {last_id}: {total} postings")
@@ -0,0 +1,99 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Pull top-level fields out of a JSON object while it is still being generated.
+
+    feed() takes the next chunk of LLM output and returns the (key, value)
+    pairs whose values completed in that chunk, so `ats_score` can be shown
+    long before `missing_keywords` has been written. Text before the first
+    `{` (e.g. "Here is the JSON:") is ignored, as is anything after the
+    object closes.
+    """
+
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.key = None
+        self.value_start = None
+        self.done = False
+        self.result = {}
+
+    def feed(self, chunk):
+        self.buf += chunk
+        completed = []
+
+        while self.pos < len(self.buf) and not self.done:
+            ch = self.buf[self.pos]
+
+            if self.depth == 0:
+                if ch == "{":
+                    self.depth = 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key is None:
+                        self.key = self._loads(self.buf[self.string_start:self.pos + 1])
+            elif ch == '"':
+                self.in_string = True
+                self.string_start = self.pos
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                if self.depth == 1:
+                    self._finish_value(completed)
+                    self.done = True
+                self.depth -= 1
+            elif self.depth == 1:
+                if ch == ":" and self.key is not None and self.value_start is None:
+                    self.value_start = self.pos + 1
+                elif ch == ",":
+                    self._finish_value(completed)
+
+            self.pos += 1
+
+        return completed
+
+    def _finish_value(self, completed):
+        if self.key is not None and self.value_start is not None:
+            value = self._loads(self.buf[self.value_start:self.pos].strip())
+            if value is not _INVALID:
+                self.result[self.key] = value
+                completed.append((self.key, value))
+        self.key = None
+        self.value_start = None
+
+    @staticmethod
+    def _loads(raw):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return _INVALID
+
+
+_INVALID = object()
+
+
+def sse_event(event, data):
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def iter_sse_data(lines):
+    """`data:` payloads of an SSE stream (e.g. OpenRouter's stream=true), until [DONE]"""
+    for line in lines:
+        if not line or not line.startswith("data:"):
+            continue  # blank separators and ": keep-alive" comments
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        yield data
@@ -0,0 +1,170 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .recording import request_key
+
+# What the stub answers with: a plausible analysis in the shape RESUME_ANALYSIS_PROMPT asks for
+STUB_ANALYSIS = {
+    "ats_score": 64,
+    "clarity_score": 70,
+    "experience": "2 years backend",
+    "education": "B.Tech",
+    "skills": {"technical": ["Python"], "soft": [], "tools": ["Git"]},
+    "strengths": ["Clear layout"],
+    "weaknesses": ["No metrics"],
+}
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def completion_body(result):
+    """OpenAI-compatible chat completion whose message content is `result` as JSON"""
+    return json.dumps({
+        "object": "chat.completion",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(result)}}],
+    }).encode()
+
+
+def stream_body(result, chunk_chars=40):
+    """The same completion as server-sent events, `chunk_chars` of content per event"""
+    content = json.dumps(result)
+    events = [
+        json.dumps({"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": piece}}]})
+        for piece in (content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars))
+    ]
+    return "".join(f"data: {event}\n\n" for event in events + ["[DONE]"]).encode()
+
+
+def canned_response(payload, result=None):
+    """(status, headers, body) answering `payload` with STUB_ANALYSIS (or `result`)"""
+    result = result or STUB_ANALYSIS
+    if payload.get("stream"):
+        return 200, {"Content-Type": "text/event-stream"}, stream_body(result)
+    return 200, dict(JSON_HEADERS), completion_body(result)
+
+
+class Faults:
+    """Injected latency (seconds, plus up to `jitter`) and a share of failed responses"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def delay(self):
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def error(self):
+        """(status, headers, body) of an injected failure, or None"""
+        if not self.error_rate or random.random() >= self.error_rate:
+            return None
+        return error_response(self.error_status)
+
+
+def error_response(status):
+    """(status, headers, body) of an OpenRouter-style error"""
+    headers = dict(JSON_HEADERS)
+    if status == 429:
+        headers["Retry-After"] = "1"
+    return status, headers, json.dumps({"error": {"message": f"stub error {status}"}}).encode()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # load tests open many connections at once
+
+
+class StubLLMServer:
+    """
+    OpenAI-compatible /v1/chat/completions endpoint on localhost for tests,
+    benchmarks and offline load tests (see `manage.py stub_llm`).
+
+    Requests recorded in `store` (a recording.RecordingStore) get their
+    recorded response; others get STUB_ANALYSIS, or a 404 when `fallback`
+    is off. `latency`/`jitter` delay every answer, `error_rate` of them
+    fail with `error_status`, and a `status` other than 200 fails them all.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, status=200, result=None, host="127.0.0.1", port=0,
+                 store=None, fallback=True, error_rate=0.0, error_status=503):
+        self.faults = Faults(latency, jitter, error_rate, error_status)
+        self.status = status
+        self.result = result or STUB_ANALYSIS
+        self.store = store
+        self.fallback = fallback
+        self.requests = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self.server = _Server((host, port), self._handler())
+        self.url = f"http://{host}:{self.server.server_port}/v1/chat/completions"
+        self._thread = None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real providers
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                try:
+                    payload = json.loads(raw or b"{}")
+                except ValueError:
+                    payload = None
+                status, headers, body = stub.respond(payload)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def respond(self, payload):
+        """(status, headers, body) for one request body"""
+        with self._lock:
+            self.requests += 1
+        delay = self.faults.delay()
+        if delay:
+            time.sleep(delay)
+        if payload is None:
+            return 400, dict(JSON_HEADERS), b'{"error": {"message": "invalid JSON body"}}'
+
+        failure = self.faults.error() if self.status == 200 else error_response(self.status)
+        if failure is not None:
+            return failure
+
+        record = self.store.get(request_key(payload)) if self.store is not None else None
+        if record is not None:
+            with self._lock:
+                self.replayed += 1
+            return record["status"], record["headers"], record["body"]
+        if not self.fallback:
+            return 404, dict(JSON_HEADERS), b'{"error": {"message": "no recorded response for this request"}}'
+        return canned_response(payload, self.result)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,3 +1,1103 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import benchmarks, documents, llm_client, metrics, recording, pdf_pool, prompting, providers, ranking, ratelimit, response_cache, resume_analysis
+from .pipeline import analyze_text, flight_key, store_resume
+from .cache import AnalysisCache, LRUCache, analysis_cache
+from .jobs import run_analysis_job, run_match_job
+from . import rollups
+from .streaming import IncrementalJSONParser
+from .stub_llm import STUB_ANALYSIS, StubLLMServer
+from .models import AnalysisLease, Course, DailyAnalysisStats, JobDescription, Resume, ResumeAnalysis, ResumeBatch, Skill, UserSkill
+
+LLM_RESULT = {
+    "ats_score": 64,
+    "clarity_score": 70,
+    "experience": "2 years backend",
+    "education": "B.Tech",
+    "skills": {"technical": ["Python"], "soft": [], "tools": ["Git"]},
+    "strengths": ["Clear layout"],
+    "weaknesses": ["No metrics"],
+}
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_expired_entries_count_as_misses(self):
+        cache = LRUCache(max_entries=2, ttl=10)
+        with mock.patch("analysis.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with mock.patch("analysis.cache.time.monotonic", return_value=111):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+class AnalysisCacheTests(SimpleTestCase):
+    def test_hit_by_bytes_and_by_normalized_text(self):
+        cache = AnalysisCache()
+        cache.store({"ats_score": 61}, content_hash="abc", text="Jane  Doe\nPython")
+
+        self.assertEqual(cache.get_by_content("abc"), {"ats_score": 61})
+        self.assertEqual(cache.get_by_text("Jane Doe Python"), {"ats_score": 61})
+
+    def test_model_change_invalidates(self):
+        cache = AnalysisCache()
+        cache.store({"ats_score": 61}, content_hash="abc")
+
+        with mock.patch.object(resume_analysis, "OPENROUTER_MODEL", "other/model"):
+            self.assertIsNone(cache.get_by_content("abc"))
+        self.assertIsNone(cache.get_by_content("abc"))
+
+    def test_provider_changes_invalidate(self):
+        cache = AnalysisCache()
+        cache.store({"ats_score": 61}, content_hash="abc")
+
+        with override_settings(LLM_PROVIDERS=["huggingface", "openrouter"]):
+            self.assertIsNone(cache.get_by_content("abc"))
+            cache.store({"ats_score": 55}, content_hash="abc")
+        with override_settings(LLM_PROVIDER_URLS={"openrouter": "http://127.0.0.1:9/stub"}):
+            self.assertIsNone(cache.get_by_content("abc"))
+
+
+class PdfExtractionTests(SimpleTestCase):
+    def fake_reader(self, page_count, chars_per_page):
+        pages = [mock.Mock(**{"extract_text.return_value": "x" * chars_per_page}) for _ in range(page_count)]
+        return mock.Mock(pages=pages), pages
+
+    def test_stops_once_character_budget_is_reached(self):
+        reader, pages = self.fake_reader(200, 1000)
+        with mock.patch("analysis.resume_analysis.PdfReader", return_value=reader):
+            text = resume_analysis.extract_text_from_pdf("big.pdf", max_chars=2500)
+
+        self.assertEqual(len(text), 2500)
+        self.assertEqual(sum(p.extract_text.call_count for p in pages), 3)
+
+    def test_page_cap(self):
+        reader, pages = self.fake_reader(200, 10)
+        with mock.patch("analysis.resume_analysis.PdfReader", return_value=reader):
+            resume_analysis.extract_text_from_pdf("big.pdf", max_chars=None, max_pages=5)
+
+        self.assertEqual(sum(p.extract_text.call_count for p in pages), 5)
+
+
+class PromptCompactionTests(SimpleTestCase):
+    def test_repeated_headers_page_numbers_and_duplicates_are_dropped(self):
+        pages = [
+            f"JANE DOE  |  jane@example.com\nEXPERIENCE\nAcme {i}:   built   things\nTeam player\nPage {i + 1} of 3"
+            for i in range(3)
+        ]
+        compacted = prompting.compact_resume_text(prompting.PAGE_BREAK.join(pages))
+
+        self.assertEqual(compacted.split("\n"), [
+            "JANE DOE | jane@example.com", "EXPERIENCE", "Acme 0: built things", "Team player",
+            "Acme 1: built things", "Acme 2: built things",
+        ])
+
+    def test_footers_are_deduplicated_but_body_lines_mentioning_page_are_kept(self):
+        pages = [
+            "Built landing page serving 2M users\nJane Doe - Page 1 of 2",
+            "Built landing page serving 5M users\nJane Doe - Page 2 of 2",
+        ]
+        compacted = prompting.compact_resume_text(prompting.PAGE_BREAK.join(pages))
+
+        self.assertEqual(compacted.split("\n"), [
+            "Built landing page serving 2M users", "Jane Doe - Page 1 of 2", "Built landing page serving 5M users",
+        ])
+
+    def test_budget_is_measured_in_tokens_and_keeps_every_section(self):
+        text = "EXPERIENCE\n" + "\n".join(f"Shipped feature {i} for the billing team" for i in range(300))
+        text += "\nSKILLS\nPython\nDjango"
+
+        compacted = prompting.compact_resume_text(text, max_tokens=150)
+
+        self.assertLessEqual(prompting.count_tokens(compacted), 150)
+        self.assertTrue(compacted.startswith("EXPERIENCE\nShipped feature 0"))
+        self.assertTrue(compacted.endswith("SKILLS\nPython\nDjango"))
+
+
+class PdfPoolTests(SimpleTestCase):
+    sample = "resumes/Resume.pdf"
+
+    @override_settings(PDF_POOL_WORKERS=1)
+    def test_pool_matches_inline_extraction(self):
+        with open(self.sample, "rb") as f:
+            data = f.read()
+        inline = resume_analysis.extract_text_from_pdf(self.sample)
+
+        self.assertEqual(pdf_pool.extract_pdf_text(data), inline)
+        with override_settings(PDF_FANOUT_PAGES=1):
+            self.assertEqual(pdf_pool.extract_pdf_text(self.sample), inline)
+
+    @override_settings(PDF_POOL_WORKERS=1, PDF_EXTRACTION_TIMEOUT=0)
+    def test_timeout_returns_none_and_recycles_pool(self):
+        self.assertIsNone(pdf_pool.extract_pdf_text(self.sample))
+        self.assertIsNone(pdf_pool._pool)
+
+    @override_settings(PDF_POOL_WORKERS=2, PDF_EXTRACTION_TIMEOUT=2)
+    def test_a_hung_document_does_not_fail_its_neighbours(self):
+        with open(self.sample, "rb") as f:
+            data = f.read()
+        pdf_pool._run(pdf_pool._page_count, data)  # start the workers
+        results = {}
+
+        hung = threading.Thread(target=lambda: results.setdefault("hung", pdf_pool._collect([(time.sleep, 30)])))
+        hung.start()
+        time.sleep(1.6)  # in flight when the hung call times out and recycles the pool
+        with self.assertLogs("analysis.pdf_pool", "INFO") as logs:
+            results["neighbour"] = pdf_pool._collect([(time.sleep, 0.6), (pdf_pool._page_count, data)])
+        hung.join(5)
+
+        self.assertIn("resubmitting", "\n".join(logs.output))
+        self.assertIsNone(results["hung"])
+        self.assertEqual(results["neighbour"], [None, pdf_pool._page_count(data)])
+
+    @classmethod
+    def tearDownClass(cls):
+        pdf_pool._reset_pool()
+        super().tearDownClass()
+
+
+class DocumentLoaderTests(SimpleTestCase):
+    def test_format_comes_from_magic_bytes_not_the_name(self):
+        self.assertEqual(documents.sniff_format(SimpleUploadedFile("cv.txt", b"%PDF-1.4 x")), documents.PDF)
+        self.assertEqual(documents.sniff_format(SimpleUploadedFile("cv.pdf", b"PK\x03\x04rest")), documents.DOCX)
+        self.assertEqual(documents.sniff_format(SimpleUploadedFile("cv.pdf", "Résumé".encode())), documents.TXT)
+        self.assertIsNone(documents.sniff_format(SimpleUploadedFile("cv.txt", b"\x89PNG\r\n\x1a\n\x00")))
+
+    @mock.patch("analysis.documents.extract_pdf_text", return_value="Hiring Python developers")
+    def test_job_description_text_is_cached_by_content(self, extract):
+        documents.jd_text_cache.clear()
+        for name in ("jd.pdf", "same_jd_renamed.pdf"):
+            text = documents.load_job_description(SimpleUploadedFile(name, b"%PDF-1.4 jd"))
+
+        self.assertEqual(text, "Hiring Python developers")
+        extract.assert_called_once()
+
+
+class MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        analysis_cache.clear()
+
+    def upload(self, content=b"%PDF-1.4 resume", name="Resume.pdf"):
+        return self.client.post(
+            "/api/upload-resume/",
+            {"file": SimpleUploadedFile(name, content, content_type="application/pdf")},
+        )
+
+
+@mock.patch("analysis.pipeline.analyze_resume", return_value=LLM_RESULT)
+@mock.patch("analysis.pipeline.extract_pdf_text", return_value="Jane Doe Python")
+@override_settings(ANALYSIS_ASYNC=False)
+class AnalysisJobTests(MediaRootMixin, TestCase):
+    @override_settings(ANALYSIS_ASYNC=True)
+    def test_upload_returns_202_and_job_completes(self, extract, llm):
+        with mock.patch("analysis.views.submit_analysis_job") as submit:
+            response = self.upload()
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        submit.assert_called_once()
+        self.assertEqual(ResumeAnalysis.objects.get(pk=job_id).status, "processing")
+
+        run_analysis_job(job_id)
+
+        status = self.client.get(f"/api/analyses/{job_id}/status/").json()
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["analysis"]["ats_score"], 64)
+
+    @override_settings(ANALYSIS_ASYNC=True)
+    def test_job_is_submitted_only_after_commit(self, extract, llm):
+        with mock.patch("analysis.jobs.get_executor") as get_executor:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.upload()
+            self.assertEqual(response.status_code, 202)
+            get_executor.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+        get_executor.return_value.submit.assert_called_once()
+
+    @override_settings(ANALYSIS_STALE_AFTER=60)
+    def test_stale_processing_job_is_failed_when_polled(self, extract, llm):
+        resume = Resume.objects.create(file="resumes/Resume.pdf")
+        fresh = ResumeAnalysis.objects.create(resume=resume, file_name="Resume.pdf", status="processing")
+        stale = ResumeAnalysis.objects.create(resume=resume, file_name="Resume.pdf", status="processing")
+        ResumeAnalysis.objects.filter(pk=stale.pk).update(upload_date=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(self.client.get(f"/api/analyses/{fresh.id}/status/").json()["status"], "processing")
+        status = self.client.get(f"/api/analyses/{stale.id}/status/").json()
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("interrupted", status["error"])
+        self.assertEqual(ResumeAnalysis.objects.get(pk=stale.pk).status, "failed")
+
+    def test_failed_job_records_error(self, extract, llm):
+        llm.return_value = {"error": "API Error: rate limited"}
+
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 500)
+        analysis = ResumeAnalysis.objects.get()
+        self.assertEqual(analysis.status, "failed")
+        self.assertEqual(analysis.error_message, "API Error: rate limited")
+
+    def test_rate_limited_job_returns_503(self, extract, llm):
+        llm.return_value = {"error": "The analysis service is busy, please retry shortly.", "retry_after": 7}
+
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+
+    def test_duplicate_upload_skips_llm(self, extract, llm):
+        self.upload()
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(llm.call_count, 1)
+        self.assertEqual(ResumeAnalysis.objects.count(), 2)
+        resume = Resume.objects.get()
+        self.assertEqual(list(ResumeAnalysis.objects.values_list("resume", flat=True)), [resume.id, resume.id])
+
+
+@mock.patch("analysis.pipeline.analyze_resume", return_value=LLM_RESULT)
+@mock.patch("analysis.pipeline.extract_pdf_text", return_value="Jane Doe Python")
+@override_settings(ANALYSIS_ASYNC=False)
+class StoredResumeTests(MediaRootMixin, TestCase):
+    def test_concurrent_store_of_the_same_bytes_keeps_one_row_and_file(self, extract, llm):
+        first = store_resume(SimpleUploadedFile("a.pdf", b"%PDF-1.4 same"), "samehash")
+
+        # The other upload checked for the hash before this one was saved
+        with mock.patch("analysis.pipeline.Resume.objects.filter") as lookup:
+            lookup.return_value.first.return_value = None
+            second = store_resume(SimpleUploadedFile("b.pdf", b"%PDF-1.4 same"), "samehash")
+
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(Resume.objects.count(), 1)
+        self.assertEqual(os.listdir(os.path.dirname(first.file.path)), [os.path.basename(first.file.name)])
+
+    def test_text_is_extracted_once_and_reused(self, extract, llm):
+        self.upload()
+        resume = Resume.objects.get()
+        self.assertEqual(resume.extracted_text, "Jane Doe Python")
+        self.assertEqual(resume.analysis_result, LLM_RESULT)
+
+        response = self.client.post(f"/api/resumes/{resume.id}/reanalyze/", {"force": "true"})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(llm.call_count, 2)
+        self.assertEqual(resume.analyses.count(), 2)
+
+    @mock.patch("analysis.views.match_resume_with_jd", return_value={"match_score": 80, "suggestions": []})
+    def test_match_stored_resume_against_jd_text(self, match, extract, llm):
+        self.upload()
+        resume = Resume.objects.get()
+
+        response = self.client.post(
+            f"/api/resumes/{resume.id}/match-jd/", {"jd_text": "Python developer"}, content_type="application/json"
+        )
+
+        self.assertEqual(response.json()["match_score"], 80)
+        match.assert_called_once_with("Jane Doe Python", "Python developer")
+        self.assertEqual(extract.call_count, 1)
+
+
+@override_settings(ANALYSIS_ASYNC=False)
+class AsyncViewTests(MediaRootMixin, TestCase):
+    @mock.patch("analysis.pipeline.analyze_resume_async", new_callable=mock.AsyncMock, return_value=LLM_RESULT)
+    @mock.patch("analysis.views.extract_pdf_text", return_value="Jane Doe Python")
+    async def test_async_upload_analyzes_and_stores(self, extract, llm):
+        response = await self.async_client.post(
+            "/api/async/upload-resume/",
+            {"file": SimpleUploadedFile("Resume.pdf", b"%PDF-1.4 async", content_type="application/pdf")},
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["analysis"]["ats_score"], 64)
+        resume = await Resume.objects.aget()
+        self.assertEqual(resume.extracted_text, "Jane Doe Python")
+        llm.assert_awaited_once_with("Jane Doe Python")
+
+        again = await self.async_client.post(
+            "/api/async/upload-resume/",
+            {"file": SimpleUploadedFile("Copy.pdf", b"%PDF-1.4 async", content_type="application/pdf")},
+        )
+        self.assertEqual(again.status_code, 201)
+        llm.assert_awaited_once()
+        self.assertEqual([a.resume_id async for a in ResumeAnalysis.objects.all()], [resume.id, resume.id])
+
+    @mock.patch("analysis.views.match_resume_with_jd_async", new_callable=mock.AsyncMock,
+                return_value={"match_score": 72, "suggestions": []})
+    async def test_async_match_reads_both_files(self, match):
+        response = await self.async_client.post("/api/async/match-resume-jd/", {
+            "resume": SimpleUploadedFile("cv.txt", b"Python developer"),
+            "jd": SimpleUploadedFile("jd.txt", b"Hiring Python developers"),
+        })
+
+        self.assertEqual(response.json()["match_score"], 72)
+        match.assert_awaited_once_with("Python developer", "Hiring Python developers")
+
+
+class IncrementalJSONParserTests(SimpleTestCase):
+    def test_fields_are_emitted_as_soon_as_they_complete(self):
+        parser = IncrementalJSONParser()
+        output = 'Here is the JSON: {"ats_score": 64, "skills": {"technical": ["C, C++"], "soft": []}, "note": "a \\"}\\" b"}'
+        emitted = [pair for i in range(0, len(output), 3) for pair in parser.feed(output[i:i + 3])]
+
+        self.assertEqual([key for key, _ in emitted], ["ats_score", "skills", "note"])
+        self.assertEqual(parser.result, json.loads(output[output.index("{"):]))
+
+    def test_score_is_available_before_the_object_closes(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"ats_score": 7'), [])
+        self.assertEqual(parser.feed('1, "strengths": ['), [("ats_score", 71)])
+
+
+class StreamingAnalysisTests(MediaRootMixin, TestCase):
+    @mock.patch("analysis.views.stream_resume_analysis_with_llm",
+                return_value=iter(['{"ats_score": 64, "clarity_score"', ': 70, "skills": {"technical": []}}']))
+    @mock.patch("analysis.pipeline.extract_pdf_text", return_value="Jane Doe Python")
+    def test_upload_streams_fields_then_saves(self, extract, llm):
+        response = self.client.post("/api/stream/upload-resume/", {
+            "file": SimpleUploadedFile("Resume.pdf", b"%PDF-1.4 stream", content_type="application/pdf"),
+        })
+        body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertLess(body.index('"key": "ats_score"'), body.index('"key": "skills"'))
+        self.assertIn("event: done", body)
+        analysis = ResumeAnalysis.objects.get()
+        self.assertEqual((analysis.ats_score, analysis.status), (64, "completed"))
+        self.assertEqual(Resume.objects.get().analysis_result["clarity_score"], 70)
+
+
+class JobDescriptionMatchTests(MediaRootMixin, TestCase):
+    def test_uploaded_jd_is_stored_once_with_requirements(self):
+        Skill.objects.create(name="Docker", importance="High", demand_score=80)
+        jd = b"We are hiring a Python developer. Python, Django and Docker required."
+
+        first = self.client.post("/api/upload-jd/", {"file": SimpleUploadedFile("jd.txt", jd)}).json()
+        second = self.client.post("/api/upload-jd/", {"file": SimpleUploadedFile("copy.txt", jd)}).json()
+
+        self.assertEqual(first["job_description_id"], second["job_description_id"])
+        self.assertEqual(first["keywords"][0], "python")
+        self.assertEqual(first["required_skills"], ["Docker"])
+
+    @mock.patch("analysis.job_descriptions.extract_pdf_text", return_value="Go developer")
+    @mock.patch("analysis.job_descriptions.match_resume_with_jd",
+                side_effect=lambda text, jd: {"match_score": 90 if "Python" in text else 40, "suggestions": []})
+    def test_match_ranks_resumes_in_one_call(self, match, extract):
+        jd = JobDescription.objects.create(text="Python developer " * 2000, required_skills=["Python"])
+        go = Resume.objects.create(file="resumes/go.pdf")
+        py = Resume.objects.create(file="resumes/py.pdf", extracted_text="Python developer")
+
+        response = self.client.post(f"/api/job-descriptions/{jd.id}/match/",
+                                    {"resume_ids": [go.id, py.id]}, content_type="application/json")
+
+        results = response.json()["results"]
+        self.assertEqual([(r["resume_id"], r["rank"]) for r in results], [(py.id, 1), (go.id, 2)])
+        self.assertTrue(match.call_args.args[1].startswith("Required skills: Python"))
+        self.assertLess(len(match.call_args.args[1]), 4200)
+        go.refresh_from_db()
+        self.assertEqual(go.extracted_text, "Go developer")
+
+    @mock.patch("analysis.views.rank_resumes", return_value=[])
+    def test_top_k_is_capped_and_validated(self, rank):
+        jd = JobDescription.objects.create(text="Python developer")
+
+        self.client.get(f"/api/job-descriptions/{jd.id}/candidates/?top_k=1000000")
+        self.assertEqual(rank.call_args.args[2], 100)
+        response = self.client.get(f"/api/job-descriptions/{jd.id}/candidates/?top_k=all")
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ANALYSIS_ASYNC=True, JD_MATCH_INLINE_MAX=1)
+    @mock.patch("analysis.views.submit_match_job")
+    @mock.patch("analysis.job_descriptions.match_resume_with_jd", return_value={"match_score": 70, "suggestions": []})
+    def test_large_match_runs_as_a_background_job(self, match, submit):
+        jd = JobDescription.objects.create(text="Python developer")
+        ids = [Resume.objects.create(file=f"resumes/{i}.pdf", extracted_text="Python").id for i in range(3)]
+
+        response = self.client.post(f"/api/job-descriptions/{jd.id}/match/",
+                                    {"resume_ids": ids}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 202)
+        match.assert_not_called()
+        job_id, extra = submit.call_args.args
+        run_match_job(job_id, extra)
+        job = self.client.get(response.json()["status_url"]).json()
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual((job["result"]["matched"], job["result"]["candidates"]), (3, 3))
+
+    def test_unknown_resume_ids_are_rejected(self):
+        jd = JobDescription.objects.create(text="Python developer")
+        response = self.client.post(f"/api/job-descriptions/{jd.id}/match/",
+                                    {"resume_ids": [999]}, content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["missing"], [999])
+
+
+class ResumeIndexTests(SimpleTestCase):
+    def test_bm25_and_skill_overlap_rank_incrementally(self):
+        index = ranking.ResumeIndex()
+        index.add(1, "Python Django developer, Python APIs", {"python", "django"})
+        index.add(2, "Java Spring developer", {"java"})
+        index.add(3, "Frontend developer: React, some Python", {"react"})
+
+        ranked = index.rank("Senior Python engineer with Django", ["Django"], top_k=2)
+        self.assertEqual([row[0] for row in ranked], [1, 3])
+
+        index.add(2, "Python and Django expert, Django REST framework, Python", {"python", "django"})
+        index.remove(1)
+        ranked = index.rank("Senior Python engineer with Django", ["Django"])
+        self.assertEqual([row[0] for row in ranked], [2, 3])
+        self.assertEqual(ranked[0][3], 1.0)
+        self.assertEqual(index.rank("Python", candidates=[3])[0][0], 3)
+
+    def test_changes_are_saved_in_the_background_once_per_interval(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = f"{directory}/index.pkl"
+        self.addCleanup(ranking.reset_index)
+
+        with override_settings(RANKING_INDEX_PATH=path, RANKING_SAVE_INTERVAL=0.3), \
+                mock.patch("analysis.ranking.save_index", wraps=ranking.save_index) as save:
+            ranking._index, ranking._saved_at = ranking.ResumeIndex(), time.monotonic()
+            for resume_id in (1, 2, 3):
+                ranking._index.add(resume_id, "Python developer")
+                ranking._index_changed()
+            save.assert_not_called()
+
+            time.sleep(0.6)
+            save.assert_called_once()
+            self.assertEqual(len(ranking.load_index(path)), 3)
+            self.assertEqual(os.listdir(directory), ["index.pkl"])
+
+
+@override_settings(RANKING_INDEX_PATH="")
+class RankingPrefilterTests(TestCase):
+    def setUp(self):
+        ranking.reset_index()
+        self.addCleanup(ranking.reset_index)
+
+    @mock.patch("analysis.job_descriptions.match_resume_with_jd", return_value={"match_score": 80, "suggestions": []})
+    def test_only_top_k_resumes_reach_the_llm(self, match):
+        jd = JobDescription.objects.create(text="Python Django developer", required_skills=["Django"])
+        java = Resume.objects.create(file="resumes/java.pdf", extracted_text="Java Spring developer")
+        ranking.get_index()
+        # Indexed through the post_save signal once the index is loaded
+        py = Resume.objects.create(file="resumes/py.pdf", extracted_text="Python Django developer")
+        ResumeAnalysis.objects.create(file_name="py.pdf", resume=py, status="completed",
+                                      skills_match={"technical": ["Django"]})
+
+        response = self.client.post(f"/api/job-descriptions/{jd.id}/match/",
+                                    {"resume_ids": [java.id, py.id], "top_k": 1}, content_type="application/json")
+
+        data = response.json()
+        self.assertEqual([row["resume_id"] for row in data["prefilter"]], [py.id])
+        self.assertEqual([row["resume_id"] for row in data["results"]], [py.id])
+        match.assert_called_once()
+
+
+class SkillIndexTests(TestCase):
+    def analysis(self, name, **skills_match):
+        return ResumeAnalysis.objects.create(file_name=name, status="completed", skills_match=skills_match)
+
+    def search(self, **params):
+        response = self.client.get("/api/analyses/by-skills/", params)
+        return sorted(row["file_name"] for row in response.json()["results"])
+
+    def test_postings_are_canonical_and_follow_updates(self):
+        analysis = self.analysis("a.pdf", technical=["K8s", " Python ", "python"], tools=["Git"])
+        self.assertEqual(
+            sorted(analysis.skill_postings.values_list("term__name", "category")),
+            [("git", "tools"), ("kubernetes", "technical"), ("python", "technical")],
+        )
+
+        analysis.skills_match = {"technical": ["Go"]}
+        analysis.save()
+        self.assertEqual(list(analysis.skill_postings.values_list("term__name", flat=True)), ["go"])
+
+        loaded = ResumeAnalysis.objects.get(pk=analysis.pk)
+        loaded.skills_match["technical"].append("Rust")  # edited in place, not reassigned
+        loaded.save()
+        self.assertEqual(sorted(analysis.skill_postings.values_list("term__name", flat=True)), ["go", "rust"])
+
+    def test_and_or_queries(self):
+        self.analysis("py_k8s.pdf", technical=["Python", "Kubernetes"], tools=["AWS"])
+        self.analysis("py.pdf", technical=["python"], tools=["GCP"])
+        self.analysis("java.pdf", technical=["Java"], tools=["Amazon Web Services"])
+
+        self.assertEqual(self.search(all="python,k8s"), ["py_k8s.pdf"])
+        self.assertEqual(self.search(all="python", any="aws,google cloud"), ["py.pdf", "py_k8s.pdf"])
+        self.assertEqual(self.search(any="aws"), ["java.pdf", "py_k8s.pdf"])
+        self.assertEqual(self.search(all="python,rust"), [])
+
+
+@mock.patch("analysis.pipeline.analyze_resume", return_value=LLM_RESULT)
+@mock.patch("analysis.pipeline.extract_pdf_text", side_effect=lambda path: f"text of {path}")
+@override_settings(ANALYSIS_ASYNC=False)
+class BatchUploadTests(MediaRootMixin, TestCase):
+    def test_zip_and_pdfs_are_deduplicated(self, extract, llm):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("a.pdf", b"%PDF-1.4 a")
+            zf.writestr("copy_of_b.pdf", b"%PDF-1.4 b")
+            zf.writestr("notes.txt", b"ignored")
+
+        response = self.client.post("/api/upload-resumes/", {"files": [
+            SimpleUploadedFile("b.pdf", b"%PDF-1.4 b", content_type="application/pdf"),
+            SimpleUploadedFile("bundle.zip", archive.getvalue(), content_type="application/zip"),
+        ]})
+
+        self.assertEqual(response.status_code, 201)
+        batch = response.json()["batch"]
+        self.assertEqual((batch["total_files"], batch["unique_files"]), (3, 2))
+        self.assertEqual(batch["status"], "completed")
+        self.assertEqual(llm.call_count, 2)
+        self.assertEqual(ResumeAnalysis.objects.filter(batch_id=batch["id"]).count(), 2)
+
+    def test_rejects_unsupported_files(self, extract, llm):
+        response = self.client.post("/api/upload-resumes/", {"files": [
+            SimpleUploadedFile("cv.docx", b"PK", content_type="application/octet-stream"),
+        ]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ResumeBatch.objects.exists())
+
+
+@mock.patch("analysis.pipeline.analyze_resume", return_value=LLM_RESULT)
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        analysis_cache.clear()
+
+    @override_settings(ANALYSIS_LEASE_TTL=0)
+    def test_concurrent_requests_share_one_llm_call(self, llm):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_llm(text):
+            started.set()
+            release.wait(5)
+            return LLM_RESULT
+        llm.side_effect = slow_llm
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(analyze_text("Jane Doe", "h1")))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(analyze_text("Jane Doe", "h1")))
+        follower.start()
+        time.sleep(0.1)  # let the follower join the flight
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(results, [LLM_RESULT, LLM_RESULT])
+        self.assertEqual(llm.call_count, 1)
+
+    def lease(self, text, content_hash, seconds, result=None):
+        return AnalysisLease.objects.create(
+            key=flight_key(text, content_hash), owner="other-worker",
+            expires_at=timezone.now() + timedelta(seconds=seconds), result=result,
+        )
+
+    def test_result_published_by_another_process_is_reused(self, llm):
+        self.lease("Jane Doe", "h2", 60, result={**LLM_RESULT, "ats_score": 80})
+
+        self.assertEqual(analyze_text("Jane Doe", "h2")["ats_score"], 80)
+        llm.assert_not_called()
+
+    def test_waits_for_a_lease_held_by_another_process(self, llm):
+        lease = self.lease("Jane Doe", "h3", 60)
+
+        def publish(delay):
+            AnalysisLease.objects.filter(pk=lease.pk).update(result={**LLM_RESULT, "ats_score": 81})
+        with mock.patch("analysis.singleflight.time.sleep", side_effect=publish) as sleep:
+            result = analyze_text("Jane Doe", "h3")
+
+        self.assertEqual(result["ats_score"], 81)
+        self.assertEqual(sleep.call_count, 1)
+        llm.assert_not_called()
+
+    def test_expired_lease_is_taken_over(self, llm):
+        lease = self.lease("Jane Doe", "h4", -1)
+
+        self.assertEqual(analyze_text("Jane Doe", "h4"), LLM_RESULT)
+        self.assertEqual(llm.call_count, 1)
+        lease.refresh_from_db()
+        self.assertNotEqual(lease.owner, "other-worker")
+        self.assertEqual(lease.result, LLM_RESULT)
+
+    def test_failed_analysis_releases_the_lease(self, llm):
+        llm.return_value = {"error": "LLM down"}
+
+        self.assertEqual(analyze_text("Jane Doe", "h5"), {"error": "LLM down"})
+        self.assertFalse(AnalysisLease.objects.exists())
+
+
+@override_settings(LLM_RATE_LIMIT=0, LLM_MAX_CONCURRENCY=0)
+class LLMClientTests(SimpleTestCase):
+    def response(self, status_code, headers=None):
+        return mock.Mock(status_code=status_code, headers=headers or {})
+
+    @mock.patch("analysis.llm_client.time.sleep")
+    def test_retries_rate_limited_requests(self, sleep):
+        session = mock.Mock()
+        session.post.side_effect = [self.response(429, {"Retry-After": "1"}), self.response(200)]
+
+        with mock.patch("analysis.llm_client.get_session", return_value=session):
+            response = llm_client.post_json("http://llm.local", {"inputs": "x"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.post.call_count, 2)
+        sleep.assert_called_once_with(1.0)
+
+    @mock.patch("analysis.llm_client.time.sleep")
+    @override_settings(LLM_MAX_RETRIES=1)
+    def test_gives_up_after_max_retries(self, sleep):
+        session = mock.Mock()
+        session.post.return_value = self.response(503)
+
+        with mock.patch("analysis.llm_client.get_session", return_value=session):
+            response = llm_client.post_json("http://llm.local", {"inputs": "x"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(session.post.call_count, 2)
+        self.assertEqual(session.post.call_args.kwargs["timeout"], llm_client.get_timeout())
+
+    def test_streamed_response_holds_its_slot_until_read_or_closed(self):
+        limiter = ratelimit.Limiter(None, ratelimit.Slots(1), max_wait=0.05)
+        session = mock.Mock()
+
+        def streamed(*args, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response.raw = io.BytesIO(b"data: one\n\ndata: two\n\n")
+            return response
+
+        session.post.side_effect = streamed
+        with mock.patch("analysis.llm_client.get_session", return_value=session), \
+                mock.patch("analysis.llm_client.get_limiter", return_value=limiter):
+            response = llm_client.post_json("http://llm.local", {"inputs": "x"}, stream=True)
+            with self.assertRaises(ratelimit.RateLimitExceeded):
+                llm_client.post_json("http://llm.local", {"inputs": "x"})
+
+            self.assertEqual(len(list(response.iter_lines())), 4)
+            response = llm_client.post_json("http://llm.local", {"inputs": "x"}, stream=True)
+            response.close()
+            llm_client.post_json("http://llm.local", {"inputs": "x"}, stream=True).close()
+
+
+class RateLimitTests(SimpleTestCase):
+    def test_bucket_spaces_requests_at_rate(self):
+        bucket = ratelimit.TokenBucket(rate=10, burst=2)
+
+        waits = [bucket.reserve(max_wait=1) for _ in range(4)]
+
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, places=2)
+        self.assertAlmostEqual(waits[3], 0.2, places=2)
+        with self.assertRaises(ratelimit.RateLimitExceeded):
+            bucket.reserve(max_wait=0.25)
+
+    def test_pause_holds_back_callers(self):
+        bucket = ratelimit.TokenBucket(rate=10, burst=5)
+        bucket.pause(2)
+
+        with self.assertRaises(ratelimit.RateLimitExceeded) as raised:
+            bucket.reserve(max_wait=1)
+        self.assertEqual(raised.exception.retry_after, 3)
+
+    def test_concurrency_cap_times_out(self):
+        limiter = ratelimit.Limiter(None, ratelimit.Slots(1), max_wait=0.05)
+
+        with limiter.acquire():
+            with self.assertRaises(ratelimit.RateLimitExceeded):
+                with limiter.acquire():
+                    pass
+        with limiter.acquire():
+            pass
+
+    def test_file_limits_are_shared_between_limiters(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        with override_settings(LLM_RATE_LIMIT=1, LLM_RATE_BURST=1, LLM_MAX_CONCURRENCY=1,
+                               LLM_RATE_MAX_WAIT=0.05, LLM_RATE_LIMIT_DIR=directory):
+            first, second = ratelimit.build_limiter("llm.local"), ratelimit.build_limiter("llm.local")
+            with first.acquire():
+                with self.assertRaises(ratelimit.RateLimitExceeded):
+                    with second.acquire():
+                        pass
+
+
+class MetricsTests(SimpleTestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = metrics.Histogram("test_seconds", "Test.", labels=("stage",), buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, stage="parse")
+
+        lines = histogram.samples()
+
+        self.assertIn('test_seconds_bucket{stage="parse",le="0.1"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="parse",le="1"} 3', lines)
+        self.assertIn('test_seconds_bucket{stage="parse",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_count{stage="parse"} 4', lines)
+
+    def test_span_counts_errors(self):
+        with self.assertRaises(ValueError):
+            with metrics.span("test_failing_stage"):
+                raise ValueError
+
+        self.assertIn('resume_analyzer_stage_errors_total{stage="test_failing_stage"} 1',
+                      metrics.STAGE_ERRORS.samples())
+
+
+@mock.patch("analysis.pipeline.analyze_resume", return_value=LLM_RESULT)
+@mock.patch("analysis.pipeline.extract_pdf_text", return_value="Jane Doe Python")
+@override_settings(ANALYSIS_ASYNC=False, METRICS_ALLOWED_IPS=["127.0.0.1"])
+class MetricsEndpointTests(MediaRootMixin, TestCase):
+    def test_upload_stages_are_exported(self, extract, llm):
+        self.upload()
+
+        body = self.client.get("/metrics").content.decode()
+
+        for stage in ("upload_resume", "file_save", "db_write"):
+            self.assertIn(f'resume_analyzer_stage_seconds_count{{stage="{stage}"}}', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_hidden_from_other_clients(self, extract, llm):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+
+@override_settings(LLM_MAX_RETRIES=0, LLM_RATE_LIMIT=0, LLM_MAX_CONCURRENCY=0)
+class RecordReplayTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        recordings = override_settings(LLM_RECORDINGS_DIR=directory)
+        recordings.enable()
+        self.addCleanup(recordings.disable)
+
+    def test_recorded_responses_replay_offline(self):
+        live = StubLLMServer(result={**STUB_ANALYSIS, "ats_score": 81}).start()
+        with override_settings(LLM_MODE="record", LLM_PROVIDER_URLS={"openrouter": live.url}):
+            recorded = resume_analysis.analyze_resume_with_llm("Jane Doe\nPython developer")
+        live.close()
+
+        with override_settings(LLM_MODE="replay", LLM_PROVIDER_URLS={"openrouter": live.url}):
+            replayed = resume_analysis.analyze_resume_with_llm("Jane Doe\nPython developer")
+            missing = resume_analysis.analyze_resume_with_llm("Someone else entirely")
+
+        self.assertEqual(recorded["ats_score"], 81)
+        self.assertEqual(replayed, recorded)
+        self.assertIn("No recorded LLM response", missing["error"])
+        self.assertEqual(live.requests, 1)
+
+    @override_settings(LLM_MODE="replay", LLM_REPLAY_FALLBACK=True, LLM_REPLAY_ERROR_RATE=1, LLM_REPLAY_ERROR_STATUS=429)
+    def test_replay_injects_errors(self):
+        result = resume_analysis.analyze_resume_with_llm("Jane Doe")
+
+        self.assertEqual(result["retry_after"], 1)
+
+    def test_stub_server_replays_recordings_by_request_hash(self):
+        store = recording.get_store()
+        payload = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+        store.put(recording.request_key(payload), 200, {"Content-Type": "application/json"}, b'{"recorded": true}')
+
+        with StubLLMServer(store=store, fallback=False) as stub:
+            replayed = llm_client.post_json(stub.url, {"messages": payload["messages"], "model": "m"})
+            unknown = llm_client.post_json(stub.url, {"model": "other"})
+
+        self.assertEqual(replayed.json(), {"recorded": True})
+        self.assertEqual(unknown.status_code, 404)
+
+
+@override_settings(LLM_MAX_RETRIES=0, LLM_BREAKER_FAILURES=2, LLM_BREAKER_RESET=60)
+class ProviderRouterTests(SimpleTestCase):
+    def stub(self, **kwargs):
+        server = StubLLMServer(**kwargs).start()
+        self.addCleanup(server.close)
+        return server
+
+    def test_normalizes_results_to_common_schema(self):
+        result = providers.normalize_result(
+            {"ats_score": "71.6", "clarity_score": 140, "experience": ["3 years"], "skills": ["Go"]}, "huggingface"
+        )
+
+        self.assertEqual(result["ats_score"], 72)
+        self.assertEqual(result["clarity_score"], 100)
+        self.assertEqual(result["experience"], "3 years")
+        self.assertEqual(result["skills"], {"technical": ["Go"], "soft": [], "tools": []})
+        self.assertEqual(result["strengths"], [])
+        self.assertEqual(result["provider"], "huggingface")
+
+    def test_hedges_slow_primary_with_backup(self):
+        slow, fast = self.stub(latency=2.0), self.stub()
+        router = providers.ProviderRouter(
+            [providers.OpenRouterProvider(url=slow.url), providers.OpenRouterProvider(url=fast.url)],
+            hedge=True, hedge_delay=0.1,
+        )
+
+        started = time.monotonic()
+        result = router.analyze("Python developer")
+
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual(result["ats_score"], 64)
+        self.assertEqual((slow.requests, fast.requests), (1, 1))
+
+    def test_circuit_opens_and_routes_around_failing_provider(self):
+        failing, healthy = self.stub(status=500), self.stub()
+        bad = providers.OpenRouterProvider(url=failing.url)
+        router = providers.ProviderRouter([bad, providers.OpenRouterProvider(url=healthy.url)])
+
+        for _ in range(3):
+            self.assertEqual(router.analyze("Python developer")["ats_score"], 64)
+
+        self.assertEqual(bad.breaker.state, "open")
+        self.assertEqual(failing.requests, 2)
+        self.assertEqual(healthy.requests, 3)
+
+    @override_settings(LLM_BREAKER_RESET=0)
+    def test_rate_limited_trial_lets_the_next_call_try_again(self):
+        provider = providers.OpenRouterProvider(url="http://llm.local")
+        provider.breaker.record_failure()
+        provider.breaker.record_failure()
+        self.assertEqual(provider.breaker.state, "half-open")
+
+        self.assertTrue(provider.breaker.allow())
+        provider._record({"error": "busy", "retry_after": 5}, 0.1)
+
+        self.assertEqual(provider.breaker.state, "half-open")
+        self.assertTrue(provider.breaker.allow())
+        provider._record({"ats_score": 64}, 0.1)
+        self.assertEqual(provider.breaker.state, "closed")
+
+
+class BenchmarkTests(TestCase):
+    def test_seeding_is_reproducible_and_cleared(self):
+        benchmarks.seed_analyses(30, batch_size=7, seed=1)
+        first = list(benchmarks.seeded_rows().order_by("file_name").values_list("ats_score", flat=True))
+        dates = benchmarks.seeded_rows().values_list("upload_date", flat=True)
+        self.assertLess(min(dates), timezone.now() - timedelta(days=1))
+        self.assertTrue(ResumeAnalysis._meta.get_field("upload_date").auto_now_add)
+        self.assertEqual(benchmarks.clear_seeded(), 30)
+
+        benchmarks.seed_analyses(30, batch_size=7, seed=1)
+        self.assertEqual(list(benchmarks.seeded_rows().order_by("file_name").values_list("ats_score", flat=True)), first)
+
+    def test_created_rows_tracks_only_rows_made_inside_the_block(self):
+        before = ResumeAnalysis.objects.create(file_name="real.pdf")
+        with benchmarks.created_rows(ResumeAnalysis) as created:
+            inside = ResumeAnalysis.objects.create(file_name="bench.pdf")
+            before.save()
+        after = ResumeAnalysis.objects.create(file_name="later.pdf")
+
+        self.assertEqual(created[ResumeAnalysis], [inside.pk])
+        self.assertNotIn(after.pk, created[ResumeAnalysis])
+
+    def test_compare_flags_slower_latency_and_lower_throughput(self):
+        baseline = {"meta": {"p50_ms": 1}, "upload": {"p95_ms": 100, "p50_ms": 50}, "extraction": {"files_per_second": 20}}
+        current = {"meta": {"p50_ms": 9}, "upload": {"p95_ms": 130, "p50_ms": 52}, "extraction": {"files_per_second": 15}}
+
+        regressions = benchmarks.compare_results(baseline, current, threshold_pct=10)
+
+        self.assertEqual(regressions, [("upload.p95_ms", 100, 130, 30.0), ("extraction.files_per_second", 20, 15, -25.0)])
+
+
+class SkillGapQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("jane", password="secret")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_skills(self, count):
+        start = Skill.objects.count()
+        for i in range(start, start + count):
+            skill = Skill.objects.create(name=f"Skill {i}", importance="High", demand_score=80)
+            Course.objects.create(skill=skill, title="Course", provider="Udemy", duration="4h",
+                                  rating=4.5, students="1k", price="Free", level="Beginner")
+            UserSkill.objects.create(user=self.user, skill=skill, current_level=i, required_level=90)
+
+    def test_query_count_does_not_grow_with_skills(self):
+        # skills + prefetched courses + the user's UserSkill rows
+        for total in (3, 30):
+            self.add_skills(total - Skill.objects.count())
+            with self.assertNumQueries(3):
+                response = self.client.get("/api/skill-gap-analysis/")
+            self.assertEqual(len(response.json()), total)
+
+        self.assertEqual(response.json()[5]["currentLevel"], 5)
+        self.assertEqual(response.json()[5]["requiredLevel"], 90)
+
+
+class DashboardRollupTests(TestCase):
+    def test_rollup_tracks_creates_updates_and_deletes(self):
+        job = ResumeAnalysis.objects.create(file_name="a.pdf", status="processing")
+        ResumeAnalysis.objects.create(file_name="b.pdf", status="completed", ats_score=80, clarity_score=60)
+        job.status, job.ats_score = "completed", 60
+        job.save()
+
+        day = DailyAnalysisStats.objects.get()
+        self.assertEqual((day.total, day.completed, day.processing), (2, 2, 0))
+        self.assertEqual((day.ats_sum, day.ats_count, day.clarity_count), (140, 2, 1))
+
+        job.delete()
+        day.refresh_from_db()
+        self.assertEqual((day.total, day.ats_sum, day.completed), (1, 80, 1))
+
+    def test_incremental_rollup_matches_rebuild(self):
+        ResumeAnalysis.objects.create(file_name="a.pdf", status="completed", ats_score=70)
+        ResumeAnalysis.objects.create(file_name="b.pdf", status="failed")
+        incremental = rollups.summarize()
+
+        rollups.rebuild()
+
+        self.assertEqual(rollups.summarize(), incremental)
+
+    def test_updates_diff_against_the_loaded_row_without_reselecting_it(self):
+        ResumeAnalysis.objects.create(file_name="a.pdf", status="processing")
+        job = ResumeAnalysis.objects.get()
+        job.status, job.ats_score = "completed", 75
+
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+
+        selects = [q["sql"] for q in queries if q["sql"].startswith("SELECT") and "analysis_resumeanalysis" in q["sql"]]
+        self.assertEqual(selects, [])
+        day = DailyAnalysisStats.objects.get()
+        self.assertEqual((day.total, day.completed, day.processing, day.ats_sum), (1, 1, 0, 75))
+
+    def test_malformed_scores_are_left_out(self):
+        counts = rollups.contribution("88", "n/a", "completed")
+
+        self.assertEqual((counts["ats_sum"], counts["ats_count"]), (88, 1))
+        self.assertNotIn("clarity_count", counts)
+
+    def test_dashboard_reads_rollup_only(self):
+        ResumeAnalysis.objects.create(file_name="a.pdf", status="completed", ats_score=70)
+
+        with self.assertNumQueries(4):  # the analyses version, then three rollup sums
+            stats = self.client.get("/api/dashboard-stats/").json()
+
+        self.assertEqual(stats[0]["value"], 1)
+        self.assertEqual(stats[0]["change"], "100%")
+        self.assertEqual(stats[1]["value"], "70%")
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        ResumeAnalysis.objects.create(file_name="a.pdf", status="completed", ats_score=70)
+
+    def test_polls_are_served_from_memory_until_an_analysis_is_written(self):
+        first = self.client.get("/api/recent-analyses/")
+        with self.assertNumQueries(1):  # only the version lookup
+            again = self.client.get("/api/recent-analyses/")
+        self.assertEqual(again.json(), first.json())
+        self.assertEqual(again["ETag"], first["ETag"])
+
+        ResumeAnalysis.objects.create(file_name="b.pdf", status="completed", ats_score=80)
+        changed = self.client.get("/api/recent-analyses/")
+        self.assertEqual([row["name"] for row in changed.json()], ["b.pdf", "a.pdf"])
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+    def test_if_none_match_answers_304(self):
+        etag = self.client.get("/api/current-analysis/")["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/current-analysis/", HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        ResumeAnalysis.objects.get().delete()
+        self.assertEqual(self.client.get("/api/current-analysis/", HTTP_IF_NONE_MATCH=etag).status_code, 204)
+
+    @override_settings(RESPONSE_CACHE_VERSION_TTL=60)
+    def test_version_ttl_skips_the_version_lookup(self):
+        etag = self.client.get("/api/latest-analysis/")["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/latest-analysis/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class AnalysisListTests(TestCase):
+    def setUp(self):
+        for i in range(25):
+            ResumeAnalysis.objects.create(
+                file_name=f"Resume_{i:02d}.pdf", status="completed", ats_score=i,
+                skills_match={"technical": ["Python"]}, strengths=["x" * 1000],
+            )
+
+    def test_pages_are_keyset_ordered_and_slim(self):
+        first = self.client.get("/api/analyses/").json()
+        second = self.client.get(first["next"]).json()
+
+        names = [row["file_name"] for row in first["results"] + second["results"]]
+        self.assertEqual(names, [f"Resume_{i:02d}.pdf" for i in reversed(range(25))])
+        self.assertNotIn("strengths", first["results"][0])
+        self.assertIsNone(second["next"])
+
+    def test_retrieve_returns_full_detail(self):
+        analysis = ResumeAnalysis.objects.first()
+
+        detail = self.client.get(f"/api/analyses/{analysis.id}/").json()
+
+        self.assertEqual(detail["skills_match"], {"technical": ["Python"]})
+
+    def test_list_query_defers_heavy_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/analyses/?status=completed")
+
+        self.assertNotIn("strengths", queries[-1]["sql"])
+
+    def names(self, query):
+        return sorted(row["file_name"] for row in self.client.get(f"/api/analyses/?{query}").json()["results"])
+
+    def test_search_matches_anywhere_and_prefix_is_opt_in(self):
+        self.assertEqual(self.names("search=e_1"), [f"Resume_{i}.pdf" for i in range(10, 20)])
+        self.assertEqual(self.names("search=_07"), ["Resume_07.pdf"])
+        self.assertEqual(self.names("file_name__istartswith=resume_2"), [f"Resume_{i}.pdf" for i in range(20, 25)])
+        self.assertEqual(self.names("file_name__istartswith=_07"), [])
+
+    def test_read_path_indexes_exist(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, ResumeAnalysis._meta.db_table)
+
+        indexed = {name: info["columns"] for name, info in constraints.items() if info["index"]}
+        self.assertEqual(indexed["analysis_upload_date_idx"], ["upload_date"])
+        self.assertEqual(indexed["analysis_status_date_idx"], ["status", "upload_date"])
+        self.assertEqual(indexed["analysis_file_name_idx"], ["file_name"])
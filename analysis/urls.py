@@ -9,7 +9,12 @@ from .views import (
     sample_data,
     ResumeUploadAPIView,
     SkillGapAnalysisView,
-    ResumeAnalysisViewSet
+    ResumeAnalysisViewSet,
+    ResumeBatchViewSet,
+    ResumeViewSet,
+    JobDescriptionViewSet,
+    JobMatchViewSet,
+    BatchResumeUploadAPIView
 )
 from django.urls import path
 from rest_framework_simplejwt.views import (
@@ -20,6 +25,10 @@ from analysis.views import RegisterView
 from .views import RegisterView, ResumeAnalysisView
 router = DefaultRouter()
 router.register(r'analyses', ResumeAnalysisViewSet)
+router.register(r'resume-batches', ResumeBatchViewSet)
+router.register(r'resumes', ResumeViewSet)
+router.register(r'job-descriptions', JobDescriptionViewSet)
+router.register(r'job-matches', JobMatchViewSet)
 
 urlpatterns = [
     # path('', upload_resume, name='upload_resume'),
@@ -29,14 +38,23 @@ urlpatterns = [
     path('', react_index, name='react-index'),
     path('api/sample/', sample_data, name='sample_data'),
     path('api/upload-resume/', ResumeUploadAPIView.as_view(), name='upload-resume'),
+    path('api/upload-resumes/', BatchResumeUploadAPIView.as_view(), name='upload-resumes'),
     path('api/skill-gap-analysis/', SkillGapAnalysisView.as_view(), name='skill-gap-analysis'),
     path('api/latest-analysis/', get_latest_analysis),
     path('api/sample/', views.sample_api),
     path('api/current-analysis/', views.current_analysis),
     path('api/dashboard-stats/', views.dashboard_stats),
     path('api/recent-analyses/', views.recent_analyses),
+    path('api/analysis-cache/stats/', views.analysis_cache_stats),
+    path('api/llm-providers/stats/', views.llm_provider_stats),
+    path('metrics', views.metrics, name='metrics'),
     path('api/upload-jd/', upload_jd_file),
     path('api/match-resume-jd/', match_resume_jd),
+    path('api/resumes/<int:pk>/analyze-stream/', views.stream_resume_analysis, name='stream-resume-analysis'),
+    path('api/stream/upload-resume/', views.stream_upload_resume, name='stream-upload-resume'),
+    path('api/async/upload-resume/', views.async_upload_resume, name='async-upload-resume'),
+    path('api/async/match-resume-jd/', views.async_match_resume_jd, name='async-match-resume-jd'),
+    path('api/async/resumes/<int:pk>/reanalyze/', views.async_reanalyze_resume, name='async-reanalyze-resume'),
   
     path('api/register/', RegisterView.as_view(), name='register'),
     path('register/', RegisterView.as_view(), name='register'),
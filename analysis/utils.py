@@ -1,8 +1,9 @@
-import requests
 import os
 import json
 import re
 
+from .llm_client import post_json, provider_url
+
 HF_API_KEY = os.getenv("HF_API_KEY")
 HF_MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
 
@@ -11,8 +12,7 @@ headers = {
     "Content-Type": "application/json"
 }
 
-def analyze_resume_with_huggingface(text):
-    prompt = f"""
+HF_PROMPT = """
 You are a resume analysis expert.
 
 Analyze the following resume and return ONLY valid JSON with these keys:
@@ -30,28 +30,39 @@ Resume:
 Respond only with a valid JSON.
 """
 
+
+def huggingface_url(model=HF_MODEL):
+    return f"https://api-inference.huggingface.co/models/{model}"
+
+
+def build_huggingface_request(text):
+    """(headers, body) of the Hugging Face inference request"""
+    return headers, {"inputs": HF_PROMPT.format(text=text)}
+
+
+def parse_huggingface_response(response):
+    """Turn a requests/httpx response into the analysis dict (or {"error": ...})"""
+    result = response.json()
+
+    if isinstance(result, dict) and "error" in result:
+        return {"error": result["error"]}
+
+    if isinstance(result, list) and "generated_text" in result[0]:
+        output_text = result[0]["generated_text"]
+    elif isinstance(result, dict) and "generated_text" in result:
+        output_text = result["generated_text"]
+    else:
+        return {"error": "No generated_text found in response."}
+
+    # Try extracting JSON from the text
+    match = re.search(r"\{.*\}", output_text, re.DOTALL)
+    return json.loads(match.group()) if match else {"error": "Invalid JSON format"}
+
+
+def analyze_resume_with_huggingface(text):
     try:
-        response = requests.post(
-            f"https://api-inference.huggingface.co/models/{HF_MODEL}",
-            headers=headers,
-            json={"inputs": prompt},
-            timeout=60
-        )
-        result = response.json()
-
-        if isinstance(result, dict) and "error" in result:
-            return {"error": result["error"]}
-
-        if isinstance(result, list) and "generated_text" in result[0]:
-            output_text = result[0]["generated_text"]
-        elif isinstance(result, dict) and "generated_text" in result:
-            output_text = result["generated_text"]
-        else:
-            return {"error": "No generated_text found in response."}
-
-        # Try extracting JSON from the text
-        match = re.search(r"\{.*\}", output_text, re.DOTALL)
-        return json.loads(match.group()) if match else {"error": "Invalid JSON format"}
+        request_headers, body = build_huggingface_request(text)
+        return parse_huggingface_response(post_json(provider_url("huggingface", huggingface_url()), body, headers=request_headers))
 
     except Exception as e:
         return {"error": str(e)}
@@ -1,15 +1,48 @@
+import asyncio
+import logging
+import os
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
-from rest_framework.parsers import MultiPartParser
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status, viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Resume, ResumeAnalysis, Skill
-from .serializers import ResumeAnalysisSerializer, SkillGapSerializer
-from .resume_analysis import extract_text_from_pdf, analyze_resume_with_llm
+from .models import JobDescription, JobMatch, Resume, ResumeAnalysis, ResumeBatch, Skill
+from .serializers import (
+    JobDescriptionSerializer, JobMatchSerializer, ResumeAnalysisListSerializer, ResumeAnalysisSerializer,
+    ResumeBatchSerializer, ResumeSerializer, SkillGapSerializer, user_skill_map
+)
+from .pagination import AnalysisCursorPagination
+from .cache import analysis_cache, hash_uploaded_file
+from .jobs import fail_if_stale, run_analysis_job, submit_analysis_job, submit_batch_job, submit_match_job
+from .batch import BatchEntry, iter_batch_pdfs
+from .providers import get_router
+from .pipeline import analysis_fields, analyze_text_async, get_resume_text, remember_on_resume, store_resume
+from .documents import PDF, load_document, load_job_description, load_resume_and_jd, sniff_format
+from .job_descriptions import match_resumes, save_job_description
+from .ranking import rank_resumes
+from .metrics import registry, span, timed
+from .ratelimit import RateLimitExceeded
+from .response_cache import cached_response
+from .skill_index import filter_by_skills, parse_skill_list
+from .pdf_pool import extract_pdf_text
+from .resume_analysis import (
+    analysis_error, match_resume_with_jd, match_resume_with_jd_async, parse_analysis_output,
+    stream_resume_analysis_with_llm
+)
+from .streaming import IncrementalJSONParser, sse_event
+from .rollups import dashboard_periods, period_change
+
+logger = logging.getLogger(__name__)
 
 
 # ✅ Test route to verify API health
@@ -17,71 +50,331 @@ def sample_data(request):
     return JsonResponse({'message': 'Hello from Django Gaurav!'})
 
 
+def llm_error_response(result, response_class=Response):
+    """500 for a failed LLM call; 503 with Retry-After when it was rate limited"""
+    if result.get("retry_after"):
+        response = response_class({"error": result["error"]}, status=503)
+        response["Retry-After"] = str(result["retry_after"])
+        return response
+    return response_class({"error": result["error"]}, status=500)
+
+
+def start_analysis(analysis, content_hash=None, use_cache=True):
+    """Queue (or, with ANALYSIS_ASYNC off, run) the job for a `processing` analysis"""
+    if settings.ANALYSIS_ASYNC:
+        submit_analysis_job(analysis.id, content_hash, use_cache)
+        serializer = ResumeAnalysisSerializer(analysis)
+        return Response({
+            "message": "Resume uploaded. Analysis in progress.",
+            "job_id": analysis.id,
+            "status_url": f"/api/analyses/{analysis.id}/status/",
+            "analysis": serializer.data
+        }, status=202)
+
+    analysis = run_analysis_job(analysis.id, content_hash, use_cache)
+
+    # ❌ If extraction or the LLM fails
+    if analysis.status == "failed":
+        return llm_error_response({"error": analysis.error_message, "retry_after": getattr(analysis, "retry_after", None)})
+
+    serializer = ResumeAnalysisSerializer(analysis)
+    return Response({
+        "message": "Resume uploaded and analyzed successfully.",
+        "analysis": serializer.data
+    }, status=201)
+
+
 # ✅ Upload a resume (PDF), analyze it with LLM, and save analysis
 class ResumeUploadAPIView(APIView):
     parser_classes = [MultiPartParser]
 
+    @timed("upload_resume")
     def post(self, request):
         uploaded_file = request.FILES.get("file")
 
         # ❌ Invalid or missing file
-        if not uploaded_file or not uploaded_file.name.endswith(".pdf"):
+        if not uploaded_file or sniff_format(uploaded_file) != PDF:
             return Response({"error": "Only PDF files allowed."}, status=400)
 
         try:
-            # ✅ Save file to Resume model (optional file storage)
-            resume = Resume(file=uploaded_file)
-            resume.save()
-
-            # ✅ Extract text from the PDF
-            path = resume.file.path
-            extracted_text = extract_text_from_pdf(path)
-
-            if not extracted_text.strip():
-                return Response({"error": "No readable text found in resume."}, status=400)
-
-            # ✅ Analyze resume text using Hugging Face LLM
-            result = analyze_resume_with_llm(extracted_text)
-            print("DEBUG ANALYSIS RESULT:", result)
-
-            # ❌ If LLM fails
-            if "error" in result:
-                return Response({"error": result["error"]}, status=500)
-
-            # ✅ Save results to ResumeAnalysis model
-            analysis = ResumeAnalysis.objects.create(
-                file_name=uploaded_file.name,
-                ats_score=result.get("ats_score"),
-                clarity_score=result.get("clarity_score"),
-                experience=result.get("experience"),
-                education=result.get("education"),
-                skills_match=result.get("skills"),
-                strengths=result.get("strengths"),
-                weaknesses=result.get("weaknesses"),
-                job_matches=result.get("job_matches"),
-                status="completed",
-                trend="neutral",
-                previous_score=0
-            )
-
-            serializer = ResumeAnalysisSerializer(analysis)
+            content_hash = hash_uploaded_file(uploaded_file)
+            # ✅ Save file to Resume model (re-uploads reuse the stored file and its text)
+            resume = store_resume(uploaded_file, content_hash)
+
+            # ✅ Identical bytes were analyzed before: skip parsing and the LLM
+            result = analysis_cache.get_by_content(content_hash)
+            if result is not None:
+                with span("db_write"):
+                    changed = remember_on_resume(resume, None, result)
+                    if changed:
+                        resume.save(update_fields=changed)
+                    analysis = ResumeAnalysis.objects.create(
+                        file_name=uploaded_file.name,
+                        resume=resume,
+                        status="completed",
+                        trend="neutral",
+                        previous_score=0,
+                        **analysis_fields(result)
+                    )
+                serializer = ResumeAnalysisSerializer(analysis)
+                return Response({
+                    "message": "Resume uploaded and analyzed successfully.",
+                    "analysis": serializer.data
+                }, status=201)
+
+            with span("db_write"):
+                analysis = ResumeAnalysis.objects.create(
+                    file_name=uploaded_file.name,
+                    resume=resume,
+                    status="processing",
+                    trend="neutral",
+                    previous_score=0
+                )
+            return start_analysis(analysis, content_hash)
+
+        except Exception:
+            logger.exception("Resume upload failed")
+            return Response({"error": "Something went wrong during analysis."}, status=500)
+
+
+# ✅ Upload many resumes at once: several PDFs and/or .zip archives under "files"
+class BatchResumeUploadAPIView(APIView):
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        uploads = request.FILES.getlist("files")
+        if not uploads:
+            return Response({"error": "No files uploaded."}, status=400)
+
+        try:
+            # ✅ Store each distinct file once; duplicates reuse the stored Resume
+            entries = []
+            stored = {}
+            for pdf in iter_batch_pdfs(uploads):
+                content_hash = hash_uploaded_file(pdf)
+                resume = stored.get(content_hash)
+                if resume is None:
+                    resume = stored[content_hash] = store_resume(pdf, content_hash)
+                entries.append(BatchEntry(pdf.name, resume.file.path, content_hash, resume))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        if not entries:
+            return Response({"error": "No PDF files found in upload."}, status=400)
+
+        batch = ResumeBatch.objects.create(total_files=len(entries), unique_files=len(stored))
+        submit_batch_job(batch, entries)
+
+        if settings.ANALYSIS_ASYNC:
             return Response({
-                "message": "Resume uploaded and analyzed successfully.",
-                "analysis": serializer.data
-            }, status=201)
+                "message": "Batch accepted. Analysis in progress.",
+                "batch_id": batch.id,
+                "status_url": f"/api/resume-batches/{batch.id}/",
+                "batch": ResumeBatchSerializer(batch).data
+            }, status=202)
+
+        batch.refresh_from_db()
+        return Response({
+            "message": "Batch analyzed.",
+            "batch": ResumeBatchSerializer(batch).data
+        }, status=201)
+
+
+# ✅ Stored resumes: re-run analysis or JD matching without re-uploading the PDF
+class ResumeViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Resume.objects.all().order_by('-uploaded_at')
+    serializer_class = ResumeSerializer
+
+    # POST /api/resumes/<id>/reanalyze/  {"force": true} skips the analysis cache
+    @action(detail=True, methods=['post'])
+    def reanalyze(self, request, pk=None):
+        resume = self.get_object()
+        force = str(request.data.get("force", "")).lower() in ("1", "true")
+
+        analysis = ResumeAnalysis.objects.create(
+            file_name=os.path.basename(resume.file.name),
+            resume=resume,
+            status="processing",
+            trend="neutral",
+            previous_score=0
+        )
+        return start_analysis(analysis, resume.content_hash or None, use_cache=not force)
+
+    # POST /api/resumes/<id>/match-jd/  with "jd_text" or a "jd" file
+    @action(detail=True, methods=['post'], url_path='match-jd', parser_classes=[MultiPartParser, JSONParser])
+    def match_jd(self, request, pk=None):
+        resume = self.get_object()
+
+        try:
+            jd_text = request.data.get("jd_text")
+            if not jd_text and request.FILES.get("jd"):
+                jd_text = load_job_description(request.FILES["jd"])
+            if jd_text is None:
+                return Response({"error": "Provide jd_text or a PDF, DOCX or TXT jd file."}, status=400)
+
+            resume_text = get_resume_text(resume)
+            if not resume_text or not jd_text.strip():
+                return Response({"error": "Extracted text is empty from resume or JD."}, status=400)
+
+            data = match_resume_with_jd(resume_text, jd_text)
+            return Response(data, status=500 if "error" in data else 200)
 
+        except RateLimitExceeded as e:
+            return llm_error_response(analysis_error(e))
         except Exception as e:
-            print("ERROR:", str(e))
-            return Response({"error": "Something went wrong during analysis."}, status=500)
+            return Response({"error": str(e)}, status=500)
+
+
+# ✅ Batch progress and throughput
+class ResumeBatchViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ResumeBatch.objects.all().order_by('-created_at')
+    serializer_class = ResumeBatchSerializer
+
+    def get_object(self):
+        return fail_if_stale(super().get_object())
+
+
+# ✅ Stored job descriptions, matched against many stored resumes in one call
+class JobDescriptionViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = JobDescription.objects.all().order_by('-created_at')
+    serializer_class = JobDescriptionSerializer
+
+    def _top_k(self, request):
+        """top_k from the query or body, capped at RANKING_MAX_TOP_K; None when it is not an integer"""
+        value = request.query_params.get("top_k") or request.data.get("top_k")
+        if value in (None, ""):
+            return settings.RANKING_TOP_K
+        try:
+            return min(max(1, int(value)), settings.RANKING_MAX_TOP_K)
+        except (TypeError, ValueError):
+            return None
+
+    def _bad_top_k(self):
+        return Response({"error": "top_k must be an integer."}, status=400)
+
+    def _prefilter(self, jd, top_k, candidates=None):
+        return [
+            {"resume_id": resume_id, "score": score, "bm25": bm25, "skill_overlap": overlap}
+            for resume_id, score, bm25, overlap in rank_resumes(jd.text, jd.required_skills, top_k, candidates)
+        ]
+
+    # GET /api/job-descriptions/<id>/candidates/?top_k=50  local BM25 + skill ranking, no LLM
+    @action(detail=True, methods=['get'])
+    def candidates(self, request, pk=None):
+        jd = self.get_object()
+        top_k = self._top_k(request)
+        if top_k is None:
+            return self._bad_top_k()
+        return Response({"job_description_id": jd.id, "results": self._prefilter(jd, top_k)})
+
+    # POST /api/job-descriptions/<id>/match/  {"resume_ids": [1, 2, 3], "top_k": 20}
+    # Only the top_k resumes of the local ranking are scored by the LLM;
+    # without resume_ids they are picked from every indexed resume.
+    # More than JD_MATCH_INLINE_MAX resumes are scored in the background: 202 + status_url.
+    @action(detail=True, methods=['post'], parser_classes=[JSONParser])
+    def match(self, request, pk=None):
+        jd = self.get_object()
+        top_k = self._top_k(request)
+        if top_k is None:
+            return self._bad_top_k()
+
+        resume_ids = request.data.get("resume_ids")
+        if resume_ids is not None:
+            if not isinstance(resume_ids, list) or not resume_ids:
+                return Response({"error": "resume_ids must be a non-empty list."}, status=400)
+            try:
+                resume_ids = list(dict.fromkeys(int(i) for i in resume_ids))
+            except (TypeError, ValueError):
+                return Response({"error": "resume_ids must be integers."}, status=400)
+
+            existing = set(Resume.objects.filter(pk__in=resume_ids).values_list("pk", flat=True))
+            missing = sorted(set(resume_ids) - existing)
+            if missing:
+                return Response({"error": "Unknown resume ids.", "missing": missing}, status=404)
+
+        prefilter = None
+        if resume_ids is None or len(resume_ids) > top_k:
+            prefilter = self._prefilter(jd, top_k, resume_ids)
+            selected = [row["resume_id"] for row in prefilter]
+        else:
+            selected = resume_ids
+
+        if len(selected) > settings.BATCH_MAX_FILES:
+            return Response({"error": f"At most {settings.BATCH_MAX_FILES} resumes per match."}, status=400)
+
+        extra = {"candidates": len(resume_ids) if resume_ids is not None else None}
+        if prefilter is not None:
+            extra["prefilter"] = prefilter
+
+        if settings.ANALYSIS_ASYNC and len(selected) > settings.JD_MATCH_INLINE_MAX:
+            match = JobMatch.objects.create(job_description=jd, resume_ids=selected)
+            submit_match_job(match.id, extra)
+            return Response({
+                "message": "Match accepted. Scoring in progress.",
+                "match_id": match.id,
+                "status_url": f"/api/job-matches/{match.id}/",
+                "match": JobMatchSerializer(match).data
+            }, status=202)
+
+        ranked, summary = match_resumes(jd, list(Resume.objects.filter(pk__in=selected)))
+        return Response({**summary, **extra, "results": ranked})
+
+
+# ✅ Background JD matches: GET /api/job-matches/<id>/ until status is completed or failed
+class JobMatchViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = JobMatch.objects.all().order_by('-created_at')
+    serializer_class = JobMatchSerializer
+
+    def get_object(self):
+        return fail_if_stale(super().get_object())
 
 
 # ✅ View all resume analysis records with filters
 class ResumeAnalysisViewSet(viewsets.ModelViewSet):
     queryset = ResumeAnalysis.objects.all().order_by('-upload_date')
     serializer_class = ResumeAnalysisSerializer
+    pagination_class = AnalysisCursorPagination
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
-    search_fields = ['file_name']
-    filterset_fields = ['status']
+    search_fields = ['file_name']  # ?search= matches anywhere in the name (scans the table)
+    # ?file_name__istartswith= is the prefix match that analysis_file_name_idx can serve
+    filterset_fields = {'status': ['exact'], 'batch': ['exact'], 'file_name': ['istartswith']}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # skills_match/strengths/weaknesses/experience/education stay in the DB
+            queryset = queryset.only(*ResumeAnalysisListSerializer.Meta.fields)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ResumeAnalysisListSerializer
+        return super().get_serializer_class()
+
+    # ✅ Candidates by skill: GET /api/analyses/by-skills/?all=python,django&any=aws,gcp
+    # Aliases are resolved ("k8s" finds "kubernetes") and answered from the skill postings
+    @action(detail=False, methods=['get'], url_path='by-skills')
+    def by_skills(self, request):
+        all_of = parse_skill_list(request.query_params.get("all"))
+        any_of = parse_skill_list(request.query_params.get("any"))
+        if not all_of and not any_of:
+            return Response({"error": "Pass skills in 'all' and/or 'any' (comma-separated)."}, status=400)
+
+        queryset = ResumeAnalysis.objects.all().only(*ResumeAnalysisListSerializer.Meta.fields)
+        queryset = self.filter_queryset(filter_by_skills(queryset, all_of, any_of))
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(ResumeAnalysisListSerializer(page, many=True).data)
+
+    # ✅ Poll a background analysis job: GET /api/analyses/<id>/status/
+    @action(detail=True, methods=['get'], url_path='status')
+    def job_status(self, request, pk=None):
+        analysis = fail_if_stale(self.get_object())
+        data = {"job_id": analysis.id, "status": analysis.status}
+        if analysis.status == "failed":
+            data["error"] = analysis.error_message
+        elif analysis.status == "completed":
+            data["analysis"] = self.get_serializer(analysis).data
+        return Response(data)
 
 
 # ✅ Secure skill gap analysis for logged-in users
@@ -90,7 +383,10 @@ class SkillGapAnalysisView(APIView):
 
     def get(self, request):
         skills = Skill.objects.prefetch_related('courses').all()
-        serializer = SkillGapSerializer(skills, many=True, context={'request': request})
+        serializer = SkillGapSerializer(skills, many=True, context={
+            'request': request,
+            'user_skills': user_skill_map(request.user),
+        })
         return Response(serializer.data)
 
 
@@ -105,6 +401,7 @@ from .models import ResumeAnalysis
 from .serializers import ResumeAnalysisSerializer
 
 @api_view(['GET'])
+@cached_response("latest_resume_analysis")
 def latest_resume_analysis(request):
     latest = ResumeAnalysis.objects.order_by('-upload_date').first()
     if latest:
@@ -120,6 +417,7 @@ from .models import ResumeAnalysis
 from .serializers import ResumeAnalysisSerializer
 
 @api_view(['GET'])
+@cached_response("latest_analysis")
 def get_latest_analysis(request):
     try:
         analysis = ResumeAnalysis.objects.latest('upload_date')  # You can filter by user later
@@ -131,7 +429,6 @@ def get_latest_analysis(request):
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .models import ResumeAnalysis
-from django.db.models import Avg
 from datetime import datetime
 
 
@@ -141,6 +438,24 @@ def sample_api(request):
 
 
 @api_view(['GET'])
+def analysis_cache_stats(request):
+    return Response(analysis_cache.stats())
+
+
+@api_view(['GET'])
+def llm_provider_stats(request):
+    return Response(get_router().stats())
+
+
+# ✅ Prometheus scrape target; per-process numbers, only served to METRICS_ALLOWED_IPS
+def metrics(request):
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@api_view(['GET'])
+@cached_response("current_analysis")
 def current_analysis(request):
     latest = ResumeAnalysis.objects.order_by('-upload_date').first()
 
@@ -161,36 +476,40 @@ def current_analysis(request):
 
 
 @api_view(['GET'])
+# the 30-day periods move at midnight, so the cached stats are per day as well
+@cached_response("dashboard_stats", vary=lambda request: timezone.localdate().isoformat())
 def dashboard_stats(request):
-    total = ResumeAnalysis.objects.count()
-    avg_ats = ResumeAnalysis.objects.aggregate(Avg('ats_score'))['ats_score__avg'] or 0
+    # Reads the daily rollup (one row per day), never the ResumeAnalysis table
+    overall, current, previous = dashboard_periods(days=30)
+    total = overall["total"]
+    change = period_change(current["total"], previous["total"])
 
     stats = [
         {
             "name": "Total Resumes Analyzed",
             "value": total,
-            "change": "12%",
+            "change": change,
             "color": "bg-blue-500",
             "icon": "DocumentTextIcon"
         },
         {
             "name": "Average ATS Score",
-            "value": f"{avg_ats:.0f}%",
-            "change": "6%",
+            "value": f"{overall['avg_ats']:.0f}%",
+            "change": period_change(current["avg_ats"], previous["avg_ats"]),
             "color": "bg-green-500",
             "icon": "ChartBarIcon"
         },
         {
             "name": "Job Matches Found",
             "value": total * 2,  # Placeholder logic
-            "change": "18%",
+            "change": change,
             "color": "bg-purple-500",
             "icon": "BriefcaseIcon"
         },
         {
             "name": "Skills Improved",
             "value": total * 3,  # Placeholder logic
-            "change": "9%",
+            "change": change,
             "color": "bg-orange-500",
             "icon": "AcademicCapIcon"
         }
@@ -200,6 +519,7 @@ def dashboard_stats(request):
 
 
 @api_view(['GET'])
+@cached_response("recent_analyses")
 def recent_analyses(request):
     recent = ResumeAnalysis.objects.order_by('-upload_date')[:5]
     data = []
@@ -234,23 +554,22 @@ def upload_jd_file(request):
         return Response({"error": "No file uploaded"}, status=400)
 
     try:
-        filename = file.name.lower()
-
-        if filename.endswith('.pdf'):
-            reader = PdfReader(file)
-            text = "\n".join([page.extract_text() or "" for page in reader.pages])
-
-        elif filename.endswith('.docx'):
-            doc = Document(file)
-            text = "\n".join([para.text for para in doc.paragraphs])
+        content_hash = hash_uploaded_file(file)
+        text = load_job_description(file, content_hash)
 
-        elif filename.endswith('.txt'):
-            text = file.read().decode("utf-8")
-
-        else:
+        if text is None:
             return Response({"error": "Unsupported file format. Only PDF, DOCX, TXT supported."}, status=400)
-
-        return Response({"jd_text": text})
+        if not text:
+            return Response({"error": "Could not read text from file."}, status=400)
+
+        # ✅ Keep the JD so it can be matched against many resumes by id
+        jd = save_job_description(text, content_hash, title=file.name)
+        return Response({
+            "jd_text": text,
+            "job_description_id": jd.id,
+            "keywords": jd.keywords,
+            "required_skills": jd.required_skills
+        })
 
     except Exception as e:
         return Response({"error": str(e)}, status=500)
@@ -287,6 +606,7 @@ import json
 
 @api_view(['POST'])
 @parser_classes([MultiPartParser])
+@timed("match_resume_jd")
 def match_resume_jd(request):
     resume_file = request.FILES.get('resume')
     jd_file = request.FILES.get('jd')
@@ -295,89 +615,21 @@ def match_resume_jd(request):
         return Response({"error": "Both resume and JD files are required"}, status=400)
 
     try:
-        # --- Extract Resume Text ---
-        if resume_file.name.endswith('.pdf'):
-            resume_text = "\n".join([page.extract_text() or "" for page in PdfReader(resume_file).pages])
-        elif resume_file.name.endswith('.docx'):
-            doc = Document(resume_file)
-            resume_text = "\n".join([p.text for p in doc.paragraphs])
-        elif resume_file.name.endswith('.txt'):
-            resume_text = resume_file.read().decode('utf-8')
-        else:
+        # --- Extract resume and JD text concurrently ---
+        resume_text, jd_text = load_resume_and_jd(resume_file, jd_file)
+        if resume_text is None:
             return Response({"error": "Unsupported resume file format"}, status=400)
-
-        # --- Extract JD Text ---
-        if jd_file.name.endswith('.pdf'):
-            jd_text = "\n".join([page.extract_text() or "" for page in PdfReader(jd_file).pages])
-        elif jd_file.name.endswith('.docx'):
-            doc = Document(jd_file)
-            jd_text = "\n".join([p.text for p in doc.paragraphs])
-        elif jd_file.name.endswith('.txt'):
-            jd_text = jd_file.read().decode('utf-8')
-        else:
+        if jd_text is None:
             return Response({"error": "Unsupported JD file format"}, status=400)
 
         if not resume_text.strip() or not jd_text.strip():
             return Response({"error": "Extracted text is empty from resume or JD."}, status=400)
 
-        # --- Prompt for LLM ---
-        prompt = f"""
-You are an AI assistant that matches resumes with job descriptions.
-
-Here is the RESUME:
-\"\"\"{resume_text}\"\"\"
-
-Here is the JOB DESCRIPTION:
-\"\"\"{jd_text}\"\"\"
-
-Instructions:
-- Compare the resume and job description.
-- Give a match score from 0 to 100.
-- Suggest 3 improvements to make the resume better match the job description.
-
-Return ONLY a JSON object with this format (and nothing else):
-{{
-  "match_score": 85,
-  "suggestions": [
-    "Add experience with cloud technologies",
-    "Include project management skills",
-    "Highlight familiarity with Docker and Kubernetes"
-  ]
-}}
-        """.strip()
-
-        # --- OpenRouter API Call ---
-        OPENROUTER_API_KEY = os.getenv("OR_API_KEY")
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        body = {
-            "model": "meta-llama/llama-3-70b-instruct",
-            "temperature": 0,  # 🔐 Deterministic output
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
-        }
-
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", json=body, headers=headers)
-        response.raise_for_status()
-        result = response.json()
-
-        # --- Extract and Parse LLM Response ---
-        content = result["choices"][0]["message"]["content"]
-
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            return Response({
-                "error": "LLM returned non-JSON output",
-                "raw_response": content
-            }, status=500)
-
-        return Response(data)
+        data = match_resume_with_jd(resume_text, jd_text)
+        return Response(data, status=500 if "error" in data else 200)
 
+    except RateLimitExceeded as e:
+        return llm_error_response(analysis_error(e))
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -436,3 +688,230 @@ class ResumeAnalysisView(APIView):
         # Your resume analysis logic goes here
         return Response({"message": "Resume analyzed successfully."})
 
+
+# ✅ Streaming analysis over server-sent events.
+# Each top-level field of the LLM's JSON (ats_score, skills, ...) is sent as a
+# `field` event as soon as it is complete, then `done` carries the saved
+# analysis. `?tokens=1` also forwards the raw text as `token` events.
+
+def _analysis_event_stream(resume, file_name, use_cache=True, send_tokens=False):
+    yield sse_event("status", {"stage": "extracting"})
+
+    content_hash = resume.content_hash or None
+    text = None
+    result = analysis_cache.get_by_content(content_hash) if content_hash and use_cache else None
+    if result is None:
+        text = get_resume_text(resume)
+        if not text or not text.strip():
+            yield sse_event("error", {"error": "No readable text found in resume."})
+            return
+        result = analysis_cache.get_by_text(text) if use_cache else None
+
+    if result is not None:
+        for key, value in result.items():
+            yield sse_event("field", {"key": key, "value": value})
+    else:
+        yield sse_event("status", {"stage": "analyzing"})
+        parser = IncrementalJSONParser()
+        output = []
+        try:
+            for delta in stream_resume_analysis_with_llm(text):
+                output.append(delta)
+                if send_tokens:
+                    yield sse_event("token", {"text": delta})
+                for key, value in parser.feed(delta):
+                    yield sse_event("field", {"key": key, "value": value})
+            result = parse_analysis_output("".join(output))
+        except Exception as e:
+            result = analysis_error(e)
+
+        # ❌ If LLM fails
+        if "error" in result:
+            yield sse_event("error", result)
+            return
+        analysis_cache.store(result, content_hash=content_hash, text=text)
+
+    changed = remember_on_resume(resume, text, result)
+    if changed:
+        resume.save(update_fields=changed)
+
+    analysis = ResumeAnalysis.objects.create(
+        file_name=file_name,
+        resume=resume,
+        status="completed",
+        trend="neutral",
+        previous_score=0,
+        **analysis_fields(result)
+    )
+    yield sse_event("done", {"analysis": ResumeAnalysisSerializer(analysis).data})
+
+
+def _event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # keep nginx from buffering the events
+    return response
+
+
+def _wants(request, flag):
+    return request.GET.get(flag, "").lower() in ("1", "true")
+
+
+# GET /api/resumes/<id>/analyze-stream/  (EventSource-friendly)
+def stream_resume_analysis(request, pk):
+    if request.method != "GET":
+        return _method_not_allowed()
+
+    try:
+        resume = Resume.objects.get(pk=pk)
+    except Resume.DoesNotExist:
+        return JsonResponse({"error": "Resume not found."}, status=404)
+
+    return _event_stream_response(_analysis_event_stream(
+        resume, os.path.basename(resume.file.name),
+        use_cache=not _wants(request, "force"), send_tokens=_wants(request, "tokens")
+    ))
+
+
+# POST /api/stream/upload-resume/  multipart "file", answered as an event stream
+@csrf_exempt
+def stream_upload_resume(request):
+    if request.method != "POST":
+        return _method_not_allowed()
+
+    uploaded_file = request.FILES.get("file")
+    if not uploaded_file or sniff_format(uploaded_file) != PDF:
+        return JsonResponse({"error": "Only PDF files allowed."}, status=400)
+
+    resume = store_resume(uploaded_file, hash_uploaded_file(uploaded_file))
+    return _event_stream_response(_analysis_event_stream(
+        resume, uploaded_file.name, send_tokens=_wants(request, "tokens")
+    ))
+
+
+# ✅ Async (ASGI) variants of upload, JD matching and re-analysis.
+# The LLM wait is awaited on a shared httpx client instead of blocking a thread,
+# so one ASGI worker (e.g. `uvicorn resume.asgi:application`) can keep hundreds
+# of analyses in flight. PDF parsing still runs in the process pool.
+
+def _method_not_allowed():
+    return JsonResponse({"error": "Method not allowed."}, status=405)
+
+
+async def _serialize_analysis(analysis):
+    return await sync_to_async(lambda: ResumeAnalysisSerializer(analysis).data)()
+
+
+async def _finish_resume_analysis(resume, text, content_hash, file_name, use_cache=True):
+    result = await analyze_text_async(text, content_hash, use_cache)
+
+    # ❌ If LLM fails
+    if "error" in result:
+        return llm_error_response(result, JsonResponse)
+    return await _save_resume_analysis(resume, text, file_name, result)
+
+
+async def _save_resume_analysis(resume, text, file_name, result):
+    changed = remember_on_resume(resume, text, result)
+    if changed:
+        await resume.asave(update_fields=changed)
+
+    analysis = await ResumeAnalysis.objects.acreate(
+        file_name=file_name,
+        resume=resume,
+        status="completed",
+        trend="neutral",
+        previous_score=0,
+        **analysis_fields(result)
+    )
+    return JsonResponse({
+        "message": "Resume uploaded and analyzed successfully.",
+        "analysis": await _serialize_analysis(analysis)
+    }, status=201)
+
+
+@csrf_exempt
+async def async_upload_resume(request):
+    if request.method != "POST":
+        return _method_not_allowed()
+
+    # Reading, hashing and storing the upload all touch the disk: keep them off the event loop
+    uploaded_file = request.FILES.get("file")
+    if not uploaded_file or await sync_to_async(sniff_format, thread_sensitive=False)(uploaded_file) != PDF:
+        return JsonResponse({"error": "Only PDF files allowed."}, status=400)
+
+    try:
+        content_hash = await sync_to_async(hash_uploaded_file, thread_sensitive=False)(uploaded_file)
+        resume = await sync_to_async(store_resume)(uploaded_file, content_hash)
+
+        result = analysis_cache.get_by_content(content_hash)
+        if result is not None:
+            return await _save_resume_analysis(resume, None, uploaded_file.name, result)
+
+        text = resume.extracted_text or await sync_to_async(extract_pdf_text, thread_sensitive=False)(resume.file.path)
+        if not text or not text.strip():
+            return JsonResponse({"error": "No readable text found in resume."}, status=400)
+
+        return await _finish_resume_analysis(resume, text, content_hash, uploaded_file.name)
+
+    except Exception:
+        logger.exception("Async analysis failed")
+        return JsonResponse({"error": "Something went wrong during analysis."}, status=500)
+
+
+@csrf_exempt
+async def async_reanalyze_resume(request, pk):
+    if request.method != "POST":
+        return _method_not_allowed()
+
+    try:
+        resume = await Resume.objects.aget(pk=pk)
+    except Resume.DoesNotExist:
+        return JsonResponse({"error": "Resume not found."}, status=404)
+
+    try:
+        text = await sync_to_async(get_resume_text)(resume)
+        if not text:
+            return JsonResponse({"error": "No readable text found in resume."}, status=400)
+
+        force = request.GET.get("force", "").lower() in ("1", "true")
+        return await _finish_resume_analysis(
+            resume, text, resume.content_hash or None, os.path.basename(resume.file.name), use_cache=not force
+        )
+
+    except Exception:
+        logger.exception("Async analysis failed")
+        return JsonResponse({"error": "Something went wrong during analysis."}, status=500)
+
+
+@csrf_exempt
+async def async_match_resume_jd(request):
+    if request.method != "POST":
+        return _method_not_allowed()
+
+    resume_file = request.FILES.get('resume')
+    jd_file = request.FILES.get('jd')
+    if not resume_file or not jd_file:
+        return JsonResponse({"error": "Both resume and JD files are required"}, status=400)
+
+    try:
+        # --- Extract resume and JD text concurrently ---
+        resume_text, jd_text = await asyncio.gather(
+            sync_to_async(load_document, thread_sensitive=False)(resume_file),
+            sync_to_async(load_job_description, thread_sensitive=False)(jd_file),
+        )
+
+        if resume_text is None:
+            return JsonResponse({"error": "Unsupported resume file format"}, status=400)
+        if jd_text is None:
+            return JsonResponse({"error": "Unsupported JD file format"}, status=400)
+        if not resume_text.strip() or not jd_text.strip():
+            return JsonResponse({"error": "Extracted text is empty from resume or JD."}, status=400)
+
+        data = await match_resume_with_jd_async(resume_text, jd_text)
+        return JsonResponse(data, status=500 if "error" in data else 200)
+
+    except RateLimitExceeded as e:
+        return llm_error_response(analysis_error(e), JsonResponse)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
@@ -5,24 +5,29 @@ export default function History() {
   const [history, setHistory] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
+  const [nextUrl, setNextUrl] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
-  const fetchAnalyses = async () => {
+  // Cursor-paginated: { next, previous, results }; `next` is null on the last page
+  const fetchAnalyses = async (url = '/api/analyses/') => {
+    const first = url === '/api/analyses/'
     try {
-      setLoading(true)
-      const response = await axios.get('/api/analyses/')
-      const data = Array.isArray(response.data) ? response.data : []
+      first ? setLoading(true) : setLoadingMore(true)
+      const response = await axios.get(url)
+      const data = Array.isArray(response.data?.results) ? response.data.results : []
 
       // Sort by upload date descending (latest first)
-      const sorted = data.sort(
-        (a, b) => new Date(b.uploadDate) - new Date(a.uploadDate)
+      setHistory((prev) =>
+        [...(first ? [] : prev), ...data].sort(
+          (a, b) => new Date(b.uploadDate) - new Date(a.uploadDate)
+        )
       )
-
-      setHistory(sorted)
+      setNextUrl(response.data?.next || null)
     } catch (err) {
       console.error('Error fetching history:', err)
       setError('Failed to load resume history.')
     } finally {
-      setLoading(false)
+      first ? setLoading(false) : setLoadingMore(false)
     }
   }
 
@@ -52,6 +57,16 @@ export default function History() {
           ))}
         </ul>
       )}
+
+      {!loading && !error && nextUrl && (
+        <button
+          onClick={() => fetchAnalyses(nextUrl)}
+          disabled={loadingMore}
+          className="mt-4 w-full py-2 text-sm font-medium text-blue-600 border border-blue-200 rounded-md hover:bg-blue-50 disabled:opacity-50"
+        >
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   )
 }
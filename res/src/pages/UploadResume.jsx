@@ -8,6 +8,10 @@ import {
   ExclamationTriangleIcon,
 } from '@heroicons/react/24/outline'
 
+const POLL_INTERVAL_MS = 2000
+const POLL_MAX_ATTEMPTS = 90 // 3 minutes
+const POLL_MAX_ERRORS = 3
+
 export default function UploadResume({ onAnalysisComplete }) {
   const navigate = useNavigate()
   const [dragActive, setDragActive] = useState(false)
@@ -65,6 +69,32 @@ export default function UploadResume({ onAnalysisComplete }) {
     setFiles((prev) => prev.filter((file) => file.id !== id))
   }
 
+  // Uploads return 202 while the backend analyzes in the background.
+  // Give up after POLL_MAX_ATTEMPTS polls, or POLL_MAX_ERRORS failed ones in a row.
+  const waitForAnalysis = async (jobId) => {
+    let errors = 0
+    for (let attempt = 0; attempt < POLL_MAX_ATTEMPTS; attempt++) {
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS))
+      try {
+        const res = await fetch(`http://localhost:8000/api/analyses/${jobId}/status/`)
+        if (res.status === 404) {
+          return { ok: false, result: { error: 'The analysis job was not found.' } }
+        }
+        if (!res.ok) throw new Error(`Status check failed (${res.status})`)
+        const job = await res.json()
+        errors = 0
+        if (job.status === 'completed') return { ok: true, result: job }
+        if (job.status === 'failed') return { ok: false, result: job }
+      } catch (error) {
+        console.error(error)
+        if (++errors >= POLL_MAX_ERRORS) {
+          return { ok: false, result: { error: 'Lost contact with the server while waiting for the analysis.' } }
+        }
+      }
+    }
+    return { ok: false, result: { error: 'The analysis is taking too long. Check History later for the result.' } }
+  }
+
   const simulateAnalysis = async (fileObj) => {
     const formData = new FormData()
     formData.append('file', fileObj.file)
@@ -80,10 +110,15 @@ export default function UploadResume({ onAnalysisComplete }) {
       setUploading(false)
       setAnalyzing(true)
 
-      const result = await response.json()
+      let result = await response.json()
+      let ok = response.ok
+
+      if (response.status === 202) {
+        ;({ ok, result } = await waitForAnalysis(result.job_id))
+      }
       setAnalyzing(false)
 
-      if (response.ok) {
+      if (ok) {
         const normalized = {
           fileName: result.analysis.file_name,
           atsScore: result.analysis.ats_score,
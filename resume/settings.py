@@ -19,6 +19,101 @@ ALLOWED_HOSTS = []
 # Hugging Face API Key from .env
 HF_API_KEY = os.getenv("HF_API_KEY")
 
+# Content-addressed cache of LLM analysis results (see analysis/cache.py)
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 512))
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", 60 * 60 * 24))  # seconds
+JD_CACHE_MAX_ENTRIES = int(os.getenv("JD_CACHE_MAX_ENTRIES", 256))       # job-description texts by content hash
+JD_PROMPT_CHARS = int(os.getenv("JD_PROMPT_CHARS", 4000))                # JD text sent with each match prompt
+
+# Local BM25 + skill-overlap ranking that picks which resumes reach the LLM (see analysis/ranking.py)
+RANKING_INDEX_PATH = os.getenv("RANKING_INDEX_PATH", str(BASE_DIR / "ranking_index.pkl"))  # "" = memory only
+RANKING_SAVE_INTERVAL = float(os.getenv("RANKING_SAVE_INTERVAL", 30))  # seconds between index writes
+RANKING_TOP_K = int(os.getenv("RANKING_TOP_K", 20))                    # resumes sent to the LLM per JD match
+RANKING_MAX_TOP_K = int(os.getenv("RANKING_MAX_TOP_K", 100))           # cap on a client's ?top_k=
+JD_MATCH_INLINE_MAX = int(os.getenv("JD_MATCH_INLINE_MAX", 5))         # larger matches run as background jobs
+RANKING_SKILL_WEIGHT = float(os.getenv("RANKING_SKILL_WEIGHT", 0.3))   # share of skills_match overlap in the score
+
+# Single-flight analyses (see analysis/singleflight.py): concurrent requests for the same resume share one LLM call
+ANALYSIS_SINGLE_FLIGHT = os.getenv("ANALYSIS_SINGLE_FLIGHT", "1") == "1"
+ANALYSIS_LEASE_TTL = int(os.getenv("ANALYSIS_LEASE_TTL", 180))             # seconds; 0 = coalesce within a process only
+ANALYSIS_LEASE_RESULT_TTL = int(os.getenv("ANALYSIS_LEASE_RESULT_TTL", 60)) # how long other processes can reuse a result
+
+# Dashboard reads cached per ResumeAnalysis version, with ETags (see analysis/response_cache.py)
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "1") == "1"
+RESPONSE_CACHE_VERSION_TTL = float(os.getenv("RESPONSE_CACHE_VERSION_TTL", 0))  # seconds to trust the last version read
+
+# Background analysis jobs (see analysis/jobs.py); set ANALYSIS_ASYNC=0 to analyze inside the request
+ANALYSIS_ASYNC = os.getenv("ANALYSIS_ASYNC", "1") == "1"
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 4))
+# Jobs still `processing` after this many seconds lost their worker (e.g. a restart) and are failed when polled; 0 disables
+ANALYSIS_STALE_AFTER = int(os.getenv("ANALYSIS_STALE_AFTER", 900))
+
+# Batch uploads and `manage.py analyze_resumes` (see analysis/batch.py)
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", 4))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 500))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", 10 * 1024 * 1024))
+
+# PDF text extraction process pool (see analysis/pdf_pool.py); 0 workers = extract inline
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", 2))
+PDF_EXTRACTION_TIMEOUT = float(os.getenv("PDF_EXTRACTION_TIMEOUT", 20))  # seconds per document
+PDF_WORKER_MEMORY_MB = int(os.getenv("PDF_WORKER_MEMORY_MB", 512))      # address-space cap per worker
+PDF_POOL_MAX_TASKS = int(os.getenv("PDF_POOL_MAX_TASKS", 100))          # recycle workers after N documents
+PDF_FANOUT_PAGES = int(os.getenv("PDF_FANOUT_PAGES", 0))                # >0: split longer PDFs into ranges of N pages
+
+# Shared HTTP client for LLM providers (see analysis/llm_client.py)
+LLM_POOL_HOSTS = int(os.getenv("LLM_POOL_HOSTS", 4))        # distinct hosts kept in the pool
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 16))         # keep-alive connections per host
+LLM_POOL_BLOCK = os.getenv("LLM_POOL_BLOCK", "1") == "1"    # wait for a free connection instead of opening extras
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", 0.5))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", 8))
+LLM_ASYNC_MAX_CONNECTIONS = int(os.getenv("LLM_ASYNC_MAX_CONNECTIONS", 200))  # in-flight requests per ASGI worker
+
+# Outbound LLM rate limits per host (see analysis/ratelimit.py); waits longer than LLM_RATE_MAX_WAIT answer 503
+LLM_RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", 2))            # requests/second, 0 = unlimited
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", 5))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))    # requests in flight, 0 = unlimited
+LLM_RATE_MAX_WAIT = float(os.getenv("LLM_RATE_MAX_WAIT", 20))     # seconds a request may queue
+LLM_RATE_LIMIT_DIR = os.getenv("LLM_RATE_LIMIT_DIR", "")          # share limits across processes via lock files here
+# Provider routing (see analysis/providers.py): names in order of preference, e.g. "openrouter,huggingface"
+LLM_PROVIDERS = [name.strip() for name in os.getenv("LLM_PROVIDERS", "openrouter").split(",") if name.strip()]
+LLM_PROVIDER_URLS = {                                       # endpoint overrides, e.g. local stub servers
+    name: url for name, url in (
+        ("openrouter", os.getenv("OPENROUTER_URL")),
+        ("huggingface", os.getenv("HF_URL")),
+    ) if url
+}
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))  # consecutive failures that open a provider's circuit
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", 30))     # seconds before a trial call is let through
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", 100))    # recent calls kept per provider for p95
+LLM_HEDGE = os.getenv("LLM_HEDGE", "0") == "1"                    # start the next provider when one passes its p95
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", 10))         # hedge delay until a provider has 5 samples
+
+# Record/replay of provider responses (see analysis/recording.py and `manage.py stub_llm`)
+LLM_MODE = os.getenv("LLM_MODE", "live")                          # live | record | replay
+LLM_RECORDINGS_DIR = os.getenv("LLM_RECORDINGS_DIR", str(BASE_DIR / "llm_recordings"))
+LLM_REPLAY_LATENCY = float(os.getenv("LLM_REPLAY_LATENCY", 0))    # seconds added to each replayed response
+LLM_REPLAY_JITTER = float(os.getenv("LLM_REPLAY_JITTER", 0))      # plus up to this many seconds at random
+LLM_REPLAY_ERROR_RATE = float(os.getenv("LLM_REPLAY_ERROR_RATE", 0))  # share of replayed requests that fail
+LLM_REPLAY_ERROR_STATUS = int(os.getenv("LLM_REPLAY_ERROR_STATUS", 503))
+LLM_REPLAY_FALLBACK = os.getenv("LLM_REPLAY_FALLBACK", "0") == "1"  # canned analysis for unrecorded requests
+
+# Logging: analysis.* at LOG_LEVEL; DEBUG adds raw LLM output and per-stage timings
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"plain": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"}},
+    "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "plain"}},
+    "loggers": {
+        "analysis": {"handlers": ["console"], "level": os.getenv("LOG_LEVEL", "INFO"), "propagate": False},
+    },
+}
+
+# Clients allowed to scrape /metrics (see analysis/metrics.py)
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+
 # Installed apps
 INSTALLED_APPS = [
     'django.contrib.admin',